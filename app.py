@@ -1,70 +1,90 @@
+from functools import partial
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
 
-from wordcloud import WordCloud
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.linear_model import LinearRegression
+# Plotly, Matplotlib, seaborn and WordCloud are imported inside the sections
+# that draw with them, so a session only pays for the sections it opens.
+# The local modules below import them lazily as well.
+import downsample
+import impute
+import meals
+import prefetch
+import response_surface
+import schema
+import sections
+import storage
+import timing
+from loader import load_csv
+from sections import NUMERIC_COLS, SECTIONS
 
 ############################################
 # 1) DATA LOADING AND PREP
 ############################################
 
-def load_data(csv_path="daily_data.csv"):
-    df = pd.read_csv(csv_path, parse_dates=["Date"])
-    
-    # Create new feature: Feel Average
-    df["Feel Average"] = (df["Feeling Morning"] + df["Feeling Evening"]) / 2
-
-    # Interpolate Sleep if you like:
-    df["Sleep Duration"] = df["Sleep Duration"].interpolate()
-    df["Sleep Debt"] = df["Sleep Debt"].interpolate()
-
-    return df
+def load_data(csv_path="daily_data.csv", use_cache=True, date_range=None):
+    # With DASHBOARD_DB set, read only the selected dates from the database (see storage.py)
+    if storage.DB_PATH:
+        return storage.load_frame(storage.DB_PATH, date_range)
+    return load_csv(csv_path, use_cache)  # (see loader.py)
 
 ############################################
-# HELPER: PHRASE CLOUD
+# HELPER: DRAWING SECTION BLOCKS
 ############################################
 
-def generate_phrase_cloud_from_frequencies(series, title="Phrase Cloud"):
+# Section content is built by sections.py; this file keeps the widgets and
+# draws the blocks with Streamlit.
+
+def show_plotly(fig):
+    # st.plotly_chart serializes the figure to JSON for the browser
+    with timing.span("plotly.serialize"):
+        st.plotly_chart(fig)
+
+def show_blocks(blocks):
+    """Draws (kind, value) blocks from sections.py."""
+    for kind, value in blocks:
+        if kind == "markdown":
+            st.write(value)
+        elif kind == "plotly":
+            show_plotly(value)
+        elif kind == "image":
+            st.image(value, width="stretch")
+        elif kind == "figure":
+            with timing.span("matplotlib.rasterize"):
+                st.pyplot(value)
+        else:
+            raise ValueError(f"Unknown block kind {kind!r}")
+
+def history_range():
     """
-    Takes a Pandas Series of 'phrases' (e.g. "Japanese Curry", "Subway Egg & Mayo")
-    and generates a WordCloud treating each entire phrase as a single token.
-    The size of each phrase depends on its frequency in the Series.
+    Sidebar picker for the dates loaded from the database. Defaults to the
+    last DASHBOARD_HISTORY_DAYS days.
     """
-    freq_dict = series.value_counts().dropna().to_dict()  # {phrase: count}
-    if len(freq_dict) == 0:
-        # If there's no data, just return an empty figure
-        fig, ax = plt.subplots()
-        ax.text(0.5, 0.5, "No data available", ha='center', va='center')
-        ax.axis("off")
-        return fig
-
-    wc = WordCloud(
-        background_color="white", 
-        collocations=False  # Important for preventing internal splitting
-    ).generate_from_frequencies(freq_dict)
-
-    fig, ax = plt.subplots()
-    ax.imshow(wc, interpolation='bilinear')
-    ax.axis("off")
-    ax.set_title(title)
-    return fig
-
-############################################
-# HELPER: CHARTING FUNCTIONS
-############################################
-
-def line_chart(df, x_col, y_col, chart_title):
-    fig = px.line(df, x=x_col, y=y_col, title=chart_title)
-    st.plotly_chart(fig)
+    first, last = storage.date_bounds(storage.DB_PATH)
+    if first is None:
+        return None
+    default_start = max(first, last - pd.Timedelta(days=storage.DEFAULT_WINDOW_DAYS - 1))
+    picked = st.sidebar.date_input(
+        "History",
+        value=(default_start.date(), last.date()),
+        min_value=first.date(),
+        max_value=last.date(),
+    )
+    # While the user is still picking, date_input returns only the start date
+    if len(picked) != 2:
+        return default_start, last
+    return pd.Timestamp(picked[0]), pd.Timestamp(picked[1])
 
-def bar_chart_multiple(df, x_col, y_cols, chart_title, barmode="group"):
-    fig = px.bar(df, x=x_col, y=y_cols, barmode=barmode, title=chart_title)
-    st.plotly_chart(fig)
+def visible_range(df, x_col="Date"):
+    """
+    For histories longer than the point budget, lets the user pick the visible
+    date window. Returns None when the whole history fits.
+    """
+    if len(df) <= downsample.POINT_BUDGET:
+        return None
+    first, last = df[x_col].min().date(), df[x_col].max().date()
+    start, end = st.slider("Visible range", min_value=first, max_value=last, value=(first, last))
+    return pd.Timestamp(start), pd.Timestamp(end)
 
 ############################################
 # 2) DAILY (OVERALL) VIEW
@@ -72,55 +92,8 @@ def bar_chart_multiple(df, x_col, y_cols, chart_title, barmode="group"):
 
 def daily_view(df):
     st.subheader("Daily (Overall) Overview")
-
-    # 1.1 Weight over Date (Line Graph)
-    st.write("**Weight over Date**")
-    line_chart(df, "Date", "Weight", "Weight over Date")
-
-    # 1.2 Weather Phrase Cloud
-    st.write("**Weather Phrase Cloud**")
-    fig_weather = generate_phrase_cloud_from_frequencies(df["Weather"], "Weather Phrases")
-    st.pyplot(fig_weather)
-
-    # 1.3 Feel Morning over Date (Line Graph)
-    st.write("**Feel Morning over Date**")
-    line_chart(df, "Date", "Feeling Morning", "Feel Morning over Date")
-
-    # 1.4 Feel Evening over Date (Line Graph)
-    st.write("**Feel Evening over Date**")
-    line_chart(df, "Date", "Feeling Evening", "Feel Evening over Date")
-
-    # 1.5 Feel Average over Date (Line Graph)
-    st.write("**Feel Average over Date**")
-    line_chart(df, "Date", "Feel Average", "Feel Average over Date")
-
-    # 1.6 Air over Date (Line Graph)
-    st.write("**Air over Date**")
-    line_chart(df, "Date", "Air", "Air over Date")
-
-    # 1.7 Breakfast Phrase Cloud
-    st.write("**Breakfast Phrase Cloud**")
-    fig_breakfast = generate_phrase_cloud_from_frequencies(df["Breakfast"], "Breakfast Phrases")
-    st.pyplot(fig_breakfast)
-
-    # 1.8 Lunch Phrase Cloud
-    st.write("**Lunch Phrase Cloud**")
-    fig_lunch = generate_phrase_cloud_from_frequencies(df["Lunch"], "Lunch Phrases")
-    st.pyplot(fig_lunch)
-
-    # 1.9 Dinner Phrase Cloud
-    st.write("**Dinner Phrase Cloud**")
-    fig_dinner = generate_phrase_cloud_from_frequencies(df["Dinner"], "Dinner Phrases")
-    st.pyplot(fig_dinner)
-
-    # 1.10 Sleep Duration and Sleep Debt Over Date (Bar Chart)
-    st.write("**Sleep Duration & Sleep Debt Over Date**")
-    bar_chart_multiple(
-        df, 
-        x_col="Date", 
-        y_cols=["Sleep Duration", "Sleep Debt"], 
-        chart_title="Sleep Duration and Sleep Debt Over Date"
-    )
+    x_range = visible_range(df)
+    show_blocks(sections.daily_blocks(df, x_range, fetch=artifact))
 
 ############################################
 # 3) WEEKLY OVERVIEW
@@ -128,69 +101,7 @@ def daily_view(df):
 
 def weekly_overview(df):
     st.subheader("Weekly Overview")
-    # Group data by ISO week
-    df["Week"] = df["Date"].dt.isocalendar().week
-
-    weekly_df = df.groupby("Week", dropna=False).agg({
-        "Weight": "mean",
-        "Feeling Morning": "mean",
-        "Feeling Evening": "mean",
-        "Feel Average": "mean",
-        "Air": "mean",
-        "Sleep Duration": "mean",
-        "Sleep Debt": "mean"
-    }).reset_index()
-
-    #  - Weight line
-    st.write("**Weekly Avg Weight**")
-    line_chart(weekly_df, "Week", "Weight", "Weekly Average Weight")
-
-    #  - Weather phrase cloud aggregated for entire dataset (week-by-week clouds would require a filter).
-    #    For demonstration, let's make a single phrase cloud of all week's weather. 
-    #    If you truly want a "Week-by-week" word cloud, you'd add a selectbox for a specific week.
-    st.write("**(Optional) Single Weather Phrase Cloud for entire data**")
-    fig_weather = generate_phrase_cloud_from_frequencies(df["Weather"], "Weather Phrases (All Weeks)")
-    st.pyplot(fig_weather)
-
-    #  - Feel Morning line
-    st.write("**Weekly Avg Feel Morning**")
-    line_chart(weekly_df, "Week", "Feeling Morning", "Weekly Average Feel Morning")
-
-    #  - Feel Evening line
-    st.write("**Weekly Avg Feel Evening**")
-    line_chart(weekly_df, "Week", "Feeling Evening", "Weekly Average Feel Evening")
-
-    #  - Feel Average line
-    st.write("**Weekly Avg Feel Average**")
-    line_chart(weekly_df, "Week", "Feel Average", "Weekly Average Feel Average")
-
-    #  - Air line
-    st.write("**Weekly Avg Air**")
-    line_chart(weekly_df, "Week", "Air", "Weekly Average Air")
-
-    #  - Breakfast phrase cloud (overall data, or do a filter for a specific week)
-    st.write("**(Optional) Single Breakfast Phrase Cloud for entire data**")
-    fig_breakfast = generate_phrase_cloud_from_frequencies(df["Breakfast"], "Breakfast Phrases (All Weeks)")
-    st.pyplot(fig_breakfast)
-
-    #  - Lunch phrase cloud
-    st.write("**(Optional) Single Lunch Phrase Cloud for entire data**")
-    fig_lunch = generate_phrase_cloud_from_frequencies(df["Lunch"], "Lunch Phrases (All Weeks)")
-    st.pyplot(fig_lunch)
-
-    #  - Dinner phrase cloud
-    st.write("**(Optional) Single Dinner Phrase Cloud for entire data**")
-    fig_dinner = generate_phrase_cloud_from_frequencies(df["Dinner"], "Dinner Phrases (All Weeks)")
-    st.pyplot(fig_dinner)
-
-    #  - Sleep Duration & Debt (line or bar)
-    st.write("**Weekly Avg Sleep Duration & Sleep Debt**")
-    bar_chart_multiple(
-        weekly_df, 
-        x_col="Week", 
-        y_cols=["Sleep Duration", "Sleep Debt"], 
-        chart_title="Weekly Average Sleep Duration & Sleep Debt"
-    )
+    show_blocks(sections.weekly_blocks(df, fetch=artifact))
 
 ############################################
 # 4) MONTHLY OVERVIEW
@@ -198,67 +109,7 @@ def weekly_overview(df):
 
 def monthly_overview(df):
     st.subheader("Monthly Overview")
-    # Group data by month
-    df["Month"] = df["Date"].dt.month
-
-    monthly_df = df.groupby("Month", dropna=False).agg({
-        "Weight": "mean",
-        "Feeling Morning": "mean",
-        "Feeling Evening": "mean",
-        "Feel Average": "mean",
-        "Air": "mean",
-        "Sleep Duration": "mean",
-        "Sleep Debt": "mean"
-    }).reset_index()
-
-    #  - Weight line
-    st.write("**Monthly Avg Weight**")
-    line_chart(monthly_df, "Month", "Weight", "Monthly Average Weight")
-
-    #  - Weather phrase cloud (overall data again)
-    st.write("**(Optional) Single Weather Phrase Cloud for entire data**")
-    fig_weather = generate_phrase_cloud_from_frequencies(df["Weather"], "Weather Phrases (All Months)")
-    st.pyplot(fig_weather)
-
-    #  - Feel Morning line
-    st.write("**Monthly Avg Feel Morning**")
-    line_chart(monthly_df, "Month", "Feeling Morning", "Monthly Average Feel Morning")
-
-    #  - Feel Evening line
-    st.write("**Monthly Avg Feel Evening**")
-    line_chart(monthly_df, "Month", "Feeling Evening", "Monthly Average Feel Evening")
-
-    #  - Feel Average line
-    st.write("**Monthly Avg Feel Average**")
-    line_chart(monthly_df, "Month", "Feel Average", "Monthly Average Feel Average")
-
-    #  - Air line
-    st.write("**Monthly Avg Air**")
-    line_chart(monthly_df, "Month", "Air", "Monthly Average Air")
-
-    #  - Breakfast phrase cloud
-    st.write("**(Optional) Single Breakfast Phrase Cloud for entire data**")
-    fig_breakfast = generate_phrase_cloud_from_frequencies(df["Breakfast"], "Breakfast Phrases (All Months)")
-    st.pyplot(fig_breakfast)
-
-    #  - Lunch phrase cloud
-    st.write("**(Optional) Single Lunch Phrase Cloud for entire data**")
-    fig_lunch = generate_phrase_cloud_from_frequencies(df["Lunch"], "Lunch Phrases (All Months)")
-    st.pyplot(fig_lunch)
-
-    #  - Dinner phrase cloud
-    st.write("**(Optional) Single Dinner Phrase Cloud for entire data**")
-    fig_dinner = generate_phrase_cloud_from_frequencies(df["Dinner"], "Dinner Phrases (All Months)")
-    st.pyplot(fig_dinner)
-
-    #  - Sleep Duration & Debt
-    st.write("**Monthly Avg Sleep Duration & Sleep Debt**")
-    bar_chart_multiple(
-        monthly_df,
-        x_col="Month",
-        y_cols=["Sleep Duration", "Sleep Debt"],
-        chart_title="Monthly Average Sleep Duration & Sleep Debt"
-    )
+    show_blocks(sections.monthly_blocks(df, fetch=artifact))
 
 ############################################
 # 5) CORRELATION SECTION
@@ -267,22 +118,17 @@ def monthly_overview(df):
 def correlation_section(df):
     st.subheader("Correlation")
 
-    numeric_cols = [
-        "Weight",
-        "Feeling Morning",
-        "Feeling Evening",
-        "Feel Average",
-        "Air",
-        "Sleep Duration",
-        "Sleep Debt"
-    ]
+    numeric_cols = NUMERIC_COLS
 
     # 4.1 Correlation Matrix
     st.write("**Correlation Matrix**")
-    corr = df[numeric_cols].corr()
-    fig, ax = plt.subplots()
-    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
-    st.pyplot(fig)
+    start, end = None, None
+    first, last = df["Date"].min().date(), df["Date"].max().date()
+    if first < last:
+        picked = st.slider("Matrix date range", min_value=first, max_value=last, value=(first, last))
+        if picked != (first, last):
+            start, end = pd.Timestamp(picked[0]), pd.Timestamp(picked[1])
+    show_blocks(sections.correlation_matrix_blocks(df, start, end, fetch=artifact))
 
     # Below the matrix, let user pick two variables for a scatter plot + regression
     st.write("**Scatter Plot & Regression**")
@@ -290,102 +136,189 @@ def correlation_section(df):
     y_var = st.selectbox("Select Y variable", numeric_cols, index=1)
 
     if x_var and y_var:
-        fig_scatter = px.scatter(df, x=x_var, y=y_var, trendline="ols",
-                                 title=f"{x_var} vs {y_var} with Regression")
-        st.plotly_chart(fig_scatter)
+        show_blocks(sections.scatter_blocks(df, x_var, y_var, fetch=artifact))
+
+        # 4.2 Rolling correlation of the selected pair
+        st.write("**Rolling Correlation**")
+        window = st.select_slider(
+            "Window (days)", options=[7, 14, 30, 90, 180, 365], value=sections.DEFAULT_WINDOW
+        )
+        show_blocks(sections.rolling_blocks(df, x_var, y_var, window))
 
 ############################################
 # 6) OPTIMAL VALUES
 ############################################
 
 def optimal_values_section(df):
-    """
-    Attempt to find an overall "optimal" Sleep Duration for maximizing Feel Average.
-    We'll do a simple polynomial regression of degree=2: 
-    Feel Average ~ a*(Sleep Duration)^2 + b*(Sleep Duration) + c
-    Then find vertex of the parabola.
-    """
     st.subheader("Optimal Values - Sleep Duration to Maximize Feel Average")
+    show_blocks(sections.optimal_values_blocks(df, fetch=artifact))
 
-    # Prepare data
-    sub_df = df.dropna(subset=["Sleep Duration", "Feel Average"])
-    X = sub_df[["Sleep Duration"]].values
-    y = sub_df["Feel Average"].values
+    # Sleep, sleep debt, air and weight together
+    st.write("**Joint Optimum**")
+    show_blocks(sections.joint_optimum_blocks(df, fetch=artifact))
 
-    if len(X) < 3:
-        st.write("Not enough data to perform polynomial regression.")
-        return
+    st.write("**Optimum per Window**")
+    window = st.select_slider(
+        "Optimum window (days)", options=[90, 180, 365, 730], value=response_surface.DEFAULT_WINDOW
+    )
+    show_blocks(sections.rolling_optimum_blocks(df, window, fetch=artifact))
 
-    # Fit polynomial of degree 2
-    poly = PolynomialFeatures(degree=2)
-    X_poly = poly.fit_transform(X)
+############################################
+# 7) MEAL IMPACT
+############################################
 
-    model = LinearRegression()
-    model.fit(X_poly, y)
+def meal_impact_section(df):
+    """
+    How each metric differs on days a meal was eaten versus the other days,
+    for every meal at once. Composite entries count for each of their dishes,
+    and "Brand:Item" entries for the brand too.
+    """
+    import plotly.express as px
 
-    # Coefficients: FeelAvg = c + b*Sleep + a*Sleep^2
-    c = model.intercept_
-    b = model.coef_[1]
-    a = model.coef_[2]
+    st.subheader("Meal Impact")
 
-    st.write(f"Polynomial Model: FeelAverage = {a:.3f}*Sleep^2 + {b:.3f}*Sleep + {c:.3f}")
+    slots = st.multiselect("Meals", list(meals.MEAL_SLOTS), default=list(meals.MEAL_SLOTS))
+    if not slots:
+        st.write("Select at least one meal.")
+        return
 
-    # If 'a' != 0, the vertex is at x = -b / (2a)
-    # That's the "optimal" Sleep Duration for maximum or minimum
-    if a == 0:
-        st.write("Coefficient a=0, so the relationship is linear, not quadratic.")
-        # If b > 0 => more sleep better, if b < 0 => less sleep better
-        # We can just show a scatter with regression line
-        slope_direction = "Positive" if b > 0 else "Negative"
-        st.write(f"Slope is {slope_direction}. No single 'optimal' point in a strictly linear sense.")
+    # Vocabulary and days per meal from the interned meal index (see meals.py)
+    if tuple(slots) == meals.MEAL_SLOTS:
+        index = artifact(df, "meals: index")
     else:
-        x_opt = -b / (2*a)
-        st.write(f"**Optimal Sleep Duration** (vertex of parabola) = {x_opt:.2f} hours")
-
-    # Let's plot the curve
-    sleep_min = np.min(X)
-    sleep_max = np.max(X)
-    sleep_range = np.linspace(sleep_min, sleep_max, 100).reshape(-1,1)
-    sleep_range_poly = poly.transform(sleep_range)
-    pred_range = model.predict(sleep_range_poly)
-
-    fig_opt, ax_opt = plt.subplots()
-    ax_opt.scatter(X, y, alpha=0.5, label="Actual Data")
-    ax_opt.plot(sleep_range, pred_range, color="red", label="Polynomial Fit")
-    ax_opt.set_xlabel("Sleep Duration (hrs)")
-    ax_opt.set_ylabel("Feel Average")
-    ax_opt.set_title("Feel Average vs Sleep Duration (Polynomial Regression)")
-    ax_opt.legend()
-    st.pyplot(fig_opt)
+        index = meals.index_for(df, slots)
+    if index.vocabulary.empty:
+        st.write("No meals recorded.")
+        return
+
+    metric = st.selectbox("Metric", NUMERIC_COLS, index=NUMERIC_COLS.index("Feel Average"))
+    most_days = int(index.vocabulary["days"].max())
+    min_days = 1
+    if most_days > 1:
+        min_days = st.slider("Eaten on at least (days)", 1, most_days, value=min(3, most_days))
+
+    # Recorded values only: a filled-in day says nothing about what was eaten
+    effects = index.effects(impute.observed(df), NUMERIC_COLS, min_days)
+    effects = effects[effects["metric"] == metric].dropna(subset=["effect_size"])
+    effects = effects.sort_values("effect_size")
+
+    # 7.1 Effect size per meal
+    st.write(f"**{metric}: effect size per meal** (Cohen's d, days with the meal vs without)")
+    top = effects.loc[effects["effect_size"].abs().nlargest(30).index].sort_values("effect_size")
+    with timing.span("plotly.figure"):
+        fig = px.bar(top, x="effect_size", y="term", orientation="h", color="kind",
+                     hover_data=["days", "mean_with", "mean_without"],
+                     title=f"Effect of each meal on {metric}")
+    show_plotly(fig)
+
+    st.dataframe(
+        effects[["term", "kind", "days", "mean_with", "mean_without", "difference", "effect_size"]]
+        .sort_values("effect_size", ascending=False).round(3),
+        hide_index=True,
+    )
+
+    # 7.2 Days with a combination of meals
+    st.write("**Days with all of**")
+    picked = st.multiselect("Meals eaten on the same day", index.vocabulary["term"].tolist())
+    if picked:
+        # Recorded days and values only, as for the effects above
+        recorded = impute.recorded_days(df)
+        mask = index.days_with(*picked) & recorded
+        values = impute.observed(df)[NUMERIC_COLS]
+        st.write(f"{int(mask.sum())} of {int(recorded.sum())} recorded days")
+        comparison = pd.DataFrame({
+            "with": values[mask].mean(),
+            "without": values[~mask & recorded].mean(),
+        })
+        comparison["difference"] = comparison["with"] - comparison["without"]
+        st.dataframe(comparison.round(3))
 
 ############################################
 # MAIN STREAMLIT APP
 ############################################
 
+def session_prefetcher():
+    # One Prefetcher per browser session
+    if "prefetcher" not in st.session_state:
+        st.session_state["prefetcher"] = prefetch.Prefetcher()
+    return st.session_state["prefetcher"]
+
+def artifact(df, key):
+    """
+    sections.ARTIFACTS[key] for `df`, served from the session's background
+    prefetch when it is ready. After each load the artifacts of the other
+    sections are computed in the background (see prefetch.py).
+    """
+    return session_prefetcher().get(key, partial(sections.compute_artifact, df, key))
+
+def register_prefetch(df, choice):
+    """Registers the artifacts of every section for `df`, those after `choice` (wrapping around) first."""
+    at = SECTIONS.index(choice)
+    tasks = {}
+    for section in SECTIONS[at + 1:] + SECTIONS[:at + 1]:
+        for key in sections.SECTION_ARTIFACTS[section]:
+            tasks.setdefault(key, partial(sections.compute_artifact, df, key))
+    session_prefetcher().register(prefetch.data_token(df), tasks)
+
+def profiling_panel():
+    """Sidebar table of the span histograms (see timing.py), with JSON / Prometheus downloads."""
+    with st.sidebar.expander("Profiling"):
+        spans = timing.snapshot()
+        if not spans:
+            st.write("No spans recorded yet.")
+            return
+        st.dataframe(pd.DataFrame([
+            {
+                "span": name,
+                "calls": stats["count"],
+                "mean ms": 1000 * stats["sum"] / stats["count"],
+                "p50 ms": 1000 * stats["p50"],
+                "p95 ms": 1000 * stats["p95"],
+                "max ms": 1000 * stats["max"],
+            }
+            for name, stats in spans.items()
+        ]).round(1), hide_index=True)
+        status = pd.Series(session_prefetcher().status()).value_counts()
+        st.write("Prefetch: " + ", ".join(f"{count} {state}" for state, count in status.items()))
+        st.download_button("Download JSON", timing.to_json(), file_name="spans.json")
+        st.download_button("Download Prometheus", timing.to_prometheus(), file_name="spans.prom")
+        if st.button("Reset"):
+            timing.reset()
+
 def main():
     st.title("My Dashboard")
 
-    df = load_data()  # Load your CSV
-
-    menu = [
-        "Daily (Overall) Overview",
-        "Weekly Overview",
-        "Monthly Overview",
-        "Correlation",
-        "Optimal Values"
-    ]
-    choice = st.sidebar.selectbox("Select a Section", menu)
-
-    if choice == "Daily (Overall) Overview":
-        daily_view(df)
-    elif choice == "Weekly Overview":
-        weekly_overview(df)
-    elif choice == "Monthly Overview":
-        monthly_overview(df)
-    elif choice == "Correlation":
-        correlation_section(df)
-    elif choice == "Optimal Values":
-        optimal_values_section(df)
+    date_range = history_range() if storage.DB_PATH else None
+    with timing.span("load_data"):
+        df = load_data(date_range=date_range)  # Load your CSV (or the selected dates from the database)
+
+    menu = SECTIONS
+    # ?section=<name> opens that section first (used by benchmarks/bench_startup.py)
+    requested = st.query_params.get("section")
+    index = menu.index(requested) if requested in menu else 0
+    choice = st.sidebar.selectbox("Select a Section", menu, index=index)
+    register_prefetch(df, choice)
+
+    with timing.span(f"section: {choice}"):
+        if choice == "Daily (Overall) Overview":
+            daily_view(df)
+        elif choice == "Weekly Overview":
+            weekly_overview(df)
+        elif choice == "Monthly Overview":
+            monthly_overview(df)
+        elif choice == "Correlation":
+            correlation_section(df)
+        elif choice == "Optimal Values":
+            optimal_values_section(df)
+        elif choice == "Meal Impact":
+            meal_impact_section(df)
+
+    # With the page drawn, compute the other sections' artifacts in the background
+    session_prefetcher().start()
+
+    if timing.ENABLED:
+        profiling_panel()
+        timing.export()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,76 @@
+"""
+Chart payload and build time, with and without server-side downsampling.
+
+For each size the figure is built the way sections.line_figure / sections.bar_figure
+build it and serialized to JSON, which is what Streamlit ships to the browser.
+Times cover figure construction plus serialization; browser-side rendering is
+not measured here.
+
+    python benchmarks/bench_charts.py --points 1000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import downsample  # noqa: E402
+
+
+def build_frame(n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Date": pd.date_range("1970-01-01", periods=n_points, freq="h"),
+        "Weight": 80 + np.cumsum(rng.normal(0, 0.05, n_points)),
+        "Sleep Duration": rng.normal(7.5, 1.0, n_points),
+        "Sleep Debt": rng.gamma(2.0, 1.0, n_points),
+    })
+
+
+def measure(build):
+    start = time.perf_counter()
+    payload = build().to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def line_before(df):
+    return px.line(df, x="Date", y="Weight")
+
+
+def line_after(df):
+    plot_df = downsample.downsample_lines(df, "Date", ["Weight"])
+    render_mode = "webgl" if downsample.use_webgl(len(plot_df)) else "auto"
+    return px.line(plot_df, x="Date", y="Weight", render_mode=render_mode)
+
+
+def bar_before(df):
+    return px.bar(df, x="Date", y=["Sleep Duration", "Sleep Debt"], barmode="group")
+
+
+def bar_after(df):
+    plot_df = downsample.downsample_bars(df, "Date", ["Sleep Duration", "Sleep Debt"])
+    return px.bar(plot_df, x="Date", y=["Sleep Duration", "Sleep Debt"], barmode="group")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"budget={downsample.POINT_BUDGET} points, WebGL above {downsample.WEBGL_THRESHOLD}")
+    print(f"{'chart':>6} {'points':>9} {'before KB':>10} {'before s':>9} {'after KB':>9} {'after s':>8}")
+    for n_points in args.points:
+        df = build_frame(n_points)
+        for name, before, after in (("line", line_before, line_after), ("bar", bar_before, bar_after)):
+            size_before, time_before = measure(lambda: before(df))
+            size_after, time_after = measure(lambda: after(df))
+            print(f"{name:>6} {n_points:>9} {size_before / 1024:>10,.0f} {time_before:>9.3f} "
+                  f"{size_after / 1024:>9,.0f} {time_after:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
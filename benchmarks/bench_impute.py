@@ -0,0 +1,111 @@
+"""
+Imputation on a synthetic history with random gaps: impute.py versus pandas.
+
+Drops --drop-days of the days and blanks --drop-cells of the remaining
+numeric cells at random, then times:
+
+vectorized: impute.impute, every column in one pass
+pandas:     the same calendar and strategies with per-column pandas calls
+            (interpolate(method="time"), ffill, rolling().median())
+
+and checks both fill the same cells with the same values. Prints cells filled
+per column for the last size.
+
+    python benchmarks/bench_impute.py --days 1y 20y
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import impute  # noqa: E402
+import schema  # noqa: E402
+from synthetic import SIZES, parse_days, write_csv  # noqa: E402
+
+
+def with_gaps(df, drop_days, drop_cells, seed=0):
+    rng = np.random.default_rng(seed)
+    df = df[rng.random(len(df)) >= drop_days].reset_index(drop=True)
+    for col in impute.DEFAULT_STRATEGIES:
+        df.loc[rng.random(len(df)) < drop_cells, col] = None
+    return df
+
+
+def pandas_impute(df, strategies, max_gap=impute.MAX_GAP):
+    # One column at a time, as ad hoc interpolate() calls would do it
+    df = df.set_index('Date')
+    df = df.reindex(pd.date_range(df.index[0], df.index[-1], freq='D', name='Date'))
+    for col, strategy in strategies.items():
+        values = df[col].astype(float)
+        missing = values.isna()
+        gap = (~missing).cumsum()
+        if strategy == 'interpolate':
+            run = missing.groupby(gap).transform('sum')
+            filled = values.interpolate(method='time', limit_area='inside').where(run <= max_gap)
+        elif strategy == 'ffill':
+            since = missing.groupby(gap).cumsum()
+            filled = values.ffill().where(since <= max_gap)
+        elif strategy == 'rolling_median':
+            filled = values.rolling(impute.ROLLING_DAYS, center=True, min_periods=impute.ROLLING_MIN_PERIODS).median()
+        else:
+            continue
+        if pd.api.types.is_integer_dtype(df[col].dtype):
+            filled = filled.round()
+        df[col] = values.where(~missing, filled).astype(df[col].dtype)
+    return df.reset_index()
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', nargs='+', default=['1y', '20y'], help='Days per history, or one of ' + ', '.join(SIZES))
+    parser.add_argument('--drop-days', type=float, default=0.1, help="Fraction of days removed")
+    parser.add_argument('--drop-cells', type=float, default=0.05, help="Fraction of numeric cells blanked")
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per size; the best is reported')
+    args = parser.parse_args()
+
+    strategies = impute.DEFAULT_STRATEGIES
+    print(f"{'days':>6} {'rows':>6} {'filled':>7} {'vectorized ms':>14} {'pandas ms':>10} {'speedup':>8}")
+    for size in args.days:
+        n_days = parse_days(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'daily_data.csv')
+            write_csv(csv_path, n_days)
+            df = schema.coerce(pd.read_csv(csv_path, parse_dates=['Date'], dtype=schema.CSV_DTYPES))
+        df = with_gaps(df, args.drop_days, args.drop_cells)
+
+        vectorized_s = min(timed(impute.impute, df, strategies)[1] for _ in range(args.repeat))
+        pandas_s = min(timed(pandas_impute, df, strategies)[1] for _ in range(args.repeat))
+        result = impute.impute(df, strategies)
+        expected = pandas_impute(df, strategies)
+        for col in strategies:
+            if not np.allclose(result[col].to_numpy(dtype=float, na_value=np.nan),
+                               expected[col].to_numpy(dtype=float, na_value=np.nan), equal_nan=True):
+                raise SystemExit(f"{col}: vectorized and pandas imputation differ")
+
+        filled = {col: int(impute.imputed_cells(result, col).sum()) for col in strategies}
+        print(
+            f"{n_days:>6} {len(df):>6} {sum(filled.values()):>7} {vectorized_s * 1000:>14.1f} "
+            f"{pandas_s * 1000:>10.1f} {pandas_s / vectorized_s:>7.1f}x"
+        )
+
+    print()
+    print(f"{'column':<16} {'strategy':<15} {'filled':>7} {'still missing':>14}")
+    for col, strategy in strategies.items():
+        print(f"{col:<16} {strategy:<15} {filled[col]:>7} {int(result[col].isna().sum()):>14}")
+    added = int((result[impute.MASK_COLUMN].to_numpy() & impute.ADDED_DAY != 0).sum())
+    print(f"{'days added':<32} {added:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Nightly ingest benchmark for preprocess.py.
+
+Times a full rebuild against an incremental run that picks up one appended day,
+for journals of growing length. The incremental time should stay flat.
+
+    python benchmarks/bench_ingest.py --rows 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import preprocess  # noqa: E402
+from synthetic import journal_text  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'full rebuild s':>15} {'incremental s':>14} {'verify s':>9}")
+    for n_rows in args.rows:
+        lines = journal_text(n_rows + 2).splitlines(keepends=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = os.path.join(tmp, 'journal.md')
+            output = os.path.join(tmp, 'daily_data.csv')
+            with open(journal, 'w') as f:
+                f.writelines(lines[:-2])
+
+            start = time.perf_counter()
+            preprocess.ingest(journal, output, rebuild=True)
+            full_time = time.perf_counter() - start
+
+            timings = []
+            for line, verify in ((lines[-2], False), (lines[-1], True)):
+                with open(journal, 'a') as f:
+                    f.write(line)
+                start = time.perf_counter()
+                preprocess.ingest(journal, output, verify=verify)
+                timings.append(time.perf_counter() - start)
+
+        print(f"{n_rows:>10} {full_time:>15.3f} {timings[0]:>14.4f} {timings[1]:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
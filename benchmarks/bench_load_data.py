@@ -0,0 +1,49 @@
+"""
+Cold versus warm app.load_data timings.
+
+cold:    parse the CSV and derive columns (first run, or after the CSV changed)
+parquet: read the columnar cache from disk (new process, CSV unchanged)
+memory:  in-process hit (a Streamlit rerun)
+
+    python benchmarks/bench_load_data.py --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app  # noqa: E402
+import data_cache  # noqa: E402
+from synthetic import write_csv  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'cold s':>9} {'parquet s':>10} {'memory s':>9} {'speedup':>8}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'daily_data.csv')
+            write_csv(csv_path, n_rows)
+            data_cache.clear()
+
+            cold = timed(lambda: app.load_data(csv_path))
+            data_cache.clear()
+            warm_disk = timed(lambda: app.load_data(csv_path))
+            warm_memory = timed(lambda: app.load_data(csv_path))
+
+        print(f"{n_rows:>10} {cold:>9.3f} {warm_disk:>10.3f} {warm_memory:>9.4f} {cold / warm_disk:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Meal-impact queries: the meal index versus a per-meal pandas scan.
+
+naive: for every meal, find its days with str.contains over the meal columns,
+       then compare the metric means on those days with the rest
+index: build meals.MealIndex, then MealIndex.effects for all meals at once
+
+    python benchmarks/bench_meals.py --days 1y 5y 20y
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app  # noqa: E402
+import meals  # noqa: E402
+from synthetic import parse_days, write_csv  # noqa: E402
+
+
+def naive_effects(df, terms, metrics):
+    slots = df[list(meals.MEAL_SLOTS)]
+    rows = []
+    for term in terms:
+        mask = slots.apply(lambda col: col.str.contains(term, regex=False, na=False)).any(axis=1)
+        rows.append(df.loc[mask, metrics].mean() - df.loc[~mask, metrics].mean())
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', nargs='+', default=['1y', '5y', '20y'])
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'meals':>6} {'naive s':>9} {'build s':>9} {'effects s':>10} {'speedup':>8}")
+    for size in args.days:
+        n_days = parse_days(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'daily_data.csv')
+            write_csv(csv_path, n_days)
+            df = app.load_csv(csv_path, use_cache=False)
+
+        start = time.perf_counter()
+        index = meals.MealIndex(df)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        index.effects(df, app.NUMERIC_COLS)
+        effects = time.perf_counter() - start
+
+        terms = index.vocabulary['term'].tolist()
+        start = time.perf_counter()
+        naive_effects(df, terms, app.NUMERIC_COLS)
+        naive = time.perf_counter() - start
+
+        print(
+            f"{n_days:>6} {len(terms):>6} {naive:>9.3f} {build:>9.4f} {effects:>10.4f} "
+            f"{naive / (build + effects):>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Throughput of daily-note directory ingestion (preprocess.ingest_notes).
+
+For every note count it times a full ingest with each worker count, then a
+re-run with nothing changed (manifest hits only) and one after editing a
+single note.
+
+    python benchmarks/bench_notes.py --notes 1000 10000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import preprocess  # noqa: E402
+from synthetic import write_notes  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--notes', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'notes':>8} {'workers':>8} {'full s':>8} {'notes/s':>9} {'no-op s':>8} {'1 edit s':>9}")
+    for n_notes in args.notes:
+        with tempfile.TemporaryDirectory() as tmp:
+            notes_dir = os.path.join(tmp, 'Daily')
+            output = os.path.join(tmp, 'daily_data.csv')
+            paths = write_notes(notes_dir, n_notes)
+
+            for workers in args.workers:
+                full = timed(preprocess.ingest_notes, notes_dir, output, workers=workers, rebuild=True)
+                noop = timed(preprocess.ingest_notes, notes_dir, output, workers=workers)
+                with open(paths[-1], 'a') as f:
+                    f.write(f"\nEdited with {workers} workers\n")
+                edit = timed(preprocess.ingest_notes, notes_dir, output, workers=workers)
+                print(
+                    f"{n_notes:>8} {workers:>8} {full:>8.2f} {n_notes / full:>9,.0f} "
+                    f"{noop:>8.3f} {edit:>9.3f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Joint optimum search: prefix-sum rolling fits versus one refit per window.
+
+fit:      response_surface.ResponseSurface (full-history fit and candidate grid)
+optimum:  scoring every grid candidate for the full-history fit
+rolling:  ResponseSurface.rolling, every window from one batched solve
+refit:    the same windows fitted one by one with np.linalg.lstsq and scored
+          on the same candidates (the approach rolling replaces)
+
+    python benchmarks/bench_optimal.py --days 1y 20y --window 365
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app  # noqa: E402
+import response_surface  # noqa: E402
+from synthetic import SIZES, parse_days, write_csv  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def refit(surface, df, window, ends):
+    # One least-squares fit per window, as a loop would do it
+    complete = df.dropna(subset=[*surface.factors, surface.target]).sort_values('Date')
+    dates = complete['Date'].to_numpy(dtype='datetime64[D]')
+    x = (complete[surface.factors].to_numpy(dtype=float) - surface.means) / surface.scales
+    phi = response_surface._features(x)
+    y = complete[surface.target].to_numpy(dtype=float)
+    best = []
+    for end in ends:
+        rows = (dates > end - np.timedelta64(window, 'D')) & (dates <= end)
+        coefficients = np.linalg.lstsq(phi[rows], y[rows], rcond=None)[0]
+        # Only the candidates nearest to a day of the window, as rolling does
+        cells = np.unique(surface._near[rows])
+        cells = cells[cells >= 0]
+        best.append(int(cells[np.argmax(surface._grid_features[cells] @ coefficients)]))
+    return surface.grid[best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', nargs='+', default=['1y', '20y'], help='Days per history, or one of ' + ', '.join(SIZES))
+    parser.add_argument('--window', type=int, default=response_surface.DEFAULT_WINDOW,
+                        help='Days per rolling window')
+    parser.add_argument('--step', type=int, default=response_surface.DEFAULT_STEP,
+                        help='Days between window ends')
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'windows':>8} {'fit s':>7} {'optimum s':>10} {'rolling s':>10} {'refit s':>8} {'speedup':>8}")
+    for size in args.days:
+        n_days = parse_days(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'daily_data.csv')
+            write_csv(csv_path, n_days)
+            df = app.load_csv(csv_path, use_cache=False)
+
+        surface, fit_s = timed(response_surface.ResponseSurface, df)
+        _, optimum_s = timed(surface.optimum)
+        rolling, rolling_s = timed(surface.rolling, args.window, args.step)
+        ends = rolling.index.to_numpy(dtype='datetime64[D]')
+        best, refit_s = timed(refit, surface, df, args.window, ends)
+        if not np.allclose(best, rolling[surface.factors].to_numpy()):
+            raise SystemExit("Rolling optimum differs from the per-window refit")
+        speedup = refit_s / rolling_s if rolling_s else float('nan')
+        print(
+            f"{n_days:>6} {len(rolling):>8} {fit_s:>7.3f} {optimum_s:>10.4f} {rolling_s:>10.3f} "
+            f"{refit_s:>8.3f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Section switch latency with background prefetching off and on.
+
+Each run opens the dashboard on the first section with Streamlit's AppTest,
+idles for --idle seconds (the user reading the page), then switches to every
+other section in turn and times each switch. Runs use a fresh interpreter with
+DASHBOARD_PREFETCH_WORKERS set to 0 (off) and to each --workers value.
+
+    python benchmarks/bench_prefetch.py --days 1y 20y --idle 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, ROOT)
+from synthetic import SIZES, parse_days, write_csv  # noqa: E402
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+from app import SECTIONS
+
+at = AppTest.from_file({app!r}, default_timeout=3600)
+at.run()
+time.sleep({idle!r})
+switches = {{}}
+for section in SECTIONS[1:]:
+    start = time.perf_counter()
+    at.sidebar.selectbox[0].select(section).run()
+    switches[section] = time.perf_counter() - start
+    if at.exception:
+        raise SystemExit(str(at.exception))
+print(json.dumps(switches))
+"""
+
+
+def run(csv_dir, workers, idle):
+    code = CHILD.format(root=ROOT, app=os.path.join(ROOT, 'app.py'), idle=idle)
+    env = dict(os.environ, DASHBOARD_PREFETCH_WORKERS=str(workers))
+    proc = subprocess.run([sys.executable, '-c', code], cwd=csv_dir, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"Benchmark child failed:\n{proc.stderr or proc.stdout}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', nargs='+', default=['1y', '20y'], help='Days per history, or one of ' + ', '.join(SIZES))
+    parser.add_argument('--workers', type=int, nargs='+', default=[2],
+                        help='DASHBOARD_PREFETCH_WORKERS values to compare with prefetching off')
+    parser.add_argument('--idle', type=float, default=5.0, help="Seconds on the first section before switching")
+    args = parser.parse_args()
+
+    settings = [0] + args.workers
+    header = ' '.join(f"{'off s' if w == 0 else f'{w} workers s':>12}" for w in settings)
+    print(f"{'days':>6} {'section':<26} {header}")
+    for size in args.days:
+        n_days = parse_days(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv(os.path.join(tmp, 'daily_data.csv'), n_days)
+            runs = [run(tmp, workers, args.idle) for workers in settings]
+        for section in runs[0]:
+            cells = ' '.join(f"{r[section]:>12.2f}" for r in runs)
+            print(f"{n_days:>6} {section:<26} {cells}")
+        totals = ' '.join(f"{sum(r.values()):>12.2f}" for r in runs)
+        print(f"{n_days:>6} {'total':<26} {totals}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Rows-per-second benchmark for preprocess.py.
+
+Compares the original per-cell parse (kept below as `legacy_parse`) with the
+vectorized, chunked parser on synthetic journals (see synthetic.py).
+
+    python benchmarks/bench_preprocess.py --rows 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+from io import StringIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import preprocess  # noqa: E402
+from synthetic import journal_text  # noqa: E402
+
+
+def legacy_parse(text):
+    # preprocess.py before the vectorized rewrite
+    df = pd.read_csv(StringIO(text), sep='|', skipinitialspace=True, engine='python')
+    df = df.drop(columns=['Unnamed: 0', 'Unnamed: 10'])
+    df = df.drop(index=[0, 1]).reset_index(drop=True)
+    df.columns = df.columns.str.strip()
+    df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+    df['Date'] = df['Date'].str.replace(r'\[\[|\]\]', '', regex=True)
+    df = df.map(lambda x: x.replace('<br>', '') if isinstance(x, str) else x)
+    df['Date'] = pd.to_datetime(df['Date']).dt.date
+    df[['Breakfast', 'Lunch', 'Dinner']] = df['Meals'].str.split('/', n=2, expand=True)
+    df.drop(columns=['Meals'], inplace=True)
+    df = df.replace('None', pd.NA)
+
+    def extract_average_air_value(air_value):
+        if pd.isna(air_value):
+            return air_value
+        if '-' in air_value:
+            low, high = map(float, air_value.split('-'))
+            return (low + high) / 2
+        return float(air_value)
+
+    df['Air'] = df['Air'].apply(extract_average_air_value)
+    df[['Sport Name', 'Sport Duration']] = df['Physical Activity'].apply(
+        lambda x: pd.Series(x.split('/', 1)) if pd.notna(x) else pd.Series([pd.NA, pd.NA])
+    )
+    df.drop(columns='Physical Activity', inplace=True)
+    df[['Sleep Duration', 'Sleep Debt']] = df['Slept Hours'].apply(
+        lambda x: pd.Series(x.split('/', 1)) if pd.notna(x) else pd.Series([pd.NA, pd.NA])
+    )
+    df.drop(columns='Slept Hours', inplace=True)
+
+    def convert_sleep_duration(duration):
+        if pd.isna(duration):
+            return duration
+        parts = duration.split('hr')
+        hours = int(parts[0])
+        minutes = int(parts[1][:-1]) if len(parts) > 1 and parts[1] else 0
+        return round(hours + minutes / 60, 1)
+
+    df['Sleep Duration'] = df['Sleep Duration'].apply(convert_sleep_duration)
+
+    def convert_sleep_debt(debt):
+        if pd.isna(debt):
+            return debt
+        return float(debt.replace('hr', ''))
+
+    df['Sleep Debt'] = df['Sleep Debt'].apply(convert_sleep_debt)
+    df['Weight'] = df['Weight'].str.replace('kg', '').str.strip().astype(float)
+    return df.to_csv(index=False)
+
+
+def vectorized_parse(text, chunksize):
+    out = StringIO()
+    header = True
+    for frame in preprocess.parse_journal(StringIO(text), chunksize=chunksize):
+        frame.to_csv(out, index=False, header=header)
+        header = False
+    return out.getvalue()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--chunksize', type=int, default=preprocess.DEFAULT_CHUNKSIZE)
+    parser.add_argument('--skip-legacy', action='store_true', help="Only time the vectorized parser")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy rows/s':>15} {'vectorized rows/s':>18} {'speedup':>8}")
+    for n_rows in args.rows:
+        text = journal_text(n_rows)
+        new_csv, new_time = timed(vectorized_parse, text, args.chunksize)
+        if args.skip_legacy:
+            print(f"{n_rows:>10} {'-':>15} {n_rows / new_time:>18,.0f} {'-':>8}")
+            continue
+        old_csv, old_time = timed(legacy_parse, text)
+        if old_csv != new_csv:
+            raise SystemExit(f"Output mismatch at {n_rows} rows")
+        print(f"{n_rows:>10} {n_rows / old_time:>15,.0f} {n_rows / new_time:>18,.0f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Headless report throughput: reports per hour for a batch of synthetic users.
+
+Writes --users CSVs of --days each, then times report.build_reports on them
+with each --workers count (a fresh process pool per run, so worker start-up
+is included). Also prints the speedup over one worker and reports per hour
+per worker.
+
+    python benchmarks/bench_report.py --users 8 --days 1y --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import report  # noqa: E402
+from synthetic import SIZES, parse_days, write_csv  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=8, help='Reports per run, one per synthetic user')
+    parser.add_argument('--days', default='1y', help='Days per user, or one of ' + ', '.join(SIZES))
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                        help='Process pool sizes to time')
+    args = parser.parse_args()
+
+    n_days = parse_days(args.days)
+    print(f"{args.users} users x {n_days} days, {os.cpu_count()} cores")
+    print(f"{'workers':>7} {'s':>8} {'reports/h':>10} {'speedup':>8} {'per worker/h':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_paths = []
+        for user in range(args.users):
+            user_dir = os.path.join(tmp, 'in', f"user{user:03d}")
+            os.makedirs(user_dir)
+            csv_paths.append(os.path.join(user_dir, 'daily_data.csv'))
+            write_csv(csv_paths[-1], n_days, user)
+
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            report.build_reports(csv_paths, os.path.join(tmp, f"out{workers}"), workers)
+            elapsed = time.perf_counter() - start
+            per_hour = args.users / elapsed * 3600
+            baseline = baseline or per_hour
+            print(f"{workers:>7} {elapsed:>8.1f} {per_hour:>10,.0f} {per_hour / baseline:>7.2f}x {per_hour / workers:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Memory of the loaded frame with the default pandas dtypes versus schema.py.
+
+before: pd.read_csv with inferred dtypes (object/str text, float64 numbers)
+after:  app.load_csv, i.e. categoricals, Int8 feelings and float32 measurements
+
+Prints bytes per row for each size and a per-column report for the last one.
+
+    python benchmarks/bench_schema.py --days 1y 20y
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app  # noqa: E402
+import schema  # noqa: E402
+from synthetic import parse_days, write_csv  # noqa: E402
+
+
+def untyped(csv_path):
+    # load_csv as it was before the schema layer
+    df = pd.read_csv(csv_path, parse_dates=['Date'])
+    df['Feel Average'] = (df['Feeling Morning'] + df['Feeling Evening']) / 2
+    df['Sleep Duration'] = df['Sleep Duration'].interpolate()
+    df['Sleep Debt'] = df['Sleep Debt'].interpolate()
+    return df
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', nargs='+', default=['1y', '20y'])
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'before B/row':>13} {'after B/row':>12} {'saved':>6} {'before s':>9} {'after s':>8}")
+    report = None
+    for size in args.days:
+        n_days = parse_days(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'daily_data.csv')
+            write_csv(csv_path, n_days)
+            before, before_s = timed(untyped, csv_path)
+            after, after_s = timed(app.load_csv, csv_path, use_cache=False)
+
+        report = schema.memory_report(before, after)
+        total = report.loc['Total']
+        print(
+            f"{n_days:>6} {total['before']:>13.1f} {total['after']:>12.1f} {total['saved']:>6.0%} "
+            f"{before_s:>9.3f} {after_s:>8.3f}"
+        )
+
+    print()
+    print(report.to_string(float_format='{:.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Cold-start benchmark for app.py.
+
+Reports the `python -X importtime` total for `import app`, then, for each
+section, starts a fresh interpreter, opens the app on that section with
+Streamlit's AppTest and records the time to first render and the imports the
+render triggered. Use --max-import-ms to fail when a section's imports grow
+past a budget.
+
+    python benchmarks/bench_startup.py --json startup.json --max-import-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+APP = os.path.abspath(os.path.join(ROOT, 'app.py'))
+MARKER = "bench-startup: render"
+
+CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.query_params["section"] = {section!r}
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(str(at.exception))
+print(json.dumps({{"first_render_s": elapsed}}))
+"""
+
+
+def import_totals(stderr, after=None):
+    """Sums top-level `-X importtime` entries (after the `after` marker line, if given)."""
+    lines = stderr.splitlines()
+    if after is not None:
+        lines = lines[lines.index(after) + 1:]
+    total_us, modules = 0, []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  "):
+            continue  # nested import, already counted by its parent
+        total_us += int(cumulative)
+        modules.append((name.strip(), int(cumulative)))
+    modules.sort(key=lambda item: -item[1])
+    return total_us / 1000, modules[:5]
+
+
+def run(args, cwd):
+    # Prefetching off: its background imports would be counted against the section
+    env = dict(os.environ, DASHBOARD_PREFETCH_WORKERS="0")
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def main():
+    sys.path.insert(0, ROOT)
+    from app import SECTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=ROOT, help="Directory holding daily_data.csv")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if a section imports for longer")
+    args = parser.parse_args()
+
+    app_ms, app_top = import_totals(run(["-c", "import app"], ROOT).stderr)
+    results = {"import_app_ms": app_ms, "import_app_top": app_top, "sections": {}}
+    print(f"import app: {app_ms:,.0f} ms (heaviest: {', '.join(name for name, _ in app_top)})")
+
+    print(f"{'section':<26} {'first render s':>15} {'imports ms':>11}  heaviest imports")
+    for section in SECTIONS:
+        child = CHILD.format(app=APP, section=section, marker=MARKER)
+        proc = run(["-c", child], args.data_dir)
+        render_s = json.loads(proc.stdout.strip().splitlines()[-1])["first_render_s"]
+        imports_ms, top = import_totals(proc.stderr, after=MARKER)
+        results["sections"][section] = {"first_render_s": render_s, "imports_ms": imports_ms, "top": top}
+        print(f"{section:<26} {render_s:>15.2f} {imports_ms:>11,.0f}  {', '.join(name for name, _ in top[:3])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.max_import_ms is not None:
+        over = [s for s, r in results["sections"].items() if r["imports_ms"] > args.max_import_ms]
+        if over:
+            raise SystemExit(f"Import budget of {args.max_import_ms:.0f} ms exceeded by: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
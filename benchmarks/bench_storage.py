@@ -0,0 +1,98 @@
+"""
+Query latency of the SQLite backend versus the CSV path as history grows.
+
+Queries a view makes:
+
+range:  the rows of the last 90 days
+weekly: weekly means over the default history window (DASHBOARD_HISTORY_DAYS)
+all-wk: weekly means over the whole history
+
+csv:     parse the CSV, then filter / group in pandas (new process)
+cached:  in-memory data_cache hit, then filter / group in pandas (a rerun)
+sqlite:  storage.load_frame / storage.aggregate with the filter pushed down
+
+    python benchmarks/bench_storage.py --rows 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import app  # noqa: E402
+import data_cache  # noqa: E402
+import rollups  # noqa: E402
+import storage  # noqa: E402
+from synthetic import write_csv  # noqa: E402
+
+RANGE_DAYS = 90
+
+
+def timed(fn, repeat=5):
+    # Best of `repeat` runs
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pandas_range(df, start):
+    return df[df['Date'] >= start]
+
+
+def pandas_weekly(df):
+    # What the rollup store computes on its first update
+    return rollups.RollupStore().update(df).table('week')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'query':>7} {'csv ms':>9} {'cached ms':>10} {'sqlite ms':>10} {'vs csv':>7}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'daily_data.csv')
+            db_path = os.path.join(tmp, 'daily_data.db')
+            write_csv(csv_path, n_rows)
+            storage.migrate(csv_path, db_path)
+            last = storage.date_bounds(db_path)[1]
+            start = last - pd.Timedelta(days=RANGE_DAYS - 1)
+            window_start = last - pd.Timedelta(days=storage.DEFAULT_WINDOW_DAYS - 1)
+            repeat = 1 if n_rows >= 1_000_000 else 5
+
+            queries = {
+                'range': (
+                    lambda df: pandas_range(df, start),
+                    lambda: storage.load_frame(db_path, (start, None)),
+                ),
+                'weekly': (
+                    lambda df: pandas_weekly(pandas_range(df, window_start)),
+                    lambda: storage.aggregate(db_path, 'week', (window_start, None)),
+                ),
+                'all-wk': (
+                    pandas_weekly,
+                    lambda: storage.aggregate(db_path, 'week'),
+                ),
+            }
+            app.load_csv(csv_path)  # fills the in-memory cache
+            for name, (in_pandas, in_sqlite) in queries.items():
+                csv = timed(lambda: in_pandas(app.load_csv(csv_path, use_cache=False)), repeat)
+                cached = timed(lambda: in_pandas(app.load_csv(csv_path)), repeat)
+                sqlite = timed(in_sqlite, repeat)
+                print(
+                    f"{n_rows:>10} {name:>7} {csv * 1e3:>9.1f} {cached * 1e3:>10.1f} "
+                    f"{sqlite * 1e3:>10.1f} {csv / sqlite:>6.1f}x"
+                )
+            storage.close_all()
+            data_cache.clear()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+End-to-end benchmark on synthetic journals, from one month to 20 years.
+
+For every size it times, each in a fresh interpreter:
+
+parse:     preprocess.py turning each user's journal into daily_data.csv
+load_data: app.load_data on each user's CSV (no cache)
+sections:  each dashboard section, opened headless with Streamlit's AppTest on
+           the first user's data; `wall_s` is the first render and `rerun_s`
+           a second run of the same script (what a widget change costs)
+
+and records wall time and memory: `peak_rss_mb` is the process's high-water
+mark and `peak_delta_mb` how much the stage raised it above the imports.
+Results go to --json; pass a previous file as --baseline to print ratios.
+
+    python benchmarks/bench_suite.py --days 1m 1y 20y --users 3 --json suite.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, ROOT)
+import synthetic  # noqa: E402
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10  # bytes on macOS, KiB elsewhere
+
+{setup}
+before = peak_rss_mb()
+start = time.perf_counter()
+{stage}
+result = {{"wall_s": time.perf_counter() - start}}
+{after}
+result["peak_rss_mb"] = peak_rss_mb()
+result["peak_delta_mb"] = result["peak_rss_mb"] - before
+print(json.dumps(result))
+"""
+
+PARSE = dict(
+    setup="import preprocess",
+    stage=(
+        "for journal, csv in {paths!r}:\n"
+        "    preprocess.write_daily_csv(preprocess.parse_journal(journal), csv)"
+    ),
+    after="",
+)
+
+LOAD_DATA = dict(
+    setup="import app",
+    stage="for csv in {csvs!r}:\n    app.load_data(csv, use_cache=False)",
+    after="",
+)
+
+SECTION = dict(
+    setup=(
+        "from streamlit.testing.v1 import AppTest\n"
+        "at = AppTest.from_file({app!r}, default_timeout=3600)\n"
+        "at.query_params['section'] = {section!r}"
+    ),
+    stage="at.run()",
+    after=(
+        "if at.exception:\n"
+        "    raise SystemExit(str(at.exception))\n"
+        "start = time.perf_counter()\n"
+        "at.run()\n"
+        "result['rerun_s'] = time.perf_counter() - start"
+    ),
+)
+
+
+def run_child(template, cwd, **fields):
+    code = CHILD.format(
+        root=ROOT,
+        setup=template["setup"].format(**fields),
+        stage=template["stage"].format(**fields),
+        after=template["after"],
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"Benchmark child failed:\n{proc.stderr or proc.stdout}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def baseline_ratios(results, baseline_path):
+    with open(baseline_path) as f:
+        previous = {(r["days"], r["users"], r["stage"]): r for r in json.load(f)["results"]}
+    ratios = {}
+    for r in results:
+        old = previous.get((r["days"], r["users"], r["stage"]))
+        if old:
+            ratios[(r["days"], r["stage"])] = r["wall_s"] / old["wall_s"]
+    return ratios
+
+
+def main():
+    from app import SECTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", nargs="+", default=["1m", "1y", "5y", "20y"],
+                        help="Days, or one of " + ", ".join(synthetic.SIZES))
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sections", nargs="+", default=SECTIONS, choices=SECTIONS, metavar="SECTION")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    args = parser.parse_args()
+
+    results = []
+    app_path = os.path.join(ROOT, "app.py")
+    print(f"{'days':>6} {'stage':<26} {'wall s':>8} {'rerun s':>8} {'peak MB':>8} {'+MB':>7}")
+    for size in args.days:
+        n_days = synthetic.parse_days(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for user in range(args.users):
+                user_dir = os.path.join(tmp, f"user_{user:03d}")
+                os.makedirs(user_dir)
+                journal = os.path.join(user_dir, "journal.md")
+                synthetic.write_journal(journal, n_days, user, args.seed)
+                paths.append((journal, os.path.join(user_dir, "daily_data.csv")))
+            first_user = os.path.dirname(paths[0][1])
+
+            stages = [
+                ("parse", PARSE, dict(paths=paths)),
+                ("load_data", LOAD_DATA, dict(csvs=[csv for _, csv in paths])),
+            ]
+            stages += [(section, SECTION, dict(app=app_path, section=section)) for section in args.sections]
+            for stage, template, fields in stages:
+                result = run_child(template, first_user, **fields)
+                result.update(days=n_days, users=args.users, stage=stage)
+                results.append(result)
+                rerun = f"{result['rerun_s']:>8.2f}" if "rerun_s" in result else f"{'-':>8}"
+                print(
+                    f"{n_days:>6} {stage:<26} {result['wall_s']:>8.2f} {rerun} "
+                    f"{result['peak_rss_mb']:>8.0f} {result['peak_delta_mb']:>7.0f}"
+                )
+
+    if args.baseline:
+        print(f"\nwall time versus {args.baseline}:")
+        for (n_days, stage), ratio in baseline_ratios(results, args.baseline).items():
+            print(f"{n_days:>6} {stage:<26} {ratio:>7.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
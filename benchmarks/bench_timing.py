@@ -0,0 +1,48 @@
+"""
+Per-call cost of timing.span with recording off and on.
+
+    python benchmarks/bench_timing.py --calls 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import timing  # noqa: E402
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def bare(calls):
+    for _ in range(calls):
+        pass
+
+
+def spans(calls):
+    for _ in range(calls):
+        with timing.span("bench"):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    baseline = per_call_ns(bare, args.calls)
+    timing.enable(False)
+    off = per_call_ns(spans, args.calls) - baseline
+    timing.enable(True)
+    on = per_call_ns(spans, args.calls) - baseline
+    timing.reset()
+
+    print(f"span overhead per call: off {off:,.0f} ns, on {on:,.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
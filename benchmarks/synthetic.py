@@ -0,0 +1,184 @@
+"""
+Deterministic synthetic journals in the format preprocess.py parses.
+
+Every cell follows the conventions of the bundled table: `[[YYYY-MM-DD]]`
+dates, `82 kg` / `82kg` weights, `7hr26m/<br>3.3hr` sleep cells, `101-150`
+AQI ranges or single readings, `Name/Duration` activities and
+`Breakfast/<br>Lunch/<br>Dinner` meals (with brand:item entries, composite
+dinners and stray trailing `<br>`s), plus the occasional `None`. The same
+(days, user, seed) always produces the same journal, and each user gets an
+independent random stream, so runs can be compared across machines.
+
+    python benchmarks/synthetic.py --days 1m 1y 20y --users 3 --out /tmp/journals
+
+writes user_000_1y.md (the journal) and user_000_1y.csv (its preprocess.py
+output) for every size and user.
+"""
+import argparse
+import os
+import sys
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import preprocess  # noqa: E402
+
+START = '2005-01-01'
+# Histories end by the last day of pandas' nanosecond timestamps, starting
+# before START when they must. Longer ones than that range holds (about 584
+# years) start at START and need pandas >= 3, which parses microsecond dates.
+FIRST_DAY = np.datetime64(pd.Timestamp.min.ceil('D').date())
+LAST_DAY = np.datetime64(pd.Timestamp.max.date())
+
+# Named sizes accepted wherever a number of days is
+SIZES = {'1m': 31, '1y': 365, '5y': 1826, '20y': 7305}
+
+WEATHER = ['Sunny', 'Cloudy', 'Rainy', 'Windy', 'Foggy', 'Snowy', 'Sunny, Windy', 'Cloudy, Rainy']
+ACTIVITIES = ['Running/30m', 'Gym/1hr', 'Swimming/45m', 'Cycling/1hr30m', 'Walking/20m', 'Yoga/40m']
+AIR_RANGES = ['0-50', '51-100', '50-150', '101-150', '151-200', '201-300']
+BREAKFASTS = ['Subway:Egg&Mayo', 'Skip', 'Oatmeal', 'Toast', 'Starbucks:Croissant', 'Congee', 'Yogurt']
+LUNCHES = ['Tamjai', 'KFC', 'Japanese Curry', 'Salad', 'Ramen', 'Subway:Tuna', 'Skip']
+DINNERS = [
+    'Snacks', 'McDonald', 'Indian food', 'Boiled Noodle', 'Baked Fish/Pasta', 'Hotpot', 'Steak',
+    'Skip', 'Rice/Chicken',
+]
+
+# Share of cells written as `None`
+MISSING = 0.03
+
+
+def parse_days(value):
+    """Number of days for '20y'-style names or plain integers."""
+    return SIZES[value] if value in SIZES else int(value)
+
+
+def _rng(user, seed):
+    return np.random.default_rng([seed, user])
+
+
+def _pick(rng, choices, n):
+    return pd.Series(np.asarray(choices, dtype=object)[rng.integers(0, len(choices), n)])
+
+
+def _with_missing(rng, cells):
+    return cells.where(rng.random(len(cells)) >= MISSING, 'None')
+
+
+def journal_frame(n_days, user=0, seed=0, start=START):
+    """Raw journal cells for `n_days` consecutive days, one column per table column."""
+    rng = _rng(user, seed)
+    start = np.datetime64(start, 'D')
+    if n_days <= (LAST_DAY - FIRST_DAY).astype(int) + 1:
+        start = min(start, LAST_DAY - (n_days - 1))
+    dates = pd.date_range(start, periods=n_days, freq='D', unit='s')
+
+    # Slow random walk around a per-user baseline
+    weight = 70 + 15 * rng.random() + np.cumsum(rng.normal(0, 0.15, n_days))
+    weight = pd.Series(np.round(weight * 2) / 2).map('{:g}'.format)
+    weight = weight + pd.Series(np.where(rng.random(n_days) < 0.5, ' kg', 'kg'))
+
+    hours = rng.integers(4, 10, n_days)
+    minutes = rng.integers(0, 60, n_days)
+    minutes[rng.random(n_days) < 0.1] = 0  # written as `7hr`
+    debt = np.round(rng.uniform(0, 6, n_days), 1)
+    sleep = (
+        pd.Series(hours).astype(str) + 'hr'
+        + pd.Series(np.where(minutes > 0, pd.Series(minutes).astype(str) + 'm', ''))
+        + '/<br>' + pd.Series(debt).map('{:.1f}hr'.format)
+    )
+
+    air = _pick(rng, AIR_RANGES, n_days)
+    single = rng.random(n_days) < 0.2
+    air[single] = pd.Series(rng.integers(20, 250, n_days)).astype(str)[single]
+
+    activity = _pick(rng, ACTIVITIES, n_days).where(rng.random(n_days) < 0.3, 'None')
+
+    trailing = pd.Series(np.where(rng.random(n_days) < 0.2, '<br>', ''))
+    meals = (
+        _pick(rng, BREAKFASTS, n_days) + '/<br>' + _pick(rng, LUNCHES, n_days) + '/<br>'
+        + _pick(rng, DINNERS, n_days) + trailing
+    )
+
+    return pd.DataFrame({
+        'Date': '[[' + pd.Series(dates.strftime('%Y-%m-%d')) + ']]',
+        'Weather': _with_missing(rng, _pick(rng, WEATHER, n_days)),
+        'Weight': _with_missing(rng, weight),
+        'Feeling Morning': _with_missing(rng, pd.Series(rng.integers(1, 11, n_days)).astype(str)),
+        'Feeling Evening': _with_missing(rng, pd.Series(rng.integers(1, 11, n_days)).astype(str)),
+        'Physical Activity': activity,
+        'Slept Hours': _with_missing(rng, sleep),
+        'Meals': meals,
+        'Air': _with_missing(rng, air),
+    })
+
+
+def journal_text(n_days, user=0, seed=0, start=START):
+    """The journal as markdown: the bundled header and template rows, then one row per day."""
+    lines = [line for line in preprocess.markdown_data.splitlines() if line.strip()]
+    cells = journal_frame(n_days, user, seed, start)
+    rows = '| ' + cells[cells.columns[0]]
+    for col in cells.columns[1:]:
+        rows = rows + ' | ' + cells[col]
+    return '\n'.join(lines[:3] + (rows + ' |').tolist()) + '\n'
+
+
+def write_journal(path, n_days, user=0, seed=0, start=START):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(journal_text(n_days, user, seed, start))
+
+
+def write_csv(path, n_days, user=0, seed=0, start=START):
+    """Writes the CSV preprocess.py produces from the same journal."""
+    text = journal_text(n_days, user, seed, start)
+    preprocess.write_daily_csv(preprocess.parse_journal(StringIO(text)), path)
+
+
+def write_notes(directory, n_days, user=0, seed=0, start=START, style='mixed'):
+    """
+    Writes one daily note per day under directory/YYYY/YYYY-MM-DD.md, as a
+    one-row table ('table'), front matter ('front-matter') or alternating ('mixed').
+    Returns the paths written.
+    """
+    header = [line for line in preprocess.markdown_data.splitlines() if line.strip()][:2]
+    cells = journal_frame(n_days, user, seed, start)
+    paths = []
+    for i, row in enumerate(cells.itertuples(index=False)):
+        date = row[0].strip('[]')
+        path = os.path.join(directory, date[:4], f"{date}.md")
+        if style == 'table' or (style == 'mixed' and i % 2 == 0):
+            text = '\n'.join(header + ['| ' + ' | '.join(row) + ' |'])
+        else:
+            fields = [
+                f"{col.lower().replace(' ', '_')}: {value.replace('<br>', '')}"
+                for col, value in zip(cells.columns[1:], row[1:])
+            ]
+            text = '\n'.join(['---'] + fields + ['---', '', f"Notes for {row[0]}"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', nargs='+', default=['1m', '1y', '20y'], help="Days, or one of " + ", ".join(SIZES))
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help="Directory to write into")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for size in args.days:
+        n_days = parse_days(size)
+        for user in range(args.users):
+            base = os.path.join(args.out, f"user_{user:03d}_{size}")
+            write_journal(base + '.md', n_days, user, args.seed)
+            write_csv(base + '.csv', n_days, user, args.seed)
+            print(f"{base}.md, {base}.csv: {n_days} days")
+
+
+if __name__ == '__main__':
+    main()
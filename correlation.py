@@ -0,0 +1,266 @@
+"""
+Incremental pairwise correlation statistics.
+
+CorrelationEngine keeps, for every pair of columns (i, j), the count of rows where
+both are present, the means of i and j over those rows, their centered second
+moments and the co-moment. A batch of new rows is summarized with a few matrix
+products and merged into the running state with Chan et al.'s parallel form of
+Welford's update, so adding rows costs O(rows * columns^2) and never rescans
+history. Missing values are handled pairwise, matching DataFrame.corr().
+
+For windowed queries the engine also keeps cumulative per-row pair sums
+(shifted by a fixed reference to limit cancellation). Any date range is the
+difference of two prefixes, and every rolling window is computed at once.
+
+Heatmaps are cached as PNG bytes until the statistics they show change;
+seaborn is only imported when the first one is drawn.
+"""
+import itertools
+import threading
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+import fitting
+import render_cache
+import timing
+
+# Engines kept per process; one over a 20-year history holds about 11 MB of
+# prefix sums, plus up to as much again of room to append into
+MAX_ENGINES = 4
+
+# Window variances below this fraction of the prefixes' sums of squares count
+# as zero; differencing leaves about 1e-16 of them behind
+_VARIANCE_RTOL = 1e-12
+
+# Identifies an engine in heatmap keys; unlike id(), never reused after eviction
+_serials = itertools.count()
+
+
+def _corr_from_sums(n, sx, sy, sxx, syy, sxy, floor_x, floor_y):
+    # Pearson r from (shifted) raw pair sums; NaN where undefined. Variances
+    # at or below the floors are rounding left over from differencing two
+    # prefixes, i.e. a column constant over the rows.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    r[(n < 2) | ~(var_x > floor_x) | ~(var_y > floor_y)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def _variance_floor(lower, upper):
+    # Rounding bound for the variances of the rows between two prefixes
+    return _VARIANCE_RTOL * (lower[2] + upper[2])
+
+
+def _grow(buffer, capacity, used):
+    # `buffer` with room for `capacity` rows, keeping its first `used`
+    grown = np.empty((capacity, *buffer.shape[1:]), dtype=buffer.dtype)
+    grown[:used] = buffer[:used]
+    return grown
+
+
+class CorrelationEngine:
+    """Running pairwise correlation statistics over `columns`."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.serial = next(_serials)
+        self.version = 0
+        self.watermark = None
+        self._n_rows = 0
+        self._fingerprint = 0
+        self._shift = None
+        self._lock = threading.Lock()
+
+        # Running state per pair (i, j), over rows where both are present
+        self._n = np.zeros((k, k))
+        self._mean_x = np.zeros((k, k))  # mean of column i
+        self._m2_x = np.zeros((k, k))    # sum of squared deviations of column i
+        self._c_xy = np.zeros((k, k))    # co-moment of columns i and j
+
+        # Cumulative shifted sums per row, for date-range and rolling queries.
+        # The buffers grow by doubling; the first _size rows are in use (plus
+        # the leading zero row of the sums).
+        self._size = 0
+        self._dates_buffer = np.empty(0, dtype="datetime64[us]")
+        self._cum_buffer = np.zeros((1, 4, k, k))  # n, sum x, sum x^2, sum xy
+
+    @property
+    def _dates(self):
+        return self._dates_buffer[:self._size]
+
+    @property
+    def _cum(self):
+        return self._cum_buffer[:self._size + 1]
+
+    def _hashes(self, df):
+        return pd.util.hash_pandas_object(df[["Date"] + self.columns], index=False)
+
+    def _reset(self):
+        # Keeps the lock (held by the caller) and keeps counting versions, so
+        # heatmaps cached for the old data are never served for the new data
+        lock, version = self._lock, self.version
+        self.__init__(self.columns)
+        self._lock, self.version = lock, version
+
+    def _merge(self, values):
+        # Summarize the batch per pair, then fold it into the running state
+        present = ~np.isnan(values)
+        mask = present.astype(float)
+        batch_mean = fitting.column_means(values, present)
+        centered = np.where(present, values - batch_mean, 0.0)
+
+        n_b = mask.T @ mask
+        s_x = centered.T @ mask
+        s_xx = (centered ** 2).T @ mask
+        s_xy = centered.T @ centered
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, s_x / n_b, 0.0)
+        m2_b = s_xx - mean_b * s_x
+        c_b = s_xy - mean_b * s_x.T
+        mean_b = mean_b + batch_mean[:, None]
+
+        n_a = self._n
+        n = n_a + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(n > 0, n_a * n_b / n, 0.0)
+            fraction = np.where(n > 0, n_b / n, 0.0)
+        delta = np.where(n_b > 0, mean_b - self._mean_x, 0.0)
+        self._mean_x = self._mean_x + delta * fraction
+        self._m2_x = self._m2_x + m2_b + delta ** 2 * weight
+        self._c_xy = self._c_xy + c_b + delta * delta.T * weight
+        self._n = n
+
+    def _append_prefix(self, dates, values):
+        present = ~np.isnan(values)
+        if self._shift is None:
+            self._shift = fitting.column_means(values, present)
+        shifted = np.where(present, values - self._shift, 0.0)
+        mask = present.astype(float)
+        rows = np.stack([
+            np.einsum("ri,rj->rij", mask, mask),
+            np.einsum("ri,rj->rij", shifted, mask),
+            np.einsum("ri,rj->rij", shifted ** 2, mask),
+            np.einsum("ri,rj->rij", shifted, shifted),
+        ], axis=1)
+        size = self._size + len(rows)
+        if size + 1 > len(self._cum_buffer):
+            # Amortized O(1) per row: copy into twice the room, not on every append
+            capacity = max(size + 1, 2 * len(self._cum_buffer))
+            self._cum_buffer = _grow(self._cum_buffer, capacity, self._size + 1)
+            self._dates_buffer = _grow(self._dates_buffer, capacity, self._size)
+        self._cum_buffer[self._size + 1:size + 1] = self._cum_buffer[self._size] + np.cumsum(rows, axis=0)
+        self._dates_buffer[self._size:size] = dates.to_numpy().astype("datetime64[us]")
+        self._size = size
+
+    def update(self, df):
+        """Adds rows of `df` newer than the last update; rebuilds if older rows changed."""
+        df = df[df["Date"].notna()]
+        with self._lock:
+            hashes = self._hashes(df)
+            if self.watermark is not None:
+                seen = (df["Date"] <= self.watermark).to_numpy()
+                if seen.sum() != self._n_rows or hashes[seen].sum() != self._fingerprint:
+                    self._reset()
+                    new = df
+                else:
+                    new = df[~seen]
+            else:
+                new = df
+
+            if len(new):
+                new = new.sort_values("Date", kind="stable")
+                values = new[self.columns].to_numpy(dtype=float)
+                self._merge(values)
+                self._append_prefix(new["Date"], values)
+                self.version += 1
+
+            self.watermark = df["Date"].max() if len(df) else None
+            self._n_rows = len(df)
+            self._fingerprint = hashes.sum() if len(df) else 0
+        return self
+
+    def matrix(self, start=None, end=None):
+        """Correlation matrix over the whole history, or rows dated in [start, end]."""
+        with self._lock:
+            if start is None and end is None:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    r = self._c_xy / np.sqrt(self._m2_x * self._m2_x.T)
+                r[(self._n < 2) | ~(self._m2_x > 0) | ~(self._m2_x.T > 0)] = np.nan
+                r = np.clip(r, -1.0, 1.0)
+            else:
+                lo = 0 if start is None else np.searchsorted(self._dates, np.datetime64(start, "us"), "left")
+                hi = len(self._dates) if end is None else np.searchsorted(self._dates, np.datetime64(end, "us"), "right")
+                n, sx, sxx, sxy = self._cum[hi] - self._cum[lo]
+                floor = _variance_floor(self._cum[lo], self._cum[hi])
+                r = _corr_from_sums(n, sx, sx.T, sxx, sxx.T, sxy, floor, floor.T)
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def rolling(self, window_days):
+        """
+        Correlation matrices over the trailing `window_days` days ending at each
+        row, computed for every row at once. Returns (dates, array of shape
+        (rows, columns, columns)).
+        """
+        with self._lock:
+            dates = self._dates
+            ends = np.arange(1, len(dates) + 1)
+            starts = np.searchsorted(dates, dates - np.timedelta64(window_days, "D"), "right")
+            n, sx, sxx, sxy = np.moveaxis(self._cum[ends] - self._cum[starts], 1, 0)
+            floor = _variance_floor(np.moveaxis(self._cum[starts], 1, 0), np.moveaxis(self._cum[ends], 1, 0))
+        r = _corr_from_sums(
+            n, sx, np.swapaxes(sx, 1, 2), sxx, np.swapaxes(sxx, 1, 2), sxy, floor, np.swapaxes(floor, 1, 2)
+        )
+        return pd.DatetimeIndex(dates, name="Date"), r
+
+    def rolling_pair(self, x, y, window_days):
+        """Rolling correlation of columns `x` and `y` as a Series indexed by date."""
+        dates, r = self.rolling(window_days)
+        i, j = self.columns.index(x), self.columns.index(y)
+        return pd.Series(r[:, i, j], index=dates, name=f"{x} vs {y}")
+
+
+# One engine per (dataset, columns), shared across Streamlit reruns in this
+# process. Bounded by count: engines grow as rows are appended, so their size
+# when cached says little. The least recently used is dropped.
+_engines = render_cache.LRUCache(max_entries=MAX_ENGINES)
+_engines_lock = threading.Lock()
+
+heatmap_cache = render_cache.LRUCache(max_bytes=8 * 2**20)
+
+
+def engine_for(df, columns, key=None):
+    """Returns the up-to-date CorrelationEngine for `df` over `columns`."""
+    key = (key or df.attrs.get("source", "default"), tuple(columns))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = CorrelationEngine(columns)
+            _engines.put(key, engine)
+    return engine.update(df)
+
+
+def heatmap_png(engine, start=None, end=None):
+    """Annotated heatmap of engine.matrix(start, end) as PNG bytes, cached per version."""
+    key = (engine.serial, engine.version, start, end)
+    png = heatmap_cache.get(key)
+    if png is None:
+        import seaborn as sns
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=render_cache.FIGSIZE)
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
+        sns.heatmap(engine.matrix(start, end), annot=True, cmap="coolwarm", ax=ax)
+        buffer = BytesIO()
+        with timing.span("matplotlib.rasterize"):
+            fig.savefig(buffer, format="png", dpi=render_cache.DPI, bbox_inches="tight")
+        png = buffer.getvalue()
+        heatmap_cache.put(key, png)
+    return png
@@ -0,0 +1,110 @@
+"""
+Typed columnar cache for the frame returned by loader.load_csv.
+
+The prepared frame (derived columns included) is written as Parquet next to the
+CSV, e.g. daily_data.csv -> daily_data.csv.cache.parquet. The CSV's mtime and size
+are stored in the file metadata; when either changes the cache is ignored and
+rebuilt. Recently loaded frames are also kept in memory, so Streamlit reruns in
+the same process skip the disk read as well. The memory layer is an LRU bounded
+by the frames' deep memory usage (MEMORY_BYTES), so a server loading many
+users' CSVs keeps only the most recent.
+
+Parquet support comes from pyarrow, imported on the first disk access so an
+in-memory hit never pays for it. Without pyarrow the disk cache is disabled
+and load_data falls back to parsing the CSV in each new process.
+"""
+import os
+
+import render_cache
+
+# Bump when load_data derives different columns or dtypes, so old caches are rebuilt
+CACHE_VERSION = 3
+
+_METADATA_KEY = b"daily_data_cache"
+
+# Frames kept in memory across all CSVs, by pandas' deep memory usage
+MEMORY_BYTES = 256 * 2**20
+
+# Last frame loaded per CSV path: {abs path: (signature, frame)}
+_memory = render_cache.LRUCache(
+    max_bytes=MEMORY_BYTES,
+    sizeof=lambda entry: int(entry[1].memory_usage(deep=True).sum()),
+)
+
+
+def _arrow():
+    # Returns (pyarrow, pyarrow.parquet), or (None, None) when pyarrow is missing
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # pragma: no cover - pyarrow ships with streamlit
+        return None, None
+    return pa, pq
+
+
+def cache_path(csv_path):
+    return f"{csv_path}.cache.parquet"
+
+
+def csv_signature(csv_path, settings=""):
+    """
+    Identifies the current contents of the CSV by version, mtime and size,
+    plus any `settings` the prepared frame depends on.
+    """
+    stat = os.stat(csv_path)
+    return f"{CACHE_VERSION}:{stat.st_mtime_ns}:{stat.st_size}:{settings}"
+
+
+def load(csv_path, signature):
+    """Returns the cached frame for `csv_path` if it matches `signature`, else None."""
+    key = os.path.abspath(csv_path)
+    hit = _memory.get(key)
+    if hit is not None and hit[0] == signature:
+        return hit[1].copy()
+
+    path = cache_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    pa, pq = _arrow()
+    if pq is None:
+        return None
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(_METADATA_KEY, b"").decode() != signature:
+            return None
+        df = pq.read_table(path).to_pandas()
+    except (OSError, pa.ArrowException):
+        # A truncated or foreign file is treated as a miss and overwritten later
+        return None
+
+    _memory.put(key, (signature, df))
+    return df.copy()
+
+
+def store(csv_path, df, signature):
+    """Writes `df` to the cache for `csv_path`, tagged with `signature`."""
+    _memory.put(os.path.abspath(csv_path), (signature, df.copy()))
+    pa, pq = _arrow()
+    if pa is None:
+        return
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_METADATA_KEY] = signature.encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temporary file first so a concurrent reader never sees half a file
+    path = cache_path(csv_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only data directory just means running without the disk cache
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def clear():
+    """Drops the in-memory layer (the Parquet files are left on disk)."""
+    _memory.clear()
@@ -0,0 +1,127 @@
+"""
+Server-side downsampling for the Plotly charts.
+
+Charts are cut to the visible x range first, then reduced to a point budget
+before the figure is built, so the payload sent to the browser stays bounded
+however long the history is:
+
+- line charts use Largest-Triangle-Three-Buckets (LTTB), which keeps the visual
+  shape, or min/max bucketing, which keeps every extreme;
+- bar charts average each bucket, since a bar per raw point is unreadable anyway.
+
+Line charts with more than WEBGL_THRESHOLD points left switch to WebGL traces.
+Both limits can be set through the DASHBOARD_POINT_BUDGET and
+DASHBOARD_WEBGL_THRESHOLD environment variables.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+POINT_BUDGET = int(os.environ.get("DASHBOARD_POINT_BUDGET", 2000))
+WEBGL_THRESHOLD = int(os.environ.get("DASHBOARD_WEBGL_THRESHOLD", 1000))
+
+
+def _numeric_x(x):
+    # LTTB needs distances along x; dates become microseconds, labels their position
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.to_numpy().astype("datetime64[us]").astype(np.int64).astype(float)
+    if pd.api.types.is_numeric_dtype(x):
+        return x.to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the `n_out` points LTTB keeps from the series (x, y)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average point of every bucket in one pass; the "bucket" after the last one
+    # is the final point itself
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_starts = np.append(starts[1:], n - 1)
+    next_ends = np.append(ends[1:], n)
+    count = next_ends - next_starts
+    avg_x = (cum_x[next_ends] - cum_x[next_starts]) / count
+    avg_y = (cum_y[next_ends] - cum_y[next_starts]) / count
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = starts[i], ends[i]
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (avg_y[i] - y[a])
+        )
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out):
+    """Indices of the min and max of each of n_out / 2 equal-width buckets."""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    bucket = np.arange(n) * (n_out // 2) // n
+    # Sorted by (bucket, y): each bucket's first entry is its min, its last its max
+    order = np.lexsort((y, bucket))
+    first = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+    last = np.append(first[1:], n) - 1
+    return np.unique(np.concatenate((order[first], order[last])))
+
+
+def _visible(df, x_col, x_range):
+    if x_range is None:
+        return df
+    lo, hi = x_range
+    return df[(df[x_col] >= lo) & (df[x_col] <= hi)]
+
+
+def downsample_lines(df, x_col, y_cols, max_points=None, method="lttb", x_range=None):
+    """
+    Rows of `df` to plot as lines: the visible range, reduced so each y column
+    keeps at most `max_points` points. Rows picked for any column are kept.
+    """
+    max_points = max_points or POINT_BUDGET
+    df = _visible(df, x_col, x_range)
+    if len(df) <= max_points:
+        return df
+
+    x = _numeric_x(df[x_col])
+    keep = []
+    for col in y_cols:
+        values = df[col].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        if method == "minmax":
+            picked = minmax_indices(values[valid], max_points)
+        else:
+            picked = lttb_indices(x[valid], values[valid], max_points)
+        keep.append(valid[picked])
+    return df.iloc[np.unique(np.concatenate(keep))] if keep else df.iloc[:0]
+
+
+def downsample_bars(df, x_col, y_cols, max_points=None, x_range=None):
+    """
+    The visible range of `df` with at most `max_points` bars: consecutive rows
+    are averaged into buckets, each labelled with its first x value.
+    """
+    max_points = max_points or POINT_BUDGET
+    df = _visible(df, x_col, x_range)
+    if len(df) <= max_points:
+        return df
+    bucket = np.arange(len(df)) * max_points // len(df)
+    grouped = df.groupby(bucket, sort=False)
+    out = grouped[y_cols].mean()
+    out.insert(0, x_col, grouped[x_col].first())
+    return out.reset_index(drop=True)
+
+
+def use_webgl(n_points):
+    return n_points > WEBGL_THRESHOLD
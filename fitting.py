@@ -0,0 +1,62 @@
+"""
+Helpers shared by the fitted statistics: correlation, regression, meals and
+response_surface.
+
+FitCache keeps one fitted result per dataset key. An entry is reused while the
+fingerprint of the columns it was fitted on is unchanged. The least recently
+used datasets are dropped once the NumPy arrays of the cached results pass a
+byte budget, so a long-running server holding many users' histories stays
+bounded.
+"""
+import numpy as np
+import pandas as pd
+
+import render_cache
+
+
+def solve(a, b, rcond=1e-15):
+    """
+    Batched least-squares solve of a @ x = b over the leading axes. pinv copes
+    with singular systems (e.g. a constant column) by returning the
+    minimum-norm solution.
+    """
+    return (np.linalg.pinv(a, rcond=rcond) @ b[..., None])[..., 0]
+
+
+def column_means(values, present):
+    """Mean of each column over its present values, 0 for empty columns."""
+    counts = present.sum(axis=0)
+    sums = np.where(present, values, 0.0).sum(axis=0)
+    return sums / np.maximum(counts, 1)
+
+
+def fingerprint(df, columns):
+    return int(pd.util.hash_pandas_object(df[list(columns)], index=False).sum())
+
+
+def nbytes(fitted):
+    # The arrays an object holds directly, which dominate a fitted result's size
+    return sum(value.nbytes for value in vars(fitted).values() if isinstance(value, np.ndarray))
+
+
+class FitCache:
+    """Fitted results per dataset key, bounded by the bytes of their arrays."""
+
+    def __init__(self, max_bytes):
+        self._entries = render_cache.LRUCache(max_bytes, sizeof=lambda entry: nbytes(entry[1]))
+
+    def get(self, key, df, columns, fit):
+        """The result cached for `key` while df[columns] is unchanged, else fit() (then cached)."""
+        current = fingerprint(df, columns)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == current:
+            return cached[1]
+        fitted = fit()
+        self._entries.put(key, (current, fitted))
+        return fitted
+
+    def stats(self):
+        return self._entries.stats()
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,211 @@
+"""
+Missing-data imputation, run once when the daily data is ingested.
+
+impute() reindexes the frame to a complete daily calendar (days missing from
+the journal become rows of missing values) and fills the gaps of each column
+with its strategy:
+
+    "interpolate"     linear in time between the recorded days either side
+    "ffill"           the last recorded value
+    "rolling_median"  median of the recorded values within ROLLING_DAYS days, centred
+    "none"            left missing
+
+Interpolation and forward fill only bridge gaps of up to MAX_GAP days, so a
+long break in the journal stays missing instead of becoming an invented ramp
+or plateau; the rolling median needs ROLLING_MIN_PERIODS recorded values in
+its window. Text columns only take "ffill" or "none", and whole-number columns
+(the feelings) are rounded so they keep their dtype.
+
+All columns are filled in one pass over a (days x columns) matrix: the
+previous and next recorded day of every cell come from running max/min
+accumulations shared by all strategies. Which cells were filled is kept in
+the MASK_COLUMN column, one uint16 per day with a bit per column (BITS) plus
+ADDED_DAY for days absent from the journal; imputed_cells(), recorded_days()
+and observed() read it back.
+
+STRATEGIES can be overridden per column with DASHBOARD_IMPUTE, e.g.
+DASHBOARD_IMPUTE="Air=ffill,Feeling Evening=none".
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+STRATEGY_NAMES = ("interpolate", "ffill", "rolling_median", "none")
+
+# Strategy per column; columns not listed (the text columns) are left missing
+DEFAULT_STRATEGIES = {
+    "Weight": "interpolate",
+    "Feeling Morning": "rolling_median",
+    "Feeling Evening": "rolling_median",
+    "Air": "rolling_median",
+    "Sleep Duration": "interpolate",
+    "Sleep Debt": "interpolate",
+}
+
+MAX_GAP = int(os.environ.get("DASHBOARD_IMPUTE_MAX_GAP", 7))
+ROLLING_DAYS = 7
+ROLLING_MIN_PERIODS = 3
+
+MASK_COLUMN = "Imputed"
+
+# Bit of each journal column in MASK_COLUMN
+BITS = {col: bit for bit, col in enumerate(col for col in schema.COLUMNS if col != "Date")}
+ADDED_DAY = 1 << 15
+
+# Derived columns count as imputed where any of their inputs is
+DERIVED_FROM = {"Feel Average": ("Feeling Morning", "Feeling Evening")}
+
+
+def parse_strategies(text, defaults=DEFAULT_STRATEGIES):
+    """`defaults` overridden by "Column=strategy,..." pairs."""
+    strategies = dict(defaults)
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        column, sep, strategy = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected Column=strategy, got {item!r}")
+        strategies[column.strip()] = strategy.strip()
+    return strategies
+
+
+STRATEGIES = parse_strategies(os.environ.get("DASHBOARD_IMPUTE", ""))
+
+
+def settings():
+    """The active configuration as text, so caches of imputed frames can key on it."""
+    return ",".join(f"{col}={strategy}" for col, strategy in sorted(STRATEGIES.items())) + f";gap={MAX_GAP}"
+
+
+def _check(df, strategies):
+    for col, strategy in strategies.items():
+        if col not in BITS:
+            raise ValueError(f"Cannot impute {col!r}; columns: {', '.join(BITS)}")
+        if strategy not in STRATEGY_NAMES:
+            raise ValueError(f"Unknown strategy {strategy!r} for {col}, expected one of {STRATEGY_NAMES}")
+        if col in df and isinstance(df[col].dtype, pd.CategoricalDtype) and strategy not in ("ffill", "none"):
+            raise ValueError(f"{col} is text; it can only use 'ffill' or 'none', not {strategy!r}")
+
+
+def _rolling_median(values, days, min_periods):
+    # Centred rolling median of every column, ignoring NaN: NaN sorts last, so
+    # the median of the c recorded values in a window sits at (c - 1) // 2 and c // 2
+    half = days // 2
+    padded = np.pad(values, ((half, half), (0, 0)), constant_values=np.nan)
+    windows = np.sort(np.lib.stride_tricks.sliding_window_view(padded, days, axis=0), axis=-1)
+    counts = (~np.isnan(windows)).sum(axis=-1)
+    low = np.take_along_axis(windows, np.maximum(counts - 1, 0)[..., None] // 2, axis=-1)[..., 0]
+    high = np.take_along_axis(windows, counts[..., None] // 2, axis=-1)[..., 0]
+    return np.where(counts >= min_periods, (low + high) / 2, np.nan)
+
+
+def fill(values, strategies, max_gap=MAX_GAP, whole=None):
+    """
+    Fills the NaN cells of `values` (days x columns, one row per calendar day)
+    with each column's strategy. `whole` marks columns to round to whole
+    numbers. Returns (filled values, boolean matrix of the cells filled).
+    """
+    n, k = values.shape
+    missing = np.isnan(values)
+    rows = np.arange(n)[:, None]
+    columns = np.arange(k)[None, :]
+    codes = np.array([STRATEGY_NAMES.index(strategy) for strategy in strategies])
+
+    # Previous and next recorded row of every cell (-1 / n when there is none)
+    prev = np.maximum.accumulate(np.where(missing, -1, rows), axis=0)
+    next_ = np.minimum.accumulate(np.where(missing, n, rows)[::-1], axis=0)[::-1]
+    prev_value = values[np.maximum(prev, 0), columns]
+    next_value = values[np.minimum(next_, n - 1), columns]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = (rows - prev) / (next_ - prev)
+    inside = (prev >= 0) & (next_ < n)
+    interpolated = np.where(inside & (next_ - prev - 1 <= max_gap), prev_value + (next_value - prev_value) * weight, np.nan)
+    forward = np.where((prev >= 0) & (rows - prev <= max_gap), prev_value, np.nan)
+    median = np.full_like(values, np.nan)
+    uses_median = codes == STRATEGY_NAMES.index("rolling_median")
+    if uses_median.any() and n:
+        median[:, uses_median] = _rolling_median(values[:, uses_median], ROLLING_DAYS, ROLLING_MIN_PERIODS)
+
+    filled = np.select([codes == 0, codes == 1, codes == 2], [interpolated, forward, median], np.nan)
+    if whole is not None:
+        filled[:, whole] = np.rint(filled[:, whole])
+    imputed = missing & ~np.isnan(filled)
+    return np.where(imputed, filled, values), imputed
+
+
+def impute(df, strategies=None, max_gap=MAX_GAP):
+    """
+    `df` on a complete daily calendar from its first to its last date, with
+    gaps filled per column (STRATEGIES unless given) and MASK_COLUMN added.
+    Rows without a date are dropped and, of repeated dates, the last is kept.
+    """
+    strategies = STRATEGIES if strategies is None else strategies
+    _check(df, strategies)
+
+    df = df[df["Date"].notna()].drop_duplicates("Date", keep="last").sort_values("Date")
+    attrs = dict(df.attrs)
+    if len(df):
+        unit = np.datetime_data(df["Date"].dtype)[0]
+        calendar = pd.date_range(df["Date"].iloc[0], df["Date"].iloc[-1], freq="D", name="Date", unit=unit)
+        added = ~calendar.isin(df["Date"])
+        df = df.set_index("Date").reindex(calendar).reset_index()
+    else:
+        added = np.zeros(0, dtype=bool)
+        df = df.reset_index(drop=True)
+
+    cols = [col for col in df.columns if strategies.get(col, "none") != "none"]
+    values = np.empty((len(df), len(cols)))
+    for i, col in enumerate(cols):
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            codes = df[col].cat.codes.to_numpy()
+            values[:, i] = np.where(codes >= 0, codes, np.nan)
+        else:
+            values[:, i] = df[col].to_numpy(dtype=float, na_value=np.nan)
+    whole = np.array([pd.api.types.is_integer_dtype(df[col].dtype) for col in cols], dtype=bool)
+    filled, imputed = fill(values, [strategies[col] for col in cols], max_gap, whole)
+
+    for i, col in enumerate(cols):
+        if not imputed[:, i].any():
+            continue
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            codes = np.where(np.isnan(filled[:, i]), -1, filled[:, i]).astype(int)
+            df[col] = pd.Categorical.from_codes(codes, dtype=dtype)
+        else:
+            df[col] = pd.Series(filled[:, i]).astype(dtype)
+
+    bits = np.array([1 << BITS[col] for col in cols], dtype=np.uint16)
+    mask = (imputed * bits).sum(axis=1, dtype=np.uint16) | np.where(added, ADDED_DAY, 0).astype(np.uint16)
+    df[MASK_COLUMN] = mask
+    df.attrs = attrs
+    return df
+
+
+def imputed_cells(df, column):
+    """Boolean array of the cells of `column` that were filled in rather than recorded."""
+    if MASK_COLUMN not in df:
+        return np.zeros(len(df), dtype=bool)
+    bits = sum(1 << BITS[col] for col in DERIVED_FROM.get(column, (column,)))
+    return (df[MASK_COLUMN].to_numpy() & bits) != 0
+
+
+def recorded_days(df):
+    """Boolean array of the rows that are days of the journal, not calendar days added to fill gaps."""
+    if MASK_COLUMN not in df:
+        return np.ones(len(df), dtype=bool)
+    return (df[MASK_COLUMN].to_numpy() & ADDED_DAY) == 0
+
+
+def observed(df):
+    """`df` with every imputed cell missing again, for analyses of recorded values only."""
+    if MASK_COLUMN not in df:
+        return df
+    df = df.copy()
+    for col in [*BITS, *DERIVED_FROM]:
+        if col in df:
+            cells = imputed_cells(df, col)
+            if cells.any():
+                df[col] = df[col].mask(cells)
+    return df
@@ -0,0 +1,43 @@
+"""
+Loads daily_data.csv as the prepared frame the dashboard works on.
+
+Shared by app.load_data, storage.migrate and report.py, so none of them needs
+the Streamlit app to read a CSV. The frame is validated and given compact
+dtypes (schema.py), padded to one row per calendar day with gaps filled
+(impute.py) and given the derived "Feel Average" column. Prepared frames are
+reused while the CSV is unchanged (data_cache.py).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import impute
+import schema
+
+
+def load_csv(csv_path="daily_data.csv", use_cache=True):
+    # Reuse the prepared frame while the CSV is unchanged (see data_cache.py)
+    signature = data_cache.csv_signature(csv_path, impute.settings())
+    if use_cache:
+        df = data_cache.load(csv_path, signature)
+        if df is not None:
+            df.attrs["source"] = os.path.abspath(csv_path)
+            return df
+
+    # Compact, validated dtypes (see schema.py); raises SchemaError on bad data
+    df = schema.coerce(pd.read_csv(csv_path, parse_dates=["Date"], dtype=schema.CSV_DTYPES))
+
+    # One row per calendar day, gaps filled per column (see impute.py)
+    df = impute.impute(df)
+
+    # Create new feature: Feel Average
+    feel = (df["Feeling Morning"] + df["Feeling Evening"]) / 2
+    df["Feel Average"] = feel.to_numpy(dtype=schema.DERIVED["Feel Average"], na_value=np.nan)
+
+    if use_cache:
+        data_cache.store(csv_path, df, signature)
+    # Identifies the dataset for the per-dataset stores (e.g. rollups)
+    df.attrs["source"] = os.path.abspath(csv_path)
+    return df
@@ -0,0 +1,161 @@
+"""
+Interned meal vocabulary with an inverted index of days per meal.
+
+Meal cells are normalized into terms: composite entries are split on "/" and
+",", whitespace is collapsed and "Brand:Item" entries yield both the full item
+and the brand on its own, so "Subway:Egg&Mayo" matches queries for either.
+Terms are matched case-insensitively and interned as integer codes; the first
+spelling seen is the one displayed. Each distinct cell is only split once.
+
+For every code the index keeps a bitmap of the day rows it appears on
+(np.packbits, one bit per day), so "days with X and Y" is a bitwise AND.
+Conditional means and effect sizes for every term and metric come from one
+pass: a few (terms x days) @ (days x metrics) matrix products give the sums,
+sums of squares and counts on days with each term; the days without it are
+the totals minus those.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+import fitting
+
+MEAL_SLOTS = ("Breakfast", "Lunch", "Dinner")
+
+# Separators between dishes of one composite entry
+_SPLIT = re.compile(r"[/,]")
+
+
+def _normalize(term):
+    return " ".join(term.split())
+
+
+def split_meal(cell):
+    """(term, kind) pairs of one meal cell: each dish as an item, plus its brand if any."""
+    terms = []
+    for item in map(_normalize, _SPLIT.split(cell)):
+        if not item:
+            continue
+        brand, sep, rest = item.partition(":")
+        brand = brand.strip()
+        if sep and brand:
+            terms.append((f"{brand}:{rest.strip()}", "item"))
+            terms.append((brand, "brand"))
+        else:
+            terms.append((item, "item"))
+    return terms
+
+
+class MealIndex:
+    """Meal vocabulary and per-term day bitmaps for the rows of one frame."""
+
+    def __init__(self, df, slots=MEAL_SLOTS):
+        self.slots = tuple(slots)
+        self.n_days = len(df)
+
+        # Meals repeat a lot, so each distinct cell is split once and the days
+        # are mapped through its code; -1 marks an empty cell
+        cell_codes, cells = pd.factorize(pd.concat([df[slot] for slot in self.slots], ignore_index=True))
+        cell_codes = cell_codes.reshape(len(self.slots), self.n_days)
+
+        self._codes = {}
+        vocabulary = []
+        cell_terms = []
+        for cell in cells:
+            codes = []
+            for term, kind in split_meal(str(cell)):
+                key = term.casefold()
+                if key not in self._codes:
+                    self._codes[key] = len(vocabulary)
+                    vocabulary.append((term, kind))
+                codes.append(self._codes[key])
+            cell_terms.append(codes)
+        self.vocabulary = pd.DataFrame(vocabulary, columns=["term", "kind"])
+
+        # [cell, term] is True when the cell contains the term
+        contains = np.zeros((len(cells), len(vocabulary)), dtype=bool)
+        for i, codes in enumerate(cell_terms):
+            contains[i, codes] = True
+
+        # One row per term; a term counts once per day however many meals it was in
+        present = np.zeros((len(vocabulary), self.n_days), dtype=bool)
+        for codes in cell_codes:
+            eaten = codes >= 0
+            present[:, eaten] |= contains[codes[eaten]].T
+        self.bitmaps = np.packbits(present, axis=1)
+        self.vocabulary["days"] = present.sum(axis=1)
+
+    def code(self, term):
+        """Integer code of `term` (case-insensitive); KeyError if it never appears."""
+        return self._codes[_normalize(str(term)).casefold()]
+
+    def _unpack(self, bitmaps):
+        return np.unpackbits(bitmaps, axis=-1, count=self.n_days).astype(bool)
+
+    def days_with(self, *terms):
+        """Boolean mask of the days on which every one of `terms` was eaten."""
+        bitmaps = self.bitmaps[[self.code(term) for term in terms]]
+        return self._unpack(np.bitwise_and.reduce(bitmaps, axis=0))
+
+    def effects(self, df, metrics, min_days=1):
+        """
+        For every term seen on at least `min_days` days and every metric: mean on
+        days with the term, mean on the other days, their difference and the
+        effect size (Cohen's d with pooled standard deviation). `df` must hold
+        the same rows the index was built from. Returns a long frame.
+        """
+        if len(df) != self.n_days:
+            raise ValueError(f"Index covers {self.n_days} days, frame has {len(df)}")
+        metrics = list(metrics)
+        values = df[metrics].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        # Centered on the column means, so the sums of squares keep their precision
+        counts = present.sum(axis=0)
+        center = np.where(present, values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        values = np.where(present, values - center, 0.0)
+        present = present.astype(float)
+
+        selected = np.flatnonzero(self.vocabulary["days"].to_numpy() >= min_days)
+        with_term = self._unpack(self.bitmaps[selected]).astype(float)
+
+        # [term, metric] sums over days with the term, then over the other days
+        n_with = with_term @ present
+        sum_with = with_term @ values
+        sq_with = with_term @ values ** 2
+        n_without = counts - n_with
+        sum_without = values.sum(axis=0) - sum_with
+        sq_without = (values ** 2).sum(axis=0) - sq_with
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_with = sum_with / n_with
+            mean_without = sum_without / n_without
+            ss_with = np.maximum(sq_with - sum_with * mean_with, 0.0)
+            ss_without = np.maximum(sq_without - sum_without * mean_without, 0.0)
+            pooled_sd = np.sqrt((ss_with + ss_without) / (n_with + n_without - 2))
+            effect_size = (mean_with - mean_without) / pooled_sd
+        effect_size[~(pooled_sd > 0)] = np.nan
+
+        vocabulary = self.vocabulary.iloc[selected]
+        k, m = len(selected), len(metrics)
+        return pd.DataFrame({
+            "term": np.repeat(vocabulary["term"].to_numpy(), m),
+            "kind": np.repeat(vocabulary["kind"].to_numpy(), m),
+            "metric": np.tile(metrics, k),
+            "days": np.repeat(vocabulary["days"].to_numpy(), m),
+            "n_with": n_with.ravel().astype(int),
+            "mean_with": (mean_with + center).ravel(),
+            "mean_without": (mean_without + center).ravel(),
+            "difference": (mean_with - mean_without).ravel(),
+            "effect_size": effect_size.ravel(),
+        })
+
+
+# One index per (dataset, slots), rebuilt when the meal columns change
+_indexes = fitting.FitCache(max_bytes=64 * 2**20)
+
+
+def index_for(df, slots=MEAL_SLOTS, key=None):
+    """Returns the MealIndex for `df`, reusing the cached one while its meals are unchanged."""
+    key = (key or df.attrs.get("source", "default"), tuple(slots))
+    return _indexes.get(key, df, slots, lambda: MealIndex(df, slots))
@@ -0,0 +1,153 @@
+"""
+Background precomputation of the dashboard's section artifacts.
+
+Once the data is loaded, each session's Prefetcher computes the expensive parts
+of the sections the user has not opened yet (period aggregates, the correlation
+heatmap, regression fits, phrase clouds, the meal index), so switching sections
+mostly serves finished results. Sections ask for an artifact with get(key,
+compute): a finished result is returned at once, one being computed in the
+background is waited for, and one not started yet is computed inline.
+
+Artifacts are registered before the page is drawn and the background run is
+started after it, so on a busy or single-core host the prefetch never competes
+with the page the user is waiting for.
+
+Every run of a session's artifacts is tied to a token identifying the data
+(data_token). When a new token arrives, work not yet started for the old one
+is cancelled and its results are dropped; a task already running finishes but
+its result is discarded.
+
+All sessions share one thread pool of MAX_WORKERS threads (set with
+DASHBOARD_PREFETCH_WORKERS; 0 turns prefetching off). A session runs its tasks
+one after another as a single job, so it never holds more than one worker and
+concurrent sessions queue fairly behind each other.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+import timing
+
+MAX_WORKERS = int(os.environ.get("DASHBOARD_PREFETCH_WORKERS", min(2, os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+def data_token(df):
+    """Identifies the loaded data: its source, date range and a hash of its values."""
+    fingerprint = int(pd.util.hash_pandas_object(df, index=False).sum()) if len(df) else 0
+    return (df.attrs.get("source"), df.attrs.get("date_range"), len(df), fingerprint)
+
+
+# Serializes claims, so exactly one of the worker and the session computes a task
+_claim_lock = threading.Lock()
+
+
+def _claim(future):
+    # True if the caller now owns a pending future and must compute it
+    with _claim_lock:
+        if future.done() or future.running():
+            return False
+        return future.set_running_or_notify_cancel()
+
+
+def _run(future, compute):
+    try:
+        future.set_result(compute())
+    except BaseException as exc:
+        future.set_exception(exc)
+
+
+class Prefetcher:
+    """Background artifacts of one session, for the latest version of its data."""
+
+    def __init__(self):
+        self.token = None
+        self._tasks = {}
+        self._futures = {}
+        self._cancelled = threading.Event()
+        self._submitted = False
+        self._lock = threading.Lock()
+
+    def register(self, token, tasks):
+        """
+        Registers `tasks` ({key: compute}, in the order to run them) for the
+        data identified by `token`. Does nothing if that token is already
+        registered; otherwise cancels the work for the previous data first.
+        """
+        with self._lock:
+            if token == self.token:
+                return
+            self._cancel()
+            self.token = token
+            self._tasks = dict(tasks)
+            self._futures = {key: Future() for key in self._tasks}
+            self._cancelled = threading.Event()
+            self._submitted = False
+
+    def start(self):
+        """Queues the registered tasks not claimed yet on the shared pool (once per token)."""
+        with self._lock:
+            if self._submitted or not self._futures or MAX_WORKERS <= 0:
+                return
+            self._submitted = True
+            args = (self._futures, self._tasks, self._cancelled)
+        _get_executor().submit(self._work, *args)
+
+    @staticmethod
+    def _work(futures, tasks, cancelled):
+        for key, future in futures.items():
+            if cancelled.is_set():
+                return
+            if _claim(future):
+                with timing.span("prefetch"):
+                    _run(future, tasks[key])
+
+    def _cancel(self):
+        self._cancelled.set()
+        for future in self._futures.values():
+            future.cancel()
+
+    def cancel(self):
+        """Cancels the work not started yet and forgets the current data."""
+        with self._lock:
+            self._cancel()
+            self.token = None
+            self._tasks = {}
+            self._futures = {}
+
+    def get(self, key, compute):
+        """
+        The artifact `key` for the current data: the prefetched result when
+        there is one, else `compute()` (waiting for the background run instead
+        if it is already computing `key`). Exceptions propagate to the caller.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+        if future is None:
+            return compute()
+        if _claim(future):
+            _run(future, compute)
+        elif future.cancelled():
+            return compute()
+        return future.result()
+
+    def status(self):
+        """{key: 'pending' | 'running' | 'done' | 'cancelled'} for the current data."""
+        with self._lock:
+            futures = dict(self._futures)
+        return {
+            key: "cancelled" if f.cancelled() else "done" if f.done() else "running" if f.running() else "pending"
+            for key, f in futures.items()
+        }
@@ -1,7 +1,15 @@
+import argparse
+import hashlib
+import json
+import os
+import re
 import pandas as pd
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
 import numpy as np
 
+import schema
+
 # Markdown data as a multi-line string
 markdown_data = """
 
@@ -37,69 +45,595 @@ markdown_data = """
 
 """
 
-# Use pandas.read_csv with StringIO to convert the Markdown table into a DataFrame
-df = pd.read_csv(StringIO(markdown_data), sep='|', skipinitialspace=True, engine='python')
+# Columns written to daily_data.csv, in order (see schema.py)
+OUTPUT_COLUMNS = schema.OUTPUT_COLUMNS
 
-# Drop unnecessary columns (the first and last empty columns resulting from the table format)
-df = df.drop(columns=['Unnamed: 0', 'Unnamed: 10'])
-# Drop the first row which contains the header information
-df = df.drop(index=[0, 1]).reset_index(drop=True)
+# Rows per chunk when streaming the journal; memory stays bounded by this
+DEFAULT_CHUNKSIZE = 50_000
 
-# Strip whitespace from column headers and data
-df.columns = df.columns.str.strip()
-df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+def read_journal_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Reads the markdown table in `source` (a path or file-like object) and yields
+    raw frames of at most `chunksize` rows. Every cell is kept as a string.
+    """
+    reader = pd.read_csv(source, sep='|', skipinitialspace=True, dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        # Drop the empty columns produced by the leading and trailing pipes
+        chunk = chunk.iloc[:, 1:-1]
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
 
-# Clean up the Date column by removing [[ ]] and replace <br> with chosen separator
-df['Date'] = df['Date'].str.replace(r'\[\[|\]\]', '', regex=True)
-df = df.map(lambda x: x.replace('<br>', '') if isinstance(x, str) else x)
+def _split_columns(series, n):
+    # Split on the first `n` slashes, always returning n + 1 text columns (a
+    # column no cell reached would otherwise come back as float NaN)
+    return series.str.split('/', n=n, expand=True).reindex(columns=range(n + 1)).astype(series.dtype)
 
-df['Date'] = pd.to_datetime(df['Date']).dt.date
+def _round_like_python(values, ndigits):
+    # np.round scales by 10**ndigits and can disagree with round() on ties;
+    # call round() once per distinct value instead of once per row
+    unique, inverse = np.unique(values, return_inverse=True)
+    rounded = np.array([round(v, ndigits) for v in unique.tolist()], dtype=float)
+    return rounded[inverse]
 
-df[['Breakfast', 'Lunch', 'Dinner']] = df['Meals'].str.split('/', n=2, expand=True)
-df.drop(columns=['Meals'], inplace=True)
+def extract_average_air_value(air):
+    # "101-150" -> 125.5, "75" -> 75.0
+    bounds = air.str.extract(r'^([^-]*)(?:-(.*))?$')
+    low = bounds[0].astype(float)
+    high = bounds[1].astype(float)
+    return low.where(high.isna(), (low + high) / 2)
 
-# Replace 'None' with NaN
-df = df.replace('None', pd.NA)
+def convert_sleep_duration(duration):
+    # "7hr26m" -> 7.4, "10hr" -> 10.0
+    parts = duration.str.extract(r'^(\d+)hr(\d*)')
+    hours = parts[0].astype(float)
+    minutes = parts[1].replace('', '0').astype(float)
+    return pd.Series(_round_like_python((hours + minutes / 60).to_numpy(), 1), index=duration.index)
 
-def extract_average_air_value(air_value):
-    if pd.isna(air_value):
-        return air_value
-    if '-' in air_value:
-        low, high = map(float, air_value.split('-'))
-        return (low + high) / 2
-    return float(air_value)
+def convert_sleep_debt(debt):
+    # "3.3hr" -> 3.3
+    return debt.str.replace('hr', '', regex=False).astype(float)
 
-df['Air'] = df['Air'].apply(extract_average_air_value)
+def clean_journal(raw):
+    """
+    Turns a raw chunk from read_journal_chunks into the cleaned daily schema.
+    Each step works on whole columns, so the per-row cost stays in pandas.
+    """
+    # Strip whitespace and drop <br> line breaks from every cell
+    df = raw.apply(lambda col: col.str.strip().str.replace('<br>', '', regex=False))
 
-df[['Sport Name', 'Sport Duration']] = df['Physical Activity'].apply(
-    lambda x: pd.Series(x.split('/', 1)) if pd.notna(x) else pd.Series([pd.NA, pd.NA])
-)
-df.drop(columns='Physical Activity', inplace=True)
+    # Keep only dated rows (skips the separator and "YYYY-MM-DD" template rows)
+    df = df[df['Date'].str.contains(r'\d', na=False)]
 
-# Divide the 'Slept Hours' column into 'Sleep Duration' and 'Sleep Debt'
-df[['Sleep Duration', 'Sleep Debt']] = df['Slept Hours'].apply(
-    lambda x: pd.Series(x.split('/', 1)) if pd.notna(x) else pd.Series([pd.NA, pd.NA])
-)
-df.drop(columns='Slept Hours', inplace=True)
+    # Replace 'None' with NaN
+    df = df.mask(df == 'None')
 
-def convert_sleep_duration(duration):
-    if pd.isna(duration):
-        return duration
-    parts = duration.split('hr')
-    hours = int(parts[0])
-    minutes = int(parts[1][:-1]) if len(parts) > 1 and parts[1] else 0
-    return round(hours + minutes / 60, 1)
+    out = pd.DataFrame(index=df.index)
+    out['Date'] = pd.to_datetime(df['Date'].str.replace(r'\[\[|\]\]', '', regex=True))
+    out['Weather'] = df['Weather']
+    out['Weight'] = df['Weight'].str.replace('kg', '', regex=False).str.strip().astype(float)
+    out['Feeling Morning'] = df['Feeling Morning']
+    out['Feeling Evening'] = df['Feeling Evening']
+    out['Air'] = extract_average_air_value(df['Air'])
 
-df['Sleep Duration'] = df['Sleep Duration'].apply(convert_sleep_duration)
+    meals = _split_columns(df['Meals'], 2)
+    out['Breakfast'], out['Lunch'], out['Dinner'] = meals[0], meals[1], meals[2]
 
-def convert_sleep_debt(debt):
-    if pd.isna(debt):
-        return debt
-    return float(debt.replace('hr', ''))
+    sport = _split_columns(df['Physical Activity'], 1)
+    out['Sport Name'], out['Sport Duration'] = sport[0], sport[1]
+
+    # Divide the 'Slept Hours' column into 'Sleep Duration' and 'Sleep Debt'
+    sleep = _split_columns(df['Slept Hours'], 1)
+    out['Sleep Duration'] = convert_sleep_duration(sleep[0])
+    out['Sleep Debt'] = convert_sleep_debt(sleep[1])
+
+    # Fail here, naming the day, rather than when the dashboard loads the CSV
+    schema.validate(out)
+    return out.reset_index(drop=True)
+
+def parse_journal(source, chunksize=DEFAULT_CHUNKSIZE):
+    """Yields cleaned frames for each chunk of the journal in `source`."""
+    for raw in read_journal_chunks(source, chunksize=chunksize):
+        yield clean_journal(raw)
+
+def write_daily_csv(frames, output_path):
+    """Writes cleaned frames to `output_path` one chunk at a time."""
+    header = True
+    with open(output_path, 'w', newline='') as f:
+        for frame in frames:
+            frame.to_csv(f, index=False, header=header)
+            header = False
+        if header:
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(f, index=False)
+
+# Incremental ingestion.
+#
+# Next to the output CSV we keep two sidecar files:
+#   <output>.state.json  where the last ingest stopped in the journal (byte offset
+#                        and a digest per HASH_BLOCK bytes before it), the
+#                        journal's size and mtime, and the table header
+#   <output>.hashes      append-only "date,hash" log of every ingested row
+# A nightly run whose journal has the stored size and mtime does nothing. Otherwise
+# it checks that the bytes up to the stored offset are unchanged and parses only
+# what was appended after them. If anything above that point was edited (or
+# `verify` is set), every row is re-hashed and only new or changed rows are parsed.
+#
+# The check reads the ingested bytes once, on purpose: an edit that keeps the
+# journal's length (a 7 typed over a 6) is only visible in the content. That
+# read runs at disk speed with one sha1 per block and stops at the first block
+# that differs; parsing, the costly part, stays proportional to the new rows.
+# Afterwards only the last, partial block and the appended bytes are hashed, so
+# no byte is read twice.
+
+BUNDLED_SOURCE = '<bundled>'
+HASH_BLOCK = 1 << 20
+ROW_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+def _state_paths(output_path):
+    return output_path + '.state.json', output_path + '.hashes'
+
+def _source_id(source):
+    return os.path.abspath(source) if source else BUNDLED_SOURCE
+
+def _open_source(source):
+    return open(source, 'rb') if source else BytesIO(markdown_data.encode('utf-8'))
+
+def _row_date(line):
+    # Date key of a table row, or None for the header, separator and template rows
+    cells = line.split('|')
+    if len(cells) < 3:
+        return None
+    match = ROW_DATE.search(cells[1])
+    return match.group(0) if match else None
+
+def _row_hash(line):
+    return hashlib.sha1(line.strip().encode('utf-8')).hexdigest()
+
+def _iter_lines(f, pos):
+    # Yields (text, start, end) for every line from byte `pos`; `end` excludes the newline
+    for raw in f:
+        stripped = raw.rstrip(b'\r\n')
+        yield stripped.decode('utf-8'), pos, pos + len(stripped)
+        pos += len(raw)
+
+def _parse_lines(header, lines, chunksize=DEFAULT_CHUNKSIZE):
+    if not lines:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    text = header + '\n' + '\n'.join(lines) + '\n'
+    frames = list(parse_journal(StringIO(text), chunksize=chunksize))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+def _read_watermark(output_path):
+    # Date of the last row in the output CSV, read from the end of the file
+    with open(output_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines:
+        return None
+    date = lines[-1].decode('utf-8').split(',', 1)[0]
+    return date if ROW_DATE.fullmatch(date) else None
+
+def _load_state(output_path):
+    state_path, hashes_path = _state_paths(output_path)
+    if not (os.path.exists(output_path) and os.path.exists(state_path) and os.path.exists(hashes_path)):
+        return None
+    with open(state_path) as f:
+        return json.load(f)
+
+def _source_stat(source):
+    # (size, mtime_ns) of the journal file; None for the bundled table
+    if not source:
+        return None
+    stat = os.stat(source)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _save_state(output_path, source, header, tail, block_hashes, stat):
+    state_path, _ = _state_paths(output_path)
+    state = {
+        'source': _source_id(source),
+        'header': header,
+        'tail_start': tail[0],
+        'offset': tail[1],
+        'block_hashes': block_hashes,
+        'stat': stat,
+    }
+    with open(state_path, 'w') as f:
+        json.dump(state, f, indent=2)
+
+def _write_hashes(output_path, row_hashes, mode):
+    _, hashes_path = _state_paths(output_path)
+    with open(hashes_path, mode) as f:
+        f.writelines(f"{date},{digest}\n" for date, digest in row_hashes.items())
+
+def _load_hashes(output_path):
+    _, hashes_path = _state_paths(output_path)
+    row_hashes = {}
+    with open(hashes_path) as f:
+        for line in f:
+            date, digest = line.rstrip('\n').split(',', 1)
+            row_hashes[date] = digest
+    return row_hashes
+
+def _block_hashes(f, start, end):
+    # Digests of the journal's bytes [start, end) per block; `start` is a block boundary
+    hashes = []
+    f.seek(start)
+    while start < end:
+        data = f.read(min(HASH_BLOCK, end - start))
+        if not data:
+            break
+        hashes.append(hashlib.sha1(data).hexdigest())
+        start += len(data)
+    return hashes
+
+def _unchanged_blocks(f, hashes, end):
+    # How many leading blocks of the journal's first `end` bytes still match `hashes`
+    f.seek(0)
+    for i, digest in enumerate(hashes):
+        if hashlib.sha1(f.read(max(0, min(HASH_BLOCK, end - i * HASH_BLOCK)))).hexdigest() != digest:
+            return i
+    return len(hashes)
+
+def _rehash_blocks(f, hashes, unchanged, old_end, new_end):
+    # Block digests up to `new_end`, reusing the unchanged full blocks below both ends
+    keep = min(unchanged, old_end // HASH_BLOCK, new_end // HASH_BLOCK)
+    return hashes[:keep] + _block_hashes(f, keep * HASH_BLOCK, new_end)
+
+def _upsert_rows(output_path, frame, removed_dates=()):
+    # Rewrites the output with `frame` replacing rows of the same date. Existing
+    # rows are read back as text so their bytes are left untouched.
+    existing = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    updates = pd.read_csv(StringIO(frame.to_csv(index=False)), dtype=str, keep_default_na=False)
+    dropped = set(updates['Date']) | set(removed_dates)
+    merged = pd.concat([existing[~existing['Date'].isin(dropped)], updates], ignore_index=True)
+    merged.sort_values('Date', kind='stable').to_csv(output_path, index=False)
+
+def _store_rows(output_path, rows, removed_dates=(), chunksize=DEFAULT_CHUNKSIZE, header=None):
+    # Appends when every row is past the watermark, upserts otherwise
+    if not rows and not removed_dates:
+        return 'unchanged'
+    frame = _parse_lines(header, list(rows.values()), chunksize=chunksize).sort_values('Date', kind='stable')
+    watermark = _read_watermark(output_path)
+    if not removed_dates and (watermark is None or min(rows) > watermark):
+        frame.to_csv(output_path, mode='a', header=False, index=False)
+        return 'appended'
+    _upsert_rows(output_path, frame, removed_dates)
+    return 'upserted'
+
+def full_rebuild(source, output_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Parses the whole journal into `output_path` and records the ingest state."""
+    header, tail, row_hashes = None, (0, 0), {}
+    stat = _source_stat(source)
+    with _open_source(source) as f:
+        for text, start, end in _iter_lines(f, 0):
+            if header is None:
+                if text.lstrip().startswith('|'):
+                    header = text
+                continue
+            date = _row_date(text)
+            if date:
+                row_hashes[date] = _row_hash(text)
+                tail = (start, end)
+        block_hashes = _block_hashes(f, 0, tail[1])
+
+    journal = source if source else StringIO(markdown_data)
+    write_daily_csv(parse_journal(journal, chunksize=chunksize), output_path)
+    _write_hashes(output_path, row_hashes, 'w')
+    _save_state(output_path, source, header, tail, block_hashes, stat)
+    return 'rebuilt', len(row_hashes)
+
+def ingest(source, output_path, chunksize=DEFAULT_CHUNKSIZE, rebuild=False, verify=False):
+    """
+    Brings `output_path` up to date with the journal in `source` (a path, or None
+    for the bundled table). Returns (mode, rows parsed).
+    """
+    state = _load_state(output_path)
+    if rebuild or state is None or state['source'] != _source_id(source):
+        return full_rebuild(source, output_path, chunksize=chunksize)
+
+    header = state['header']
+    stat = _source_stat(source)
+    if not verify and stat is not None and stat == state.get('stat'):
+        return 'unchanged', 0
+    with _open_source(source) as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        tail = (state['tail_start'], state['offset'])
+        # Any edit above the offset, even one keeping the length, changes a block digest
+        hashes = state.get('block_hashes', [])
+        complete = len(hashes) == -(-tail[1] // HASH_BLOCK)
+        unchanged = 0 if verify or not complete else _unchanged_blocks(f, hashes, tail[1])
+        appended = not verify and complete and size >= tail[1] and unchanged == len(hashes)
+        if appended:
+            # Fast path: the journal only grew, parse the lines after the offset
+            f.seek(tail[1])
+            if f.read(1) not in (b'', b'\n', b'\r'):
+                appended = False
+
+        rows, row_hashes, removed = {}, {}, ()
+        if appended:
+            f.seek(tail[1])
+            for text, start, end in _iter_lines(f, tail[1]):
+                date = _row_date(text)
+                if date:
+                    rows[date] = text
+                    row_hashes[date] = _row_hash(text)
+                    tail = (start, end)
+        else:
+            # Slow path: re-hash every row, parse only the new or changed ones
+            f.seek(0)
+            known = _load_hashes(output_path)
+            current, seen_header = {}, False
+            for text, start, end in _iter_lines(f, 0):
+                if not seen_header:
+                    if text.lstrip().startswith('|'):
+                        seen_header = True
+                        if text != header:
+                            # The columns changed, nothing ingested so far can be reused
+                            rebuild = True
+                            break
+                    continue
+                date = _row_date(text)
+                if date:
+                    current[date] = _row_hash(text)
+                    if known.get(date) != current[date]:
+                        rows[date] = text
+                    tail = (start, end)
+            rebuild = rebuild or not seen_header
+            removed = tuple(date for date in known if date not in current)
+            row_hashes = current
+        block_hashes = _rehash_blocks(f, hashes, unchanged, state['offset'], tail[1])
+
+    if rebuild:
+        return full_rebuild(source, output_path, chunksize=chunksize)
+    mode = _store_rows(output_path, rows, removed, chunksize=chunksize, header=header)
+    _write_hashes(output_path, row_hashes, 'a' if appended else 'w')
+    _save_state(output_path, source, header, tail, block_hashes, stat)
+    return mode, len(rows)
+
+# Daily-note directories.
+#
+# Instead of one journal, a directory tree can hold one note per day, e.g. an
+# Obsidian vault with Daily/2025-01-08.md. A note either contains table rows
+# under the journal header, or flat `key: value` front matter whose keys are
+# the journal columns (case, spaces, '_' and '-' ignored; Breakfast, Lunch and
+# Dinner may be given separately instead of Meals):
+#
+#   ---
+#   date: 2025-01-08
+#   weather: Sunny
+#   slept_hours: 7hr26m/3.3hr
+#   meals: Subway:Egg&Mayo/Tamjai/Snacks
+#   air: 101-150
+#   ---
+#
+# Notes without a date field take it from the file name; front matter without
+# any journal field (e.g. a meeting note's tags) is not a day. Files are read in
+# batches on a process pool and the raw rows are cleaned by clean_journal in
+# the parent. A manifest next to the output (<output>.notes.json) records each
+# file's mtime, content hash, dates and how many fields each date fills: a
+# re-run skips files whose mtime is unchanged, re-hashes touched ones and only
+# parses those whose content changed.
+#
+# A date found in several notes takes the row with the most fields filled,
+# ties going to the first path in sorted order, whichever notes changed. A
+# date is dropped from the output only once no remaining note has it.
+
+JOURNAL_COLUMNS = [
+    'Date', 'Weather', 'Weight', 'Feeling Morning', 'Feeling Evening',
+    'Physical Activity', 'Slept Hours', 'Meals', 'Air',
+]
+NOTE_SUFFIXES = ('.md', '.markdown')
+
+# Files per task sent to a worker; keeps the pool busy without one task per file
+NOTES_BATCH = 64
+
+def _field_key(name):
+    return re.sub(r'[\s_-]', '', name).casefold()
+
+_NOTE_FIELDS = {_field_key(col): col for col in JOURNAL_COLUMNS}
+_MEAL_FIELDS = ('breakfast', 'lunch', 'dinner')
+
+def _manifest_path(output_path):
+    return output_path + '.notes.json'
+
+def scan_notes(root):
+    """Returns {path relative to `root`: mtime_ns} for every note, skipping hidden directories."""
+    notes = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.endswith(NOTE_SUFFIXES):
+                path = os.path.join(dirpath, name)
+                notes[os.path.relpath(path, root)] = os.stat(path).st_mtime_ns
+    return notes
+
+def _table_rows(lines):
+    # Dated table rows under a header with a Date column, as cells in JOURNAL_COLUMNS order
+    columns, rows = None, []
+    for line in lines:
+        if not line.lstrip().startswith('|'):
+            continue
+        cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+        if columns is None:
+            names = [_NOTE_FIELDS.get(_field_key(cell)) for cell in cells]
+            if 'Date' in names:
+                columns = names
+        elif _row_date(line):
+            row = dict(zip(columns, cells))
+            rows.append([row.get(col) or 'None' for col in JOURNAL_COLUMNS])
+    return rows
+
+def _front_matter_row(lines, path):
+    # One row from flat `key: value` front matter, or None without front matter
+    if not lines or lines[0].strip() != '---':
+        return None
+    fields, meals = {}, {}
+    for line in lines[1:]:
+        if line.strip() == '---':
+            break
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key, value = _field_key(key), value.strip().strip('"\'')
+        if key in _NOTE_FIELDS:
+            fields[_NOTE_FIELDS[key]] = value
+        elif key in _MEAL_FIELDS:
+            meals[key] = value
+    if 'Meals' not in fields and meals:
+        fields['Meals'] = '/'.join(meals.get(meal, '') for meal in _MEAL_FIELDS)
+    if not any(value for col, value in fields.items() if col != 'Date'):
+        return None
+    if 'Date' not in fields:
+        match = ROW_DATE.search(os.path.basename(path))
+        if match is None:
+            return None
+        fields['Date'] = match.group(0)
+    return [fields.get(col) or 'None' for col in JOURNAL_COLUMNS]
+
+def read_note(path, known_hash=None):
+    """
+    Reads one note. Returns (content hash, raw rows), where the rows are lists
+    of cell strings in JOURNAL_COLUMNS order, or None if the hash equals
+    `known_hash`.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == known_hash:
+        return digest, None
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    rows = _table_rows(lines)
+    if not rows:
+        row = _front_matter_row(lines, path)
+        rows = [row] if row else []
+    return digest, rows
+
+def _read_notes(batch):
+    # Worker task: read_note for each (path, known hash) in the batch
+    return [read_note(path, known_hash) for path, known_hash in batch]
+
+def _filled(row):
+    # Journal fields a raw row fills, besides its date
+    return sum(1 for cell in row[1:] if cell and cell != 'None')
+
+def _note_rows(rows):
+    # {date: row} of one note; a date repeated within the note keeps its last row
+    return {ROW_DATE.search(row[0]).group(0): row for row in rows}
+
+def _read_all(tasks, workers=None):
+    batches = [tasks[i:i + NOTES_BATCH] for i in range(0, len(tasks), NOTES_BATCH)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) <= 1:
+        results = map(_read_notes, batches)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_read_notes, batches))
+    return [result for batch in results for result in batch]
+
+def _load_manifest(output_path, root):
+    path = _manifest_path(output_path)
+    if not (os.path.exists(output_path) and os.path.exists(path)):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    return manifest if manifest.get('root') == root else None
+
+def _save_manifest(output_path, root, files):
+    path = _manifest_path(output_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'root': root, 'files': files}, f)
+    os.replace(tmp_path, path)
+
+def ingest_notes(root, output_path, workers=None, rebuild=False, verify=False):
+    """
+    Brings `output_path` up to date with the daily notes under `root`, reading
+    changed files on `workers` processes (default: one per core). Pass `verify`
+    to re-hash files whose mtime is unchanged too. Returns (mode, files parsed).
+    """
+    root = os.path.abspath(root)
+    manifest = None if rebuild else _load_manifest(output_path, root)
+    known = manifest['files'] if manifest else {}
+    current = scan_notes(root)
+    todo = [rel for rel, mtime in current.items()
+            if verify or rel not in known or known[rel]['mtime'] != mtime]
+
+    results = _read_all([(os.path.join(root, rel), known.get(rel, {}).get('hash')) for rel in todo], workers)
+    files = {rel: entry for rel, entry in known.items() if rel in current}
+    # Dates whose row may change: those of deleted notes, and the old and new dates of parsed ones
+    affected = {date for rel, entry in known.items() if rel not in current for date in entry['dates']}
+    note_rows, parsed = {}, 0
+    for rel, (digest, rows) in zip(todo, results):
+        if rows is None:
+            # Touched but unchanged
+            files[rel] = dict(known[rel], mtime=current[rel])
+            continue
+        parsed += 1
+        if rel in known:
+            affected.update(known[rel]['dates'])
+        note_rows[rel] = _note_rows(rows)
+        files[rel] = {
+            'mtime': current[rel],
+            'hash': digest,
+            'dates': list(note_rows[rel]),
+            'filled': [_filled(row) for row in note_rows[rel].values()],
+        }
+        affected.update(note_rows[rel])
+
+    # Every remaining note's claim on the affected dates, from the manifest
+    claims = {}
+    for rel, entry in files.items():
+        for date, filled in zip(entry['dates'], entry.get('filled') or [0] * len(entry['dates'])):
+            if date in affected:
+                claims.setdefault(date, []).append((-filled, rel))
+    winners = {date: min(claim)[1] for date, claim in claims.items()}
+    removed = affected - set(winners)
+
+    # Winning notes that were not parsed this run are read again for their rows
+    unread = sorted({rel for rel in winners.values() if rel not in note_rows})
+    for rel, (digest, rows) in zip(unread, _read_all([(os.path.join(root, rel), None) for rel in unread], workers)):
+        note_rows[rel] = _note_rows(rows)
+    raw_rows = [note_rows[rel][date] for date, rel in sorted(winners.items()) if date in note_rows[rel]]
+
+    frame = pd.DataFrame(columns=OUTPUT_COLUMNS)
+    if raw_rows:
+        frame = clean_journal(pd.DataFrame(raw_rows, columns=JOURNAL_COLUMNS, dtype=str))
+    if manifest is None:
+        write_daily_csv([frame], output_path)
+        mode = 'rebuilt'
+    elif not affected:
+        mode = 'unchanged'
+    else:
+        _upsert_rows(output_path, frame, removed)
+        mode = 'upserted'
+    _save_manifest(output_path, root, files)
+    return mode, parsed
 
-df['Sleep Debt'] = df['Sleep Debt'].apply(convert_sleep_debt)
+def main():
+    parser = argparse.ArgumentParser(description="Convert the markdown journal into daily_data.csv")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--input', help="Markdown journal file (defaults to the bundled table)")
+    source.add_argument('--notes', help="Directory of daily notes to ingest instead of a journal")
+    parser.add_argument('--output', default='daily_data.csv')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help="Re-parse the whole journal instead of only new or changed rows")
+    parser.add_argument('--verify', action='store_true',
+                        help="Re-hash every row to pick up edits above the last ingested row")
+    parser.add_argument('--workers', type=int,
+                        help="Processes reading daily notes (defaults to one per core)")
+    args = parser.parse_args()
 
-df['Weight'] = df['Weight'].str.replace('kg', '').str.strip().astype(float)
+    if args.notes:
+        mode, n_files = ingest_notes(args.notes, args.output, workers=args.workers,
+                                     rebuild=args.full_rebuild, verify=args.verify)
+        print(f"{args.output}: {mode} ({n_files} notes parsed)")
+        return
 
+    mode, n_rows = ingest(args.input, args.output, chunksize=args.chunksize,
+                          rebuild=args.full_rebuild, verify=args.verify)
+    print(f"{args.output}: {mode} ({n_rows} rows parsed)")
 
-df.to_csv('daily_data.csv', index=False)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Closed-form linear and quadratic fits for every pair of numeric columns.
+
+All pairs are fitted in one batched NumPy pass: the sums the normal equations
+need (n, sum x .. sum x^4, sum y, sum xy, sum x^2 y, sum y^2) come from a few
+masked matrix products over the whole frame, and the resulting 2x2 and 3x3
+systems are solved together. x and y are centered on their column means first
+to keep the x^4 sums well conditioned; coefficients are reported for the
+original scale. Missing values are handled pairwise.
+
+Results are cached per dataset until its values change, so picking a pair in
+the dashboard is a lookup. Bootstrap confidence intervals for the quadratic
+vertex resample BOOTSTRAP_BLOCK replicates at a time as a (block x rows) count
+matrix, which bounds memory on long histories.
+"""
+import threading
+
+import numpy as np
+
+import fitting
+
+# Bootstrap replicates resampled together; each (block x rows) array of a
+# 20-year history takes about 6 MB
+BOOTSTRAP_BLOCK = 100
+
+# Below this share of usable replicates the vertex interval is left undefined
+MIN_KEPT = 0.5
+
+
+class PairRegressions:
+    """Linear and quadratic fits of every column (y) against every other (x)."""
+
+    def __init__(self, df, columns):
+        self.columns = list(columns)
+        values = df[self.columns].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        mask = present.astype(float)
+        self.means = fitting.column_means(values, present)
+        u = np.where(present, values - self.means, 0.0)
+
+        # Pair sums, [i, j] = over rows where x = column i and y = column j are both present
+        n = mask.T @ mask
+        s_u = u.T @ mask
+        s_u2 = (u ** 2).T @ mask
+        s_u3 = (u ** 3).T @ mask
+        s_u4 = (u ** 4).T @ mask
+        s_v = mask.T @ u
+        s_uv = u.T @ u
+        s_u2v = (u ** 2).T @ u
+        s_vv = mask.T @ (u ** 2)
+
+        lin_a = np.stack([np.stack([n, s_u], -1), np.stack([s_u, s_u2], -1)], -2)
+        lin_b = np.stack([s_v, s_uv], -1)
+        quad_a = np.stack([
+            np.stack([n, s_u, s_u2], -1),
+            np.stack([s_u, s_u2, s_u3], -1),
+            np.stack([s_u2, s_u3, s_u4], -1),
+        ], -2)
+        quad_b = np.stack([s_v, s_uv, s_u2v], -1)
+        lin = fitting.solve(lin_a, lin_b)    # [intercept, slope] in centered units
+        quad = fitting.solve(quad_a, quad_b)  # [c, b, a] in centered units
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sst = s_vv - s_v ** 2 / n
+            self.r2_linear = 1 - (s_vv - (lin * lin_b).sum(-1)) / sst
+            self.r2_quadratic = 1 - (s_vv - (quad * quad_b).sum(-1)) / sst
+
+        # Back to the original scale: x = u + mx, y = v + my
+        mx = self.means[:, None]
+        my = self.means[None, :]
+        self.linear = np.stack([lin[..., 0] - lin[..., 1] * mx + my, lin[..., 1]], -1)
+        c, b, a = quad[..., 0], quad[..., 1], quad[..., 2]
+        self.quadratic = np.stack([a * mx ** 2 - b * mx + c + my, b - 2 * a * mx, a], -1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.vertex = np.where(a != 0, mx - b / (2 * a), np.nan)
+        self.n = n
+
+        # Too few points: leave the fit undefined rather than report noise
+        self.linear[n < 2] = np.nan
+        self.quadratic[n < 3] = np.nan
+        self.vertex[n < 3] = np.nan
+
+        self._values = values
+        self._bootstrap = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, x, y):
+        """Fit results for y against x as a dict."""
+        i, j = self.columns.index(x), self.columns.index(y)
+        return {
+            "n": int(self.n[i, j]),
+            "linear": tuple(map(float, self.linear[i, j])),        # (intercept, slope)
+            "quadratic": tuple(map(float, self.quadratic[i, j])),  # (c, b, a): c + b*x + a*x^2
+            "r2_linear": float(self.r2_linear[i, j]),
+            "r2_quadratic": float(self.r2_quadratic[i, j]),
+            "vertex": float(self.vertex[i, j]),
+        }
+
+    def vertex_interval(self, x, y, replicates=1000, level=0.95, seed=0):
+        """
+        Bootstrap (percentile) confidence interval for the vertex of the
+        quadratic fit of y against x, as {"low", "high", "kept"}.
+
+        Only replicates that curve the same way as the full fit (a peak for a
+        peak) and put their vertex within the observed range of x count; "kept"
+        is their share. Flipped or near-flat fits have no comparable vertex.
+        With fewer than MIN_KEPT of the replicates kept, low and high are NaN.
+        """
+        key = (x, y, replicates, level, seed)
+        with self._lock:
+            if key in self._bootstrap:
+                return self._bootstrap[key]
+
+        i, j = self.columns.index(x), self.columns.index(y)
+        both = ~np.isnan(self._values[:, i]) & ~np.isnan(self._values[:, j])
+        u = self._values[both, i] - self.means[i]
+        v = self._values[both, j] - self.means[j]
+        n = len(u)
+        x_low, x_high = self._values[both, i].min(initial=np.inf), self._values[both, i].max(initial=-np.inf)
+        curvature = np.sign(self.quadratic[i, j, 2])
+        if n < 3 or not curvature:
+            return {"low": np.nan, "high": np.nan, "kept": 0.0}
+
+        powers = np.stack([np.ones(n), u, u ** 2, u ** 3, u ** 4], -1)
+        products = powers[:, :3] * v[:, None]
+        rng = np.random.default_rng(seed)
+        vertices = np.empty(replicates)
+        for start in range(0, replicates, BOOTSTRAP_BLOCK):
+            block = min(BOOTSTRAP_BLOCK, replicates - start)
+            # Row r of `weights` counts how often each observation was drawn
+            # into replicate start + r; blocks draw the same stream as one batch
+            draws = rng.integers(0, n, size=(block, n)) + (np.arange(block) * n)[:, None]
+            weights = np.bincount(draws.ravel(), minlength=block * n).reshape(block, n)
+
+            s = weights @ powers      # (block, 5)
+            t = weights @ products    # (block, 3)
+            a = s[:, [[0, 1, 2], [1, 2, 3], [2, 3, 4]]]
+            _, b, a2 = np.moveaxis(fitting.solve(a, t), -1, 0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                vertex = self.means[i] - b / (2 * a2)
+            usable = (np.sign(a2) == curvature) & (vertex >= x_low) & (vertex <= x_high)
+            vertices[start:start + block] = np.where(usable, vertex, np.nan)
+
+        kept = np.isfinite(vertices)
+        result = {"low": np.nan, "high": np.nan, "kept": float(kept.mean())}
+        if kept.mean() >= MIN_KEPT:
+            tail = (1 - level) / 2 * 100
+            low, high = np.percentile(vertices[kept], [tail, 100 - tail])
+            result.update(low=float(low), high=float(high))
+        with self._lock:
+            self._bootstrap[key] = result
+        return result
+
+    def predict_quadratic(self, x, y, x_values):
+        c, b, a = self.lookup(x, y)["quadratic"]
+        return c + b * x_values + a * x_values ** 2
+
+
+# Fitted results per (dataset, columns), refreshed when the values change
+_results = fitting.FitCache(max_bytes=64 * 2**20)
+
+
+def regressions_for(df, columns, key=None):
+    """Returns PairRegressions for `df`, reusing the cached fit while the data is unchanged."""
+    key = (key or df.attrs.get("source", "default"), tuple(columns))
+    return _results.get(key, df, columns, lambda: PairRegressions(df, columns))
@@ -0,0 +1,198 @@
+"""
+Rendered phrase clouds, cached as PNG bytes.
+
+WordCloud layout is the slowest step on the dashboard, and every view renders
+the same four clouds on each rerun. Two LRU caches sit in front of it:
+
+- layouts: the WordCloud image, keyed by the frequencies and canvas size, so the
+  weekly and monthly views reuse the layout the daily view already computed;
+- PNGs: the finished titled figure, keyed by frequencies, title and size.
+
+Both are bounded by total bytes and count hits, misses and evictions. Misses
+from one page are rendered concurrently on a small thread pool. Figures are
+built with the object-oriented Matplotlib API (not pyplot), which is safe to
+use from several threads. Matplotlib and WordCloud are imported on first render.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import timing
+
+# Matches the defaults of WordCloud() and plt.subplots() used before caching
+DEFAULT_SIZE = (400, 200)
+FIGSIZE = (6.4, 4.8)
+DPI = 200
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU mapping bounded by the summed size of its values, by its
+    number of entries, or both. A bound of None is no bound; without max_bytes
+    the values are not measured.
+    """
+
+    def __init__(self, max_bytes=None, sizeof=len, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.sizeof = sizeof if max_bytes is not None else (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self.sizeof(self._items.pop(key))
+            self._items[key] = value
+            self._bytes += size
+            # Never evict the entry just added, even if it alone exceeds the budget
+            while self._over_budget() and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= self.sizeof(evicted)
+                self.evictions += 1
+
+    def _over_budget(self):
+        return (
+            (self.max_bytes is not None and self._bytes > self.max_bytes)
+            or (self.max_entries is not None and len(self._items) > self.max_entries)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+layout_cache = LRUCache(max_bytes=32 * 2**20, sizeof=lambda array: array.nbytes)
+png_cache = LRUCache(max_bytes=32 * 2**20)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="phrase-cloud")
+        return _executor
+
+
+def frequencies_key(freq_dict):
+    items = sorted((str(phrase), int(count)) for phrase, count in freq_dict.items())
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+
+def _layout(freq_dict, freq_key, size):
+    key = (freq_key, size)
+    array = layout_cache.get(key)
+    if array is None:
+        from wordcloud import WordCloud
+
+        with timing.span("wordcloud.layout"):
+            wc = WordCloud(
+                width=size[0],
+                height=size[1],
+                background_color="white",
+                collocations=False  # Important for preventing internal splitting
+            ).generate_from_frequencies(freq_dict)
+            array = wc.to_array()
+        layout_cache.put(key, array)
+    return array
+
+
+def _render_png(freq_dict, freq_key, title, size):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=FIGSIZE)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    if len(freq_dict) == 0:
+        ax.text(0.5, 0.5, "No data available", ha='center', va='center')
+        ax.axis("off")
+    else:
+        ax.imshow(_layout(freq_dict, freq_key, size), interpolation='bilinear')
+        ax.axis("off")
+        ax.set_title(title)
+
+    buffer = BytesIO()
+    with timing.span("matplotlib.rasterize"):
+        fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def render_phrase_clouds(requests, size=DEFAULT_SIZE):
+    """
+    Takes a list of (freq_dict, title) pairs and returns their PNG bytes in the
+    same order. Cached entries are returned directly; the misses are rendered
+    concurrently.
+    """
+    results = [None] * len(requests)
+    pending = {}
+    for i, (freq_dict, title) in enumerate(requests):
+        freq_key = frequencies_key(freq_dict)
+        key = (freq_key, title, size)
+        png = png_cache.get(key)
+        if png is not None:
+            results[i] = png
+        elif key in pending:
+            # Same cloud requested twice on one page, render it once
+            pending[key][1].append(i)
+        else:
+            pending[key] = ((freq_dict, freq_key, title), [i])
+
+    if len(pending) <= 1:
+        # Not worth a round trip through the pool
+        futures = {key: (None, args, slots) for key, (args, slots) in pending.items()}
+    else:
+        executor = _get_executor()
+        futures = {
+            key: (executor.submit(_render_png, *args, size), args, slots)
+            for key, (args, slots) in pending.items()
+        }
+
+    for key, (future, args, slots) in futures.items():
+        png = future.result() if future is not None else _render_png(*args, size)
+        png_cache.put(key, png)
+        for i in slots:
+            results[i] = png
+    return results
+
+
+def stats():
+    return {"layouts": layout_cache.stats(), "pngs": png_cache.stats()}
+
+
+def clear():
+    layout_cache.clear()
+    png_cache.clear()
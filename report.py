@@ -0,0 +1,253 @@
+"""
+Headless batch reports: the dashboard sections as static HTML bundles.
+
+    python report.py users/*/daily_data.csv --out reports --workers 8
+
+Each CSV gets a bundle directory, named after the directory the CSV is in
+(reports/<user>/, or <user>-<file> if two CSVs share a directory):
+
+    index.html      the sections in dashboard order
+    plotly.min.js   Plotly, so the bundle opens offline
+    figures/*.png   phrase clouds, the correlation heatmap and Matplotlib plots
+
+The content comes from sections.section_blocks, the builders the dashboard
+draws, with every widget at its default. Plotly figures are embedded in
+index.html as HTML (their JSON and a Plotly.newPlot call); images are written as
+PNG. No Streamlit server is involved.
+
+The work runs on a process pool. A batch with at least one user per worker
+is split by user, so each report is drawn by one worker and shares its
+caches (the phrase cloud layouts, the correlation engine); a smaller batch is
+split by (user, section), so the sections of one report render in parallel.
+Workers file every dataset under one key of the per-dataset stores (rollups,
+correlation engines, fits, meal indexes), so their memory stays flat however
+many users they render. benchmarks/bench_report.py measures reports per hour.
+"""
+import argparse
+import html
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sections import SECTIONS
+
+# Sections with a static form; Meal Impact is driven by its widgets
+REPORT_SECTIONS = SECTIONS[:5]
+
+PLOTLY_JS = "plotly.min.js"
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; max-width: 960px; margin: 2em auto; padding: 0 1em; }}
+img {{ max-width: 100%; }}
+section {{ margin-bottom: 3em; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def _markdown(text):
+    # The section text only uses **bold**
+    return "<p>" + _BOLD.sub(r"<strong>\1</strong>", html.escape(text)) + "</p>"
+
+
+def _name_candidates(path):
+    # "a", "a-daily_data", "x-a-daily_data", ... up to the whole path
+    path = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    dirs = [part for part in os.path.dirname(path).split(os.sep) if part]
+    candidates = [dirs[-1] if dirs else stem]
+    for depth in range(1, len(dirs) + 1):
+        candidates.append("-".join(dirs[len(dirs) - depth:] + [stem]))
+    return candidates
+
+
+def bundle_names(csv_paths):
+    """
+    Bundle directory name per CSV: its directory's name, extended with the file
+    name and then with parent directories while it collides with another's.
+    """
+    paths = [os.path.abspath(path) for path in csv_paths]
+    candidates = [_name_candidates(path) for path in paths]
+    depths = [0] * len(paths)
+    while True:
+        names = [options[depth] for options, depth in zip(candidates, depths)]
+        owners = {}
+        for name, path in zip(names, paths):
+            owners.setdefault(name, set()).add(path)
+        clashing = [
+            i for i, name in enumerate(names)
+            if len(owners[name]) > 1 and depths[i] < len(candidates[i]) - 1
+        ]
+        if not clashing:
+            break
+        for i in clashing:
+            depths[i] += 1
+
+    # Only the same CSV listed more than once is left
+    seen = {}
+    for i, name in enumerate(names):
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            names[i] = f"{name}-{seen[name]}"
+    return names
+
+
+############################################
+# WORKERS
+############################################
+
+# Last frame loaded by this worker, as (path, mtime, frame); a worker usually
+# renders several sections of the same user in a row
+_last = None
+
+
+def _init_worker():
+    import app  # noqa: F401  (pays the imports once per worker, not in the first task)
+    import render_cache
+
+    # The pool already keeps every core busy; no thread pool per process on top
+    render_cache.MAX_WORKERS = 1
+
+
+def _load(csv_path):
+    global _last
+    from loader import load_csv
+
+    mtime = os.stat(csv_path).st_mtime_ns
+    if _last is None or _last[:2] != (csv_path, mtime):
+        df = load_csv(csv_path, use_cache=False)
+        # One slot per store for every user this worker renders
+        df.attrs["source"] = "report"
+        _last = (csv_path, mtime, df)
+    return _last[2]
+
+
+def _save_png(figure, path):
+    import render_cache
+
+    figure.savefig(path, format="png", dpi=render_cache.DPI, bbox_inches="tight")
+
+
+def render_section(csv_path, section, bundle_dir, number):
+    """
+    Renders `section` (the `number`th of the report) for `csv_path` into
+    `bundle_dir`: writes its images under figures/ and returns the section's HTML.
+    """
+    import sections
+
+    df = _load(csv_path)
+    parts = [f"<h2>{html.escape(section)}</h2>"]
+    for i, (kind, value) in enumerate(sections.section_blocks(df, section)):
+        if kind == "markdown":
+            parts.append(_markdown(value))
+        elif kind == "plotly":
+            parts.append(value.to_html(full_html=False, include_plotlyjs=False, div_id=f"figure-{number}-{i}"))
+        elif kind in ("image", "figure"):
+            name = f"figures/{number:02d}-{i:02d}.png"
+            if kind == "image":
+                with open(os.path.join(bundle_dir, name), "wb") as f:
+                    f.write(value)
+            else:
+                _save_png(value, os.path.join(bundle_dir, name))
+            parts.append(f'<img src="{name}" alt="">')
+        else:
+            raise ValueError(f"Unknown block kind {kind!r}")
+    return f"<section>\n{chr(10).join(parts)}\n</section>"
+
+
+def render_sections(csv_path, numbered_sections, bundle_dir):
+    """render_section for each (number, section); returns [(number, html)]."""
+    return [(number, render_section(csv_path, section, bundle_dir, number)) for number, section in numbered_sections]
+
+
+############################################
+# BATCH
+############################################
+
+def _link_or_copy(source, target):
+    # Every bundle gets its own plotly.min.js; a hard link costs no space
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def build_reports(csv_paths, out_dir, workers=None, sections=REPORT_SECTIONS):
+    """
+    Writes one report bundle per CSV under `out_dir` and returns their paths,
+    in the order of `csv_paths`. Sections of all users render on a pool of
+    `workers` processes (default: one per core), one task per user when there
+    are enough users to go round, else one per section.
+    """
+    import plotly.offline
+
+    bundles = [os.path.join(out_dir, name) for name in bundle_names(csv_paths)]
+    plotly_js = None
+    for bundle in bundles:
+        os.makedirs(os.path.join(bundle, "figures"), exist_ok=True)
+        target = os.path.join(bundle, PLOTLY_JS)
+        if os.path.exists(target):
+            os.remove(target)
+        if plotly_js is None:
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(plotly.offline.get_plotlyjs())
+            plotly_js = target
+        else:
+            _link_or_copy(plotly_js, target)
+
+    workers = workers or os.cpu_count() or 1
+    numbered = list(enumerate(sections))
+    chunks = [numbered] if len(csv_paths) >= workers else [[item] for item in numbered]
+
+    done = [[None] * len(sections) for _ in csv_paths]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # User by user, so bundles are finished (and freed) as the batch goes
+        futures = {
+            pool.submit(render_sections, csv_path, chunk, bundle): user
+            for user, (csv_path, bundle) in enumerate(zip(csv_paths, bundles))
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            user = futures[future]
+            for number, part in future.result():
+                done[user][number] = part
+            if all(part is not None for part in done[user]):
+                title = f"Health report: {os.path.basename(bundles[user])}"
+                page = PAGE.format(title=html.escape(title), plotly_js=PLOTLY_JS, body="\n".join(done[user]))
+                with open(os.path.join(bundles[user], "index.html"), "w", encoding="utf-8") as f:
+                    f.write(page)
+                done[user] = []
+    return bundles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("csv", nargs="+", help="daily_data.csv files written by preprocess.py, one per user")
+    parser.add_argument("--out", required=True, help="Directory to write the report bundles into")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--sections", nargs="+", default=REPORT_SECTIONS, choices=REPORT_SECTIONS, metavar="SECTION")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bundles = build_reports(args.csv, args.out, args.workers, args.sections)
+    elapsed = time.perf_counter() - start
+    print(f"{len(bundles)} reports in {args.out} ({elapsed:.1f} s, {len(bundles) / elapsed * 3600:,.0f} reports/hour)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Joint optimum of Feel Average over sleep, sleep debt, air and weight.
+
+Feel Average is fitted as a full quadratic in the four factors (intercept,
+linear, squared and pairwise interaction terms: 15 coefficients) by least
+squares on the days where all of them are recorded. The factors are
+standardized on their full-history means and standard deviations first, which
+keeps the fourth-order sums of the normal equations well conditioned.
+
+The optimum is searched on a dense grid of candidate settings spanning the
+5th to 95th percentile of each factor, all candidates scored in one matrix
+product. Searching the grid rather than solving for the stationary point
+keeps the answer near the data (a quadratic surface is often a saddle, and
+its extremum can lie far outside it). The factors' ranges crossed with each
+other still make mostly combinations no day ever had, where the fit only
+extrapolates, so a candidate counts only when it is the grid point nearest to
+some complete day (for rolling fits, a day of that window), i.e. that day lies
+within half a grid step of it in every factor.
+Predictions are clipped to the Feel Average scale. The optimal range of a
+factor is the span of its values among the candidates predicted within
+TOLERANCE of the best.
+
+A fit needs ROWS_PER_TERM complete days per coefficient; with fewer the
+surface reports no optimum, and the per-pair fits (regression.py) remain.
+
+Rolling fits come from prefix sums of the per-day normal-equation terms: the
+sums over any window are the difference of two prefix sums, so the fits of
+every window are one batched solve, with no refit per window.
+
+Results are cached per dataset until its values change, in a fitting.FitCache
+bounded by memory like regression.py's.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import fitting
+import schema
+
+FACTORS = ["Sleep Duration", "Sleep Debt", "Air", "Weight"]
+TARGET = "Feel Average"
+
+# Candidate values per factor (GRID_POINTS ** len(FACTORS) candidates in all)
+GRID_POINTS = 16
+GRID_PERCENTILES = (5, 95)
+
+# Complete days needed per coefficient of the fit
+ROWS_PER_TERM = 3
+
+# Candidates predicted within this much of the best are optimal too: feelings
+# are whole numbers, so Feel Average itself only moves in half points
+TOLERANCE = 0.25
+
+# Rolling fits: window length in days, and days between window ends
+DEFAULT_WINDOW = 365
+DEFAULT_STEP = 7
+
+# pinv cutoff, looser than the default: a factor that stays constant within a
+# window leaves its terms near-singular rather than exactly so
+_RCOND = 1e-10
+
+# Scores at most this many (window, candidate) pairs at a time
+_CHUNK_CELLS = 4_000_000
+
+
+def _pairs(k):
+    return [(i, j) for i in range(k) for j in range(i, k)]
+
+
+def _features(z):
+    # [1, z_i, z_i * z_j for i <= j] per row of standardized values
+    i, j = np.array(_pairs(z.shape[1])).T
+    return np.concatenate([np.ones((len(z), 1)), z, z[:, i] * z[:, j]], axis=1)
+
+
+def _clip(predicted):
+    return np.clip(predicted, *schema.RANGES[TARGET])
+
+
+def _nearest_cells(x, low, high, grid_points):
+    """
+    Flat grid index of the candidate nearest to each row of `x`, or -1 for
+    rows more than half a grid step past the grid's edge.
+    """
+    step = np.where(high > low, (high - low) / (grid_points - 1), 1.0)
+    nearest = np.rint((x - low) / step).astype(np.int64)
+    inside = ((nearest >= 0) & (nearest < grid_points)).all(axis=1)
+    flat = np.ravel_multi_index(tuple(np.clip(nearest, 0, grid_points - 1).T), (grid_points,) * x.shape[1])
+    return np.where(inside, flat, -1)
+
+
+class ResponseSurface:
+    """Quadratic fit of TARGET on FACTORS: its optimum over the full history and per window."""
+
+    def __init__(self, df, factors=FACTORS, target=TARGET, grid_points=GRID_POINTS):
+        self.factors = list(factors)
+        self.target = target
+        self.terms = 1 + len(self.factors) + len(_pairs(len(self.factors)))
+        self.min_rows = ROWS_PER_TERM * self.terms
+
+        x = df[self.factors].to_numpy(dtype=float)
+        y = df[target].to_numpy(dtype=float)
+        complete = ~np.isnan(x).any(axis=1) & ~np.isnan(y)
+        dates = df["Date"].to_numpy(dtype="datetime64[D]")[complete]
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        x, y = x[complete][order], y[complete][order]
+        self.n = len(y)
+
+        self.means = x.mean(axis=0) if self.n else np.zeros(len(self.factors))
+        scales = x.std(axis=0) if self.n else np.ones(len(self.factors))
+        self.scales = np.where(scales > 0, scales, 1.0)
+        phi = _features((x - self.means) / self.scales)
+
+        # Prefix sums of the normal equations, with a leading zero row: the
+        # sums over rows [i, j) are prefix[j] - prefix[i]
+        self._prefix_a = np.concatenate([
+            np.zeros((1, self.terms, self.terms)),
+            np.cumsum(phi[:, :, None] * phi[:, None, :], axis=0),
+        ])
+        self._prefix_b = np.concatenate([np.zeros((1, self.terms)), np.cumsum(phi * y[:, None], axis=0)])
+
+        # Candidate grid, in original units and as features
+        if self.n:
+            low, high = np.percentile(x, GRID_PERCENTILES, axis=0)
+        else:
+            low = high = self.means
+        axes = [np.linspace(lo, hi, grid_points) for lo, hi in zip(low, high)]
+        self.grid = np.stack(np.meshgrid(*axes, indexing="ij"), -1).reshape(-1, len(self.factors))
+        self._grid_features = _features((self.grid - self.means) / self.scales)
+
+        # The candidate nearest to each complete day, and those of any day
+        self._near = _nearest_cells(x, low, high, grid_points)
+        self.candidates = np.zeros(len(self.grid), dtype=bool)
+        self.candidates[self._near[self._near >= 0]] = True
+
+        self.coefficients = fitting.solve(self._prefix_a[-1], self._prefix_b[-1], _RCOND)  # standardized units
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ss_total = (y ** 2).sum() - y.sum() ** 2 / self.n
+            ss_residual = (y ** 2).sum() - self.coefficients @ self._prefix_b[-1]
+            self.r2 = float(1 - ss_residual / ss_total) if self.n >= self.min_rows else np.nan
+
+        self._rolling = {}
+        self._lock = threading.Lock()
+
+    def predict(self, values):
+        """Predicted TARGET at the rows of `values` (one column per factor, original units)."""
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        return _clip(_features((values - self.means) / self.scales) @ self.coefficients)
+
+    def optimum(self, tolerance=TOLERANCE):
+        """
+        The best grid candidate for the full history as a dict, or None with
+        fewer than min_rows complete days:
+        {"n", "r2", "best": {factor: value}, "predicted", "ranges": {factor: (low, high)}}
+        """
+        if self.n < self.min_rows:
+            return None
+        grid = self.grid[self.candidates]
+        scores = self._grid_features[self.candidates] @ self.coefficients
+        # Ranked unclipped, so candidates past the top of the scale keep their order
+        best = int(np.argmax(scores))
+        clipped = _clip(scores)
+        near = grid[clipped >= clipped[best] - tolerance]
+        return {
+            "n": self.n,
+            "r2": self.r2,
+            "best": dict(zip(self.factors, map(float, grid[best]))),
+            "predicted": float(clipped[best]),
+            "ranges": {
+                factor: (float(lo), float(hi))
+                for factor, lo, hi in zip(self.factors, near.min(axis=0), near.max(axis=0))
+            },
+        }
+
+    def rolling(self, window=DEFAULT_WINDOW, step=DEFAULT_STEP):
+        """
+        Best grid candidate of the fit over each `window` days, for windows
+        ending every `step` days counted back from the last complete day.
+        Returns a frame indexed by the window's last complete Date with
+        columns "n", one per factor and "Predicted"; windows with fewer than
+        min_rows complete days, or none near a grid candidate, are left out.
+        """
+        key = (window, step)
+        with self._lock:
+            if key in self._rolling:
+                return self._rolling[key]
+
+        if self.n == 0:
+            ends = np.array([], dtype=int)
+        else:
+            span = (self.dates[-1] - self.dates[0]).astype(int)
+            end_dates = self.dates[-1] - np.arange(span // step, -1, -1) * np.timedelta64(step, "D")
+            ends = np.unique(np.searchsorted(self.dates, end_dates, side="right") - 1)
+        starts = np.searchsorted(self.dates, self.dates[ends] - np.timedelta64(window - 1, "D"))
+        counts = ends + 1 - starts
+        keep = counts >= self.min_rows
+        ends, starts, counts = ends[keep], starts[keep], counts[keep]
+
+        # Every window's normal equations at once, from the prefix sums
+        a = self._prefix_a[ends + 1] - self._prefix_a[starts]
+        b = self._prefix_b[ends + 1] - self._prefix_b[starts]
+        coefficients = fitting.solve(a, b, _RCOND)
+
+        # Scored on the candidates near any day; each window keeps those near its own days
+        cells = np.flatnonzero(self.candidates)
+        position = np.full(len(self.grid), -1)
+        position[cells] = np.arange(len(cells))
+        near = np.where(self._near >= 0, position[self._near], -1)
+        features = self._grid_features[cells]
+
+        best = np.empty(len(ends), dtype=int)
+        predicted = np.empty(len(ends))
+        covered = np.empty(len(ends), dtype=bool)
+        chunk = max(1, _CHUNK_CELLS // max(len(cells), 1))
+        for i in range(0, len(ends), chunk):
+            scores = coefficients[i:i + chunk] @ features.T
+            allowed = np.zeros(scores.shape, dtype=bool)
+            for row, (start, end) in enumerate(zip(starts[i:i + chunk], ends[i:i + chunk])):
+                window_cells = near[start:end + 1]
+                allowed[row, window_cells[window_cells >= 0]] = True
+            scores[~allowed] = -np.inf
+            covered[i:i + chunk] = allowed.any(axis=1)
+            top = scores.argmax(axis=1)
+            best[i:i + chunk] = cells[top]
+            predicted[i:i + chunk] = _clip(scores[np.arange(len(scores)), top])
+
+        result = pd.DataFrame(self.grid[best], columns=self.factors)
+        result.insert(0, "n", counts)
+        result["Predicted"] = predicted
+        result.index = pd.DatetimeIndex(self.dates[ends], name="Date")
+        result = result[covered]
+        with self._lock:
+            self._rolling[key] = result
+        return result
+
+
+# Fitted surfaces per dataset, refreshed when the values change. A 20-year
+# history holds about 23 MB of prefix sums and grid features.
+_results = fitting.FitCache(max_bytes=96 * 2**20)
+
+
+def surface_for(df, key=None):
+    """Returns the ResponseSurface for `df`, reusing the cached fit while the data is unchanged."""
+    key = key or df.attrs.get("source", "default")
+    return _results.get(key, df, ["Date", *FACTORS, TARGET], lambda: ResponseSurface(df))
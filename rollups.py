@@ -0,0 +1,177 @@
+"""
+Materialized day / ISO-week / month / year rollups of the daily data.
+
+For every numeric column the store keeps count, sum, min and max per period,
+keyed by (year, period): (year, day of year), (ISO year, ISO week),
+(year, month) and (year, 1). Means are derived as sum / count. Keying on the
+year keeps periods from different years apart.
+
+When the frame grows, only rows dated after the last update are aggregated and
+folded into the stored tables, which costs O(new rows + periods) rather than a
+full groupby. If rows at or before that date changed, the store rebuilds.
+"""
+import threading
+
+import pandas as pd
+
+import impute
+import render_cache
+
+GRANULARITIES = ("day", "week", "month", "year")
+STATS = ("mean", "min", "max", "count", "sum")
+
+# Stores kept per process, one per dataset
+MAX_STORES = 8
+
+# How partial aggregates of the same period combine
+_COMBINE = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+
+
+def _period_keys(dates, granularity):
+    if granularity == "day":
+        return dates.dt.year, dates.dt.dayofyear
+    if granularity == "week":
+        iso = dates.dt.isocalendar()
+        return iso["year"].astype("int64"), iso["week"].astype("int64")
+    if granularity == "month":
+        return dates.dt.year, dates.dt.month
+    if granularity == "year":
+        return dates.dt.year, pd.Series(1, index=dates.index)
+    raise ValueError(f"Unknown granularity {granularity!r}, expected one of {GRANULARITIES}")
+
+
+def _period_start(year, period, granularity):
+    if granularity == "day":
+        return pd.to_datetime(year.astype(str) + period.astype(str).str.zfill(3), format="%Y%j")
+    if granularity == "week":
+        return pd.to_datetime(
+            year.astype(str) + "-W" + period.astype(str).str.zfill(2) + "-1", format="%G-W%V-%u"
+        )
+    if granularity == "month":
+        return pd.to_datetime(year.astype(str) + "-" + period.astype(str).str.zfill(2) + "-01")
+    return pd.to_datetime(year.astype(str) + "-01-01")
+
+
+def _period_label(year, period, granularity):
+    if granularity == "day":
+        return _period_start(year, period, granularity).dt.strftime("%Y-%m-%d")
+    if granularity == "week":
+        return year.astype(str) + "-W" + period.astype(str).str.zfill(2)
+    if granularity == "month":
+        return year.astype(str) + "-" + period.astype(str).str.zfill(2)
+    return year.astype(str)
+
+
+def label_periods(out, granularity):
+    """Inserts start and label columns after the year and period columns of `out`."""
+    out.insert(2, "start", _period_start(out["year"], out["period"], granularity))
+    out.insert(3, "label", _period_label(out["year"], out["period"], granularity))
+    return out
+
+
+def _aggregate(df, value_cols, granularity):
+    year, period = _period_keys(df["Date"], granularity)
+    # Accumulate in float64 whatever the compact column dtypes (see schema.py)
+    values = df[value_cols].astype("float64")
+    grouped = values.groupby([year.rename("year"), period.rename("period")])
+    return grouped.agg(list(_COMBINE))
+
+
+class RollupStore:
+    """Incrementally maintained rollups for one dataset."""
+
+    def __init__(self):
+        self.value_cols = None
+        self.watermark = None
+        self._n_rows = 0
+        self._fingerprint = 0
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _hashes(self, df):
+        return pd.util.hash_pandas_object(df[["Date"] + self.value_cols], index=False)
+
+    def update(self, df):
+        """Folds rows of `df` newer than the last update into the rollups."""
+        df = df[df["Date"].notna()]
+        # The imputation bitmask is a flag, not a measurement
+        value_cols = [col for col in df.select_dtypes("number").columns if col != impute.MASK_COLUMN]
+        with self._lock:
+            hashes = None
+            if self.watermark is not None and value_cols == self.value_cols:
+                hashes = self._hashes(df)
+                seen = (df["Date"] <= self.watermark).to_numpy()
+                if seen.sum() != self._n_rows or hashes[seen].sum() != self._fingerprint:
+                    # Existing days changed, so the stored sums are stale
+                    self.watermark = None
+            else:
+                self.watermark = None
+
+            if self.watermark is None:
+                self.value_cols = value_cols
+                hashes = self._hashes(df)
+                new = df
+                self._tables = {}
+            else:
+                new = df[~seen]
+
+            if len(new):
+                for granularity in GRANULARITIES:
+                    partial = _aggregate(new, value_cols, granularity)
+                    table = self._tables.get(granularity)
+                    if table is not None:
+                        # Only periods that straddle the watermark get combined
+                        combined = pd.concat([table, partial])
+                        agg = {col: _COMBINE[col[1]] for col in combined.columns}
+                        partial = combined.groupby(level=["year", "period"]).agg(agg)
+                    self._tables[granularity] = partial.sort_index()
+
+            self.watermark = df["Date"].max() if len(df) else None
+            self._n_rows = len(df)
+            self._fingerprint = hashes.sum() if len(df) else 0
+        return self
+
+    def summary(self, granularity):
+        """All stats for `granularity`, with (column, stat) columns."""
+        with self._lock:
+            table = self._tables.get(granularity)
+            cols = pd.MultiIndex.from_product([self.value_cols or [], STATS])
+        if table is None:
+            _period_keys(pd.Series(dtype="datetime64[ns]"), granularity)  # validates the name
+            index = pd.MultiIndex.from_arrays([[], []], names=["year", "period"])
+            return pd.DataFrame(index=index, columns=cols)
+        counts = table.xs("count", axis=1, level=1)
+        sums = table.xs("sum", axis=1, level=1)
+        means = (sums / counts.where(counts > 0)).set_axis(
+            pd.MultiIndex.from_product([counts.columns, ["mean"]]), axis=1
+        )
+        return pd.concat([table, means], axis=1).reindex(columns=cols)
+
+    def table(self, granularity, stat="mean"):
+        """
+        One stat per column for `granularity`, as a flat frame with year, period,
+        start (first day of the period) and label columns.
+        """
+        if stat not in STATS:
+            raise ValueError(f"Unknown stat {stat!r}, expected one of {STATS}")
+        summary = self.summary(granularity)
+        values = summary.loc[:, summary.columns.get_level_values(1) == stat]
+        return label_periods(values.droplevel(1, axis=1).reset_index(), granularity)
+
+
+# One store per dataset, shared across Streamlit reruns in this process. As
+# with correlation's engines, bounded by count (stores grow after they are
+# cached); the least recently used is dropped.
+_stores = render_cache.LRUCache(max_entries=MAX_STORES)
+_stores_lock = threading.Lock()
+
+
+def rollups_for(df, key=None):
+    """Returns the up-to-date RollupStore for `df` (keyed by its source path)."""
+    key = key or df.attrs.get("source", "default")
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = RollupStore()
+            _stores.put(key, store)
+    return store.update(df)
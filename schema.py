@@ -0,0 +1,173 @@
+"""
+Column schema of the daily data, shared by preprocess.py and app.load_data.
+
+COLUMNS lists what preprocess.py writes to daily_data.csv, in order, with the
+in-memory dtype each column gets on load; DERIVED adds the columns load_data
+computes. The dtypes are chosen to keep the frame small:
+
+- repeated text (weather, meals, sports) as categoricals, one small code per day
+- the 1-10 feelings as nullable Int8, so a missing score stays missing
+- measurements as float32; journal values have a decimal or two, far inside
+  float32's ~7 significant digits
+- dates at the resolution pandas parses them, so histories reaching past
+  2262 (the end of nanosecond timestamps) load on pandas 3
+
+Sums and means over many days should be accumulated in float64 (as rollups,
+correlation and regression do via to_numpy(dtype=float)).
+
+coerce() converts a frame to these dtypes and validates it, raising
+SchemaError when a column is missing, a value cannot be converted or is out of
+range. memory_report() compares the bytes per row of two frames.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns of daily_data.csv, in order, with their dtype once loaded
+COLUMNS = {
+    "Date": "datetime64",  # at the resolution parsed (microseconds on pandas 3)
+    "Weather": "category",
+    "Weight": "float32",
+    "Feeling Morning": "Int8",
+    "Feeling Evening": "Int8",
+    "Air": "float32",
+    "Breakfast": "category",
+    "Lunch": "category",
+    "Dinner": "category",
+    "Sport Name": "category",
+    "Sport Duration": "category",
+    "Sleep Duration": "float32",
+    "Sleep Debt": "float32",
+}
+
+# Columns loader.load_csv adds
+DERIVED = {
+    "Feel Average": "float32",
+    "Imputed": "uint16",  # bitmask of the cells impute.py filled in
+}
+
+OUTPUT_COLUMNS = list(COLUMNS)
+
+# Inclusive bounds of valid values; None leaves that side open
+RANGES = {
+    "Weight": (0, 500),
+    "Feeling Morning": (1, 10),
+    "Feeling Evening": (1, 10),
+    "Air": (0, 1000),
+    "Sleep Duration": (0, 24),
+    "Sleep Debt": (None, None),
+    "Feel Average": (1, 10),
+}
+
+
+class SchemaError(ValueError):
+    """The frame does not match the schema."""
+
+
+# dtypes to hand pd.read_csv directly, so text is interned while parsing
+CSV_DTYPES = {col: dtype for col, dtype in COLUMNS.items() if dtype == "category"}
+
+
+def _describe(df, bad, column, problem):
+    # "Weight: 2 values out of range, first on 2025-01-03 ('612')"
+    first = np.flatnonzero(bad)[0]
+    where = f"row {first}"
+    date = pd.to_datetime(df["Date"].iloc[first], errors="coerce") if "Date" in df else pd.NaT
+    if pd.notna(date):
+        where = date.strftime("%Y-%m-%d")
+    return f"{column}: {int(bad.sum())} {problem}, first on {where} ('{df[column].iloc[first]}')"
+
+
+def _numbers(df, column, errors):
+    values = pd.to_numeric(df[column], errors="coerce")
+    unparsed = (values.isna() & df[column].notna()).to_numpy()
+    if unparsed.any():
+        errors.append(_describe(df, unparsed, column, "values are not numbers"))
+    return values.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def coerce(df, required=OUTPUT_COLUMNS):
+    """
+    Returns `df` with every schema column it has converted to its dtype, in
+    schema order (other columns follow unchanged). Raises SchemaError listing
+    every problem found, including any of the `required` columns missing.
+    """
+    missing = [col for col in required if col not in df]
+    if missing:
+        raise SchemaError(f"Missing columns: {', '.join(missing)}")
+
+    spec = {col: dtype for col, dtype in {**COLUMNS, **DERIVED}.items() if col in df}
+    out = {}
+    errors = []
+    for col, dtype in spec.items():
+        if dtype.startswith("datetime64"):
+            if pd.api.types.is_datetime64_dtype(df[col]):
+                out[col] = df[col]
+                continue
+            # Unparsable dates, and dates the resolution cannot hold, come back as NaT
+            dates = pd.to_datetime(df[col], errors="coerce")
+            unparsed = (dates.isna() & df[col].notna()).to_numpy()
+            if unparsed.any():
+                errors.append(_describe(df, unparsed, col, "values are not dates in the supported range"))
+            out[col] = dates
+            continue
+        if dtype == "category":
+            values = df[col]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                # Not via astype("str"), which writes missing cells as "nan" before pandas 3
+                values = values.astype("category")
+            if values.cat.categories.dtype != "str":
+                # Text categories even for an all-empty column, so the dtype survives Parquet
+                values = values.cat.rename_categories(values.cat.categories.astype("str"))
+            out[col] = values
+            continue
+
+        values = _numbers(df, col, errors)
+        present = ~np.isnan(values)
+        low, high = RANGES.get(col, (None, None))
+        bad = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            bad |= present & (values < low)
+        if high is not None:
+            bad |= present & (values > high)
+        if bad.any():
+            errors.append(_describe(df, bad, col, f"values outside {low}..{high}"))
+        if dtype == "Int8":
+            fractional = present & (values != np.round(values))
+            if fractional.any():
+                errors.append(_describe(df, fractional, col, "values are not whole numbers"))
+            if bad.any() or fractional.any():
+                continue
+            out[col] = pd.Series(values, index=df.index).astype("Int8")
+        else:
+            out[col] = values.astype(dtype)
+
+    if errors:
+        raise SchemaError("Invalid daily data:\n" + "\n".join(errors))
+
+    typed = pd.DataFrame(out, index=df.index)
+    rest = [col for col in df.columns if col not in spec]
+    if rest:
+        typed = pd.concat([typed, df[rest]], axis=1)
+    typed.attrs = dict(df.attrs)
+    return typed
+
+
+def validate(df, required=OUTPUT_COLUMNS):
+    """Raises SchemaError when `df` could not be coerced to the schema."""
+    coerce(df, required)
+
+
+def bytes_per_row(df):
+    """Deep memory usage of each column divided by the number of rows."""
+    return df.memory_usage(deep=True, index=False) / max(len(df), 1)
+
+
+def memory_report(before, after):
+    """
+    Bytes per row of each column of `before` and `after` (e.g. the frame as
+    parsed and after coerce), with a total row.
+    """
+    report = pd.DataFrame({"before": bytes_per_row(before), "after": bytes_per_row(after)})
+    report.loc["Total"] = report.sum()
+    report["saved"] = 1 - report["after"] / report["before"]
+    return report
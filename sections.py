@@ -0,0 +1,406 @@
+"""
+Content of the dashboard sections, independent of Streamlit.
+
+Each builder returns part of a section as a list of blocks, (kind, value)
+pairs drawn in order:
+
+    ("markdown", text)   a line of text, e.g. "**Weekly Avg Weight**"
+    ("plotly", figure)   a Plotly figure
+    ("image", png)       PNG bytes (phrase clouds, the correlation heatmap)
+    ("figure", figure)   a Matplotlib Figure
+
+app.py keeps the subheaders and widgets, passes the widget values in and draws
+the blocks with st.*; report.py renders the same blocks into static report
+bundles, using section_blocks() for whole sections at their default settings.
+
+The expensive, cacheable parts of the sections (ARTIFACTS) are fetched with
+`fetch(df, key)`. The default computes them directly; the dashboard passes one
+that serves its background prefetch (see prefetch.py).
+
+Plotly and Matplotlib are imported inside the builders that draw with them.
+"""
+import numpy as np
+
+import correlation
+import downsample
+import meals
+import regression
+import render_cache
+import response_surface
+import rollups
+import storage
+import timing
+
+SECTIONS = [
+    "Daily (Overall) Overview",
+    "Weekly Overview",
+    "Monthly Overview",
+    "Correlation",
+    "Optimal Values",
+    "Meal Impact"
+]
+
+# Numeric columns analysed by the correlation and optimal values sections
+NUMERIC_COLS = [
+    "Weight",
+    "Feeling Morning",
+    "Feeling Evening",
+    "Feel Average",
+    "Air",
+    "Sleep Duration",
+    "Sleep Debt"
+]
+
+# Columns shown as phrase clouds in the daily, weekly and monthly views
+CLOUD_COLUMNS = ["Weather", "Breakfast", "Lunch", "Dinner"]
+
+# Window of the rolling correlation until the user picks another
+DEFAULT_WINDOW = 30
+
+############################################
+# PHRASE CLOUDS, AGGREGATES AND FIGURES
+############################################
+
+def generate_phrase_cloud_from_frequencies(series, title="Phrase Cloud"):
+    """
+    Takes a Pandas Series of 'phrases' (e.g. "Japanese Curry", "Subway Egg & Mayo")
+    and generates a WordCloud treating each entire phrase as a single token.
+    The size of each phrase depends on its frequency in the Series.
+    Returns the rendered figure as PNG bytes, cached by render_cache.
+    """
+    return generate_phrase_clouds([(series, title)])[0]
+
+def generate_phrase_clouds(series_titles):
+    """
+    Renders several phrase clouds at once from (series, title) pairs, so the
+    ones missing from the cache are laid out concurrently.
+    """
+    with timing.span("groupby"):
+        requests = [
+            (series.value_counts().dropna().to_dict(), title)  # {phrase: count}
+            for series, title in series_titles
+        ]
+    return render_cache.render_phrase_clouds(requests)
+
+def view_phrase_clouds(df, suffix=""):
+    """The clouds of one view, in CLOUD_COLUMNS order, titled e.g. "Weather Phrases (All Weeks)"."""
+    return generate_phrase_clouds([(df[col], f"{col} Phrases{suffix}") for col in CLOUD_COLUMNS])
+
+def period_means(df, granularity):
+    """Mean of every numeric column per period: aggregated in SQL for database-backed frames."""
+    with timing.span("groupby"):
+        if df.attrs.get("backend") == "sqlite":
+            return storage.aggregate(df.attrs["source"], granularity, df.attrs.get("date_range"))
+        return rollups.rollups_for(df).table(granularity)
+
+# Charts only ship the visible range, downsampled to a point budget (see downsample.py)
+
+def line_figure(df, x_col, y_col, chart_title, x_range=None):
+    import plotly.express as px
+
+    plot_df = downsample.downsample_lines(df, x_col, [y_col], x_range=x_range)
+    render_mode = "webgl" if downsample.use_webgl(len(plot_df)) else "auto"
+    with timing.span("plotly.figure"):
+        return px.line(plot_df, x=x_col, y=y_col, title=chart_title, render_mode=render_mode)
+
+def bar_figure(df, x_col, y_cols, chart_title, barmode="group", x_range=None):
+    import plotly.express as px
+
+    plot_df = downsample.downsample_bars(df, x_col, y_cols, x_range=x_range)
+    with timing.span("plotly.figure"):
+        return px.bar(plot_df, x=x_col, y=y_cols, barmode=barmode, title=chart_title)
+
+############################################
+# ARTIFACTS
+############################################
+
+# The expensive, cacheable parts of the sections, computed from the loaded frame
+ARTIFACTS = {
+    "clouds: daily": view_phrase_clouds,
+    "means: week": lambda df: period_means(df, "week"),
+    "clouds: weekly": lambda df: view_phrase_clouds(df, " (All Weeks)"),
+    "means: month": lambda df: period_means(df, "month"),
+    "clouds: monthly": lambda df: view_phrase_clouds(df, " (All Months)"),
+    "correlation: heatmap": lambda df: correlation.heatmap_png(correlation.engine_for(df, NUMERIC_COLS)),
+    "regression: fits": lambda df: regression.regressions_for(df, NUMERIC_COLS),
+    "optimal: vertex interval": lambda df: (
+        regression.regressions_for(df, NUMERIC_COLS).vertex_interval("Sleep Duration", "Feel Average")
+    ),
+    "optimal: surface": response_surface.surface_for,
+    "optimal: rolling": lambda df: response_surface.surface_for(df).rolling(),
+    "meals: index": meals.index_for,
+}
+
+SECTION_ARTIFACTS = {
+    "Daily (Overall) Overview": ["clouds: daily"],
+    "Weekly Overview": ["means: week", "clouds: weekly"],
+    "Monthly Overview": ["means: month", "clouds: monthly"],
+    "Correlation": ["correlation: heatmap", "regression: fits"],
+    "Optimal Values": ["regression: fits", "optimal: vertex interval", "optimal: surface", "optimal: rolling"],
+    "Meal Impact": ["meals: index"],
+}
+
+def compute_artifact(df, key):
+    return ARTIFACTS[key](df)
+
+############################################
+# DAILY, WEEKLY AND MONTHLY VIEWS
+############################################
+
+def daily_blocks(df, x_range=None, fetch=compute_artifact):
+    cloud_weather, cloud_breakfast, cloud_lunch, cloud_dinner = fetch(df, "clouds: daily")
+    return [
+        # 1.1 Weight over Date (Line Graph)
+        ("markdown", "**Weight over Date**"),
+        ("plotly", line_figure(df, "Date", "Weight", "Weight over Date", x_range=x_range)),
+        # 1.2 Weather Phrase Cloud
+        ("markdown", "**Weather Phrase Cloud**"),
+        ("image", cloud_weather),
+        # 1.3 - 1.6 Feelings and Air over Date (Line Graphs)
+        ("markdown", "**Feel Morning over Date**"),
+        ("plotly", line_figure(df, "Date", "Feeling Morning", "Feel Morning over Date", x_range=x_range)),
+        ("markdown", "**Feel Evening over Date**"),
+        ("plotly", line_figure(df, "Date", "Feeling Evening", "Feel Evening over Date", x_range=x_range)),
+        ("markdown", "**Feel Average over Date**"),
+        ("plotly", line_figure(df, "Date", "Feel Average", "Feel Average over Date", x_range=x_range)),
+        ("markdown", "**Air over Date**"),
+        ("plotly", line_figure(df, "Date", "Air", "Air over Date", x_range=x_range)),
+        # 1.7 - 1.9 Meal Phrase Clouds
+        ("markdown", "**Breakfast Phrase Cloud**"),
+        ("image", cloud_breakfast),
+        ("markdown", "**Lunch Phrase Cloud**"),
+        ("image", cloud_lunch),
+        ("markdown", "**Dinner Phrase Cloud**"),
+        ("image", cloud_dinner),
+        # 1.10 Sleep Duration and Sleep Debt Over Date (Bar Chart)
+        ("markdown", "**Sleep Duration & Sleep Debt Over Date**"),
+        ("plotly", bar_figure(
+            df,
+            x_col="Date",
+            y_cols=["Sleep Duration", "Sleep Debt"],
+            chart_title="Sleep Duration and Sleep Debt Over Date",
+            x_range=x_range,
+        )),
+    ]
+
+def _period_blocks(df, granularity, fetch):
+    # Weekly and monthly views: the same charts over per-period means, with the
+    # phrase clouds of the entire data (per-period clouds would need a filter)
+    period, adjective, cloud_suffix = {
+        "week": ("Week", "Weekly", "Weeks"),
+        "month": ("Month", "Monthly", "Months"),
+    }[granularity]
+    means = fetch(df, f"means: {granularity}").rename(columns={"label": period})
+    cloud_weather, cloud_breakfast, cloud_lunch, cloud_dinner = fetch(df, f"clouds: {adjective.lower()}")
+
+    def line(col, name):
+        return [
+            ("markdown", f"**{adjective} Avg {name}**"),
+            ("plotly", line_figure(means, period, col, f"{adjective} Average {name}")),
+        ]
+
+    def cloud(name, png):
+        return [("markdown", f"**(Optional) Single {name} Phrase Cloud for entire data**"), ("image", png)]
+
+    return [
+        *line("Weight", "Weight"),
+        *cloud("Weather", cloud_weather),
+        *line("Feeling Morning", "Feel Morning"),
+        *line("Feeling Evening", "Feel Evening"),
+        *line("Feel Average", "Feel Average"),
+        *line("Air", "Air"),
+        *cloud("Breakfast", cloud_breakfast),
+        *cloud("Lunch", cloud_lunch),
+        *cloud("Dinner", cloud_dinner),
+        ("markdown", f"**{adjective} Avg Sleep Duration & Sleep Debt**"),
+        ("plotly", bar_figure(
+            means,
+            x_col=period,
+            y_cols=["Sleep Duration", "Sleep Debt"],
+            chart_title=f"{adjective} Average Sleep Duration & Sleep Debt",
+        )),
+    ]
+
+def weekly_blocks(df, fetch=compute_artifact):
+    """Weekly means per (year, ISO week), from the rollup store or the database."""
+    return _period_blocks(df, "week", fetch)
+
+def monthly_blocks(df, fetch=compute_artifact):
+    """Monthly means per (year, month), from the rollup store or the database."""
+    return _period_blocks(df, "month", fetch)
+
+############################################
+# CORRELATION
+############################################
+
+def correlation_matrix_blocks(df, start=None, end=None, fetch=compute_artifact):
+    """Heatmap of the running pairwise correlations (see correlation.py) within [start, end]."""
+    if start is None and end is None:
+        heatmap = fetch(df, "correlation: heatmap")
+    else:
+        heatmap = correlation.heatmap_png(correlation.engine_for(df, NUMERIC_COLS), start, end)
+    return [("image", heatmap)]
+
+def scatter_blocks(df, x_var, y_var, fetch=compute_artifact):
+    """Scatter plot of the pair with the OLS line from the precomputed all-pairs fits."""
+    import plotly.express as px
+
+    fit = fetch(df, "regression: fits").lookup(x_var, y_var)
+    with timing.span("plotly.figure"):
+        fig_scatter = px.scatter(df, x=x_var, y=y_var,
+                                 title=f"{x_var} vs {y_var} with Regression")
+        intercept, slope = fit["linear"]
+        x_line = np.array([df[x_var].min(), df[x_var].max()])
+        fig_scatter.add_scatter(x=x_line, y=intercept + slope * x_line, mode="lines",
+                                name=f"OLS (R²={fit['r2_linear']:.3f})")
+    return [("plotly", fig_scatter)]
+
+def rolling_blocks(df, x_var, y_var, window=DEFAULT_WINDOW):
+    """Rolling correlation of the pair over `window` days."""
+    engine = correlation.engine_for(df, NUMERIC_COLS)
+    rolling = engine.rolling_pair(x_var, y_var, window).rename("Correlation").reset_index()
+    title = f"{window}-day Rolling Correlation: {x_var} vs {y_var}"
+    return [("plotly", line_figure(rolling, "Date", "Correlation", title))]
+
+############################################
+# OPTIMAL VALUES
+############################################
+
+def optimal_values_blocks(df, fetch=compute_artifact):
+    """
+    Attempt to find an overall "optimal" Sleep Duration for maximizing Feel Average.
+    We'll do a simple polynomial regression of degree=2:
+    Feel Average ~ a*(Sleep Duration)^2 + b*(Sleep Duration) + c
+    Then find vertex of the parabola.
+    """
+    from matplotlib.figure import Figure
+
+    # Look up the degree-2 fit among the precomputed all-pairs fits (see regression.py)
+    regressions = fetch(df, "regression: fits")
+    fit = regressions.lookup("Sleep Duration", "Feel Average")
+
+    if fit["n"] < 3:
+        return [("markdown", "Not enough data to perform polynomial regression.")]
+
+    # Coefficients: FeelAvg = c + b*Sleep + a*Sleep^2
+    c, b, a = fit["quadratic"]
+
+    blocks = [("markdown", f"Polynomial Model: FeelAverage = {a:.3f}*Sleep^2 + {b:.3f}*Sleep + {c:.3f}")]
+
+    # If 'a' != 0, the vertex is at x = -b / (2a)
+    # That's the "optimal" Sleep Duration for maximum or minimum
+    if a == 0:
+        blocks.append(("markdown", "Coefficient a=0, so the relationship is linear, not quadratic."))
+        # If b > 0 => more sleep better, if b < 0 => less sleep better
+        # We can just show a scatter with regression line
+        slope_direction = "Positive" if b > 0 else "Negative"
+        blocks.append(("markdown", f"Slope is {slope_direction}. No single 'optimal' point in a strictly linear sense."))
+    else:
+        x_opt = fit["vertex"]
+        interval = fetch(df, "optimal: vertex interval")
+        blocks.append(("markdown", f"**Optimal Sleep Duration** (vertex of parabola) = {x_opt:.2f} hours"))
+        kept = f"{interval['kept']:.0%} of replicates with the same curvature and a vertex within the data"
+        if np.isnan(interval["low"]):
+            blocks.append(("markdown", f"No bootstrap interval for the optimum: only {kept}"))
+        else:
+            blocks.append((
+                "markdown",
+                f"95% bootstrap interval for the optimum: {interval['low']:.2f} - {interval['high']:.2f} hours ({kept})",
+            ))
+
+    # Let's plot the curve
+    sub_df = df.dropna(subset=["Sleep Duration", "Feel Average"])
+    X = sub_df["Sleep Duration"].to_numpy(dtype=float)
+    y = sub_df["Feel Average"].to_numpy(dtype=float)
+    sleep_range = np.linspace(np.min(X), np.max(X), 100)
+    pred_range = regressions.predict_quadratic("Sleep Duration", "Feel Average", sleep_range)
+
+    # Object-oriented API rather than pyplot, so no global figure state is kept
+    fig_opt = Figure()
+    ax_opt = fig_opt.subplots()
+    ax_opt.scatter(X, y, alpha=0.5, label="Actual Data")
+    ax_opt.plot(sleep_range, pred_range, color="red", label="Polynomial Fit")
+    ax_opt.set_xlabel("Sleep Duration (hrs)")
+    ax_opt.set_ylabel("Feel Average")
+    ax_opt.set_title("Feel Average vs Sleep Duration (Polynomial Regression)")
+    ax_opt.legend()
+    blocks.append(("figure", fig_opt))
+    return blocks
+
+def joint_optimum_blocks(df, fetch=compute_artifact):
+    """
+    Optimal ranges of sleep, sleep debt, air and weight taken together, from
+    the quadratic response surface of Feel Average (see response_surface.py).
+    """
+    optimum = fetch(df, "optimal: surface").optimum()
+    if optimum is None:
+        surface = fetch(df, "optimal: surface")
+        return [(
+            "markdown",
+            f"Not enough complete days to fit the response surface: {surface.n} of the {surface.min_rows} needed "
+            f"for its {surface.terms} coefficients. The per-pair fit of sleep above still applies.",
+        )]
+
+    blocks = [(
+        "markdown",
+        f"Quadratic response surface on {optimum['n']} complete days, R² = {optimum['r2']:.3f}. "
+        f"Best predicted Feel Average: {optimum['predicted']:.2f}",
+    )]
+    for factor, (low, high) in optimum["ranges"].items():
+        blocks.append(("markdown", f"**{factor}**: {low:.2f} - {high:.2f} (best {optimum['best'][factor]:.2f})"))
+    return blocks
+
+def rolling_optimum_blocks(df, window=response_surface.DEFAULT_WINDOW, fetch=compute_artifact):
+    """The best setting of each factor per `window` days, one panel per factor."""
+    import plotly.express as px
+
+    if window == response_surface.DEFAULT_WINDOW:
+        rolling = fetch(df, "optimal: rolling")
+    else:
+        rolling = fetch(df, "optimal: surface").rolling(window)
+    if rolling.empty:
+        return [("markdown", f"Not enough complete days for {window}-day windows.")]
+
+    columns = [*response_surface.FACTORS, "Predicted"]
+    long_df = rolling[columns].reset_index().melt(id_vars="Date", var_name="Variable", value_name="Value")
+    with timing.span("plotly.figure"):
+        fig = px.line(long_df, x="Date", y="Value", facet_row="Variable", height=180 * len(columns),
+                      title=f"Optimum per {window}-day Window")
+        fig.update_yaxes(matches=None, title_text="")
+        fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+    return [("plotly", fig)]
+
+############################################
+# WHOLE SECTIONS
+############################################
+
+def section_blocks(df, section, fetch=compute_artifact):
+    """
+    All blocks of `section` with every widget at its default, headings
+    included; what the dashboard shows when the section is first opened.
+    """
+    if section == "Daily (Overall) Overview":
+        return daily_blocks(df, fetch=fetch)
+    if section == "Weekly Overview":
+        return weekly_blocks(df, fetch=fetch)
+    if section == "Monthly Overview":
+        return monthly_blocks(df, fetch=fetch)
+    if section == "Correlation":
+        x_var, y_var = NUMERIC_COLS[:2]
+        return [
+            ("markdown", "**Correlation Matrix**"),
+            *correlation_matrix_blocks(df, fetch=fetch),
+            ("markdown", "**Scatter Plot & Regression**"),
+            *scatter_blocks(df, x_var, y_var, fetch=fetch),
+            ("markdown", "**Rolling Correlation**"),
+            *rolling_blocks(df, x_var, y_var),
+        ]
+    if section == "Optimal Values":
+        return [
+            *optimal_values_blocks(df, fetch=fetch),
+            ("markdown", "**Joint Optimum**"),
+            *joint_optimum_blocks(df, fetch=fetch),
+            ("markdown", "**Optimum per Window**"),
+            *rolling_optimum_blocks(df, fetch=fetch),
+        ]
+    raise ValueError(f"No static blocks for section {section!r}")
@@ -0,0 +1,273 @@
+"""
+Embedded SQLite storage behind app.load_data.
+
+The prepared frame (derived columns included) lives in one `daily` table keyed
+by Date, stored as ISO text so the primary key orders rows by day. The table is
+clustered on that key (WITHOUT ROWID), so a date range is one contiguous index
+scan. Period keys (ISO year and week, year, month, day of year) are materialized
+at import time, which lets the weekly and monthly views aggregate in SQL over
+the selected range instead of loading every row.
+
+Set DASHBOARD_DB to the database file to make the dashboard read from it:
+
+    python storage.py migrate --csv daily_data.csv --db daily_data.db
+    DASHBOARD_DB=daily_data.db streamlit run app.py
+
+Re-run the migration after preprocess.py to pick up new days; the table is
+replaced in a single transaction, so a running dashboard keeps reading the old
+rows until the commit. Read connections come from a small per-file pool that
+lives as long as the process, so Streamlit reruns reuse open connections.
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+import impute
+import loader
+import rollups
+import schema
+
+DB_PATH = os.environ.get("DASHBOARD_DB")
+# Days of history loaded by default when reading from the database
+DEFAULT_WINDOW_DAYS = int(os.environ.get("DASHBOARD_HISTORY_DAYS", 365))
+POOL_SIZE = 4
+
+TABLE = "daily"
+
+# (year, period) columns per granularity, filled in by migrate()
+_PERIOD_KEYS = {
+    "day": ("_year", "_yday"),
+    "week": ("_iso_year", "_iso_week"),
+    "month": ("_year", "_month"),
+    "year": ("_year", "1"),
+}
+
+_SQL_STATS = {"mean": "AVG", "min": "MIN", "max": "MAX", "count": "COUNT", "sum": "TOTAL"}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _where(date_range):
+    # WHERE clause and parameters for an inclusive (start, end) range; either end may be None
+    if date_range is None:
+        return "", []
+    clauses, params = [], []
+    start, end = date_range
+    if start is not None:
+        clauses.append("Date >= ?")
+        params.append(_day(start))
+    if end is not None:
+        clauses.append("Date <= ?")
+        params.append(_day(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class ConnectionPool:
+    """Up to `size` read-only connections to one database file, handed out one at a time."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self):
+        # Streamlit reruns a session on different threads, but a connection is
+        # only ever used by the thread that currently holds it
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                # End any read transaction so the next holder sees committed migrations
+                conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# One pool per database file, shared across Streamlit reruns in this process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_for(db_path):
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if not os.path.exists(key):
+                raise FileNotFoundError(f"No database at {key}; run `python storage.py migrate` first")
+            pool = _pools[key] = ConnectionPool(key)
+    return pool
+
+
+def close_all():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def _data_columns(conn):
+    # (name, type) of the stored frame's columns, without the period keys
+    rows = conn.execute(f"PRAGMA table_info({TABLE})").fetchall()
+    return [(name, col_type) for _, name, col_type, *_ in rows if not name.startswith("_")]
+
+
+def date_bounds(db_path):
+    """First and last stored date, as Timestamps (None, None for an empty table)."""
+    with pool_for(db_path).connection() as conn:
+        first, last = conn.execute(f"SELECT MIN(Date), MAX(Date) FROM {TABLE}").fetchone()
+    if first is None:
+        return None, None
+    return pd.Timestamp(first), pd.Timestamp(last)
+
+
+def load_frame(db_path, date_range=None, columns=None):
+    """
+    Rows dated within `date_range` (inclusive, or everything when None) as the
+    frame loader.load_csv returns, columns in the same order.
+    """
+    where, params = _where(date_range)
+    with pool_for(db_path).connection() as conn:
+        types = dict(_data_columns(conn))
+        names = [name for name in types if columns is None or name == "Date" or name in columns]
+        sql = f"SELECT {', '.join(map(_quote, names))} FROM {TABLE}{where} ORDER BY Date"
+        df = pd.read_sql_query(sql, conn, params=params)
+    df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+    # Same dtypes and column order as the CSV path; this also turns all-NULL
+    # columns, which SQLite hands back as object, into numbers
+    df = schema.coerce(df, required=["Date"])[names]
+    df.attrs["source"] = os.path.abspath(db_path)
+    df.attrs["backend"] = "sqlite"
+    df.attrs["date_range"] = date_range
+    return df
+
+
+def aggregate(db_path, granularity, date_range=None, stat="mean"):
+    """
+    One stat per numeric column for each period in `date_range`, computed by
+    SQLite. Same layout as rollups.RollupStore.table.
+    """
+    if granularity not in _PERIOD_KEYS:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of {tuple(_PERIOD_KEYS)}")
+    if stat not in _SQL_STATS:
+        raise ValueError(f"Unknown stat {stat!r}, expected one of {tuple(_SQL_STATS)}")
+    year, period = _PERIOD_KEYS[granularity]
+    where, params = _where(date_range)
+    with pool_for(db_path).connection() as conn:
+        value_cols = [
+            name for name, col_type in _data_columns(conn)
+            if col_type in ("INTEGER", "REAL") and name != impute.MASK_COLUMN
+        ]
+        selects = [f"{_SQL_STATS[stat]}({_quote(col)}) AS {_quote(col)}" for col in value_cols]
+        sql = (
+            f"SELECT {year} AS year, {period} AS period, {', '.join(selects)} FROM {TABLE}{where}"
+            " GROUP BY 1, 2 ORDER BY 1, 2"
+        )
+        out = pd.read_sql_query(sql, conn, params=params)
+    out[["year", "period"]] = out[["year", "period"]].astype("int64")
+    # As in load_frame, all-NULL results come back as object
+    out[value_cols] = out[value_cols].astype(float)
+    return rollups.label_periods(out, granularity)
+
+
+def migrate(csv_path, db_path):
+    """
+    Imports the CSV written by preprocess.py into `db_path`, replacing the
+    stored rows. Returns the number of rows stored.
+    """
+    df = loader.load_csv(csv_path, use_cache=False)
+    df = df[df["Date"].notna()].drop_duplicates("Date", keep="last")
+    iso = df["Date"].dt.isocalendar()
+    keys = {
+        "_year": df["Date"].dt.year,
+        "_yday": df["Date"].dt.dayofyear,
+        "_iso_year": iso["year"],
+        "_iso_week": iso["week"],
+        "_month": df["Date"].dt.month,
+    }
+    data_cols = list(df.columns)
+    columns = [(col, "TEXT NOT NULL PRIMARY KEY" if col == "Date" else _sql_type(df[col].dtype)) for col in data_cols]
+    columns += [(key, "INTEGER NOT NULL") for key in keys]
+
+    # Plain Python values: None for missing cells, ISO text for dates
+    rows = df.astype(object).where(df.notna(), None)
+    rows["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+    # float32 values go in by their shortest repr, so SQL sums add 7.4 rather than 7.4000001
+    for col in df.select_dtypes("float32").columns:
+        rows[col] = df[col].astype(str).astype(float).astype(object).where(df[col].notna(), None)
+    for key, values in keys.items():
+        rows[key] = values.astype("int64")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        # WAL lets dashboards keep reading while a migration writes
+        conn.execute("PRAGMA journal_mode = WAL")
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            conn.execute(
+                f"CREATE TABLE {TABLE} ({', '.join(f'{_quote(c)} {t}' for c, t in columns)}) WITHOUT ROWID"
+            )
+            placeholders = ", ".join("?" * len(columns))
+            conn.executemany(
+                f"INSERT INTO {TABLE} VALUES ({placeholders})",
+                rows[[c for c, _ in columns]].itertuples(index=False, name=None),
+            )
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the dashboard's SQLite database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="Import preprocess.py output into the database.")
+    migrate_parser.add_argument("--csv", default="daily_data.csv", help="CSV written by preprocess.py.")
+    migrate_parser.add_argument("--db", default=DB_PATH or "daily_data.db", help="Database file to write.")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        rows = migrate(args.csv, args.db)
+        print(f"Imported {rows} rows into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+SAMPLE_CSV = os.path.join(ROOT, 'daily_data.csv')
+
+
+@pytest.fixture
+def sample():
+    # The bundled data as the dashboard loads it, without touching the Parquet cache
+    import loader
+
+    return loader.load_csv(SAMPLE_CSV, use_cache=False)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+import correlation
+
+COLUMNS = ['Weight', 'Feeling Morning', 'Feeling Evening', 'Air', 'Sleep Duration']
+
+
+def with_gaps(sample):
+    # Missing values in different rows per column, so the pair counts differ
+    df = sample.copy()
+    df.loc[[2, 9], 'Weight'] = np.nan
+    df.loc[[5, 9, 20], 'Air'] = np.nan
+    return df
+
+
+def reference(df):
+    return df[COLUMNS].astype(float).corr()
+
+
+def test_updates_match_df_corr(sample):
+    df = with_gaps(sample)
+    engine = correlation.CorrelationEngine(COLUMNS)
+    # Several appends, so the buffers grow more than once
+    for end in (1, 4, 11, 12, len(df)):
+        engine.update(df.iloc[:end])
+        pd.testing.assert_frame_equal(engine.matrix(), reference(df.iloc[:end]), check_names=False)
+
+
+def test_edited_history_matches_df_corr(sample):
+    df = with_gaps(sample)
+    engine = correlation.CorrelationEngine(COLUMNS).update(df)
+    df.loc[7, 'Air'] = 400.0
+    engine.update(df)
+    pd.testing.assert_frame_equal(engine.matrix(), reference(df), check_names=False)
+
+
+def test_date_range_matches_df_corr(sample):
+    df = with_gaps(sample)
+    engine = correlation.CorrelationEngine(COLUMNS).update(df.iloc[:10]).update(df)
+    start, end = df['Date'].iloc[4], df['Date'].iloc[18]
+    expected = reference(df[df['Date'].between(start, end)])
+    pd.testing.assert_frame_equal(engine.matrix(start, end), expected, check_names=False)
+
+
+def test_rolling_matches_pandas_rolling_corr(sample):
+    df = with_gaps(sample)
+    engine = correlation.CorrelationEngine(COLUMNS).update(df)
+    got = engine.rolling_pair('Weight', 'Air', 7)
+    frame = df.set_index('Date')[['Weight', 'Air']].astype(float)
+    expected = frame['Weight'].rolling('7D').corr(frame['Air'])
+    # pandas gives inf where a column is constant over the window, i.e. undefined
+    expected = expected.replace([np.inf, -np.inf], np.nan)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+    pd.testing.assert_index_equal(got.index, expected.index, check_names=False, exact=False)
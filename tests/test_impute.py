@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import impute
+
+
+def with_gaps(n, columns, seed=0):
+    # Single missing days, runs longer than the gap limit and missing ends
+    rng = np.random.default_rng(seed)
+    values = rng.normal(5, 2, (n, columns))
+    values[rng.random((n, columns)) < 0.2] = np.nan
+    for column in range(columns):
+        start = rng.integers(0, n - 12)
+        values[start:start + rng.integers(3, 12), column] = np.nan
+    values[:2, 0] = np.nan
+    values[-3:, -1] = np.nan
+    return values
+
+
+def gap_lengths(missing):
+    # Length of the run of missing days each day belongs to
+    run = (~missing).cumsum()
+    return missing.groupby(run).transform('sum')
+
+
+@pytest.mark.parametrize('max_gap', [2, 7])
+def test_interpolate_matches_pandas(max_gap):
+    values = with_gaps(200, 3)
+    filled, imputed = impute.fill(values, ['interpolate'] * 3, max_gap)
+    for column in range(3):
+        series = pd.Series(values[:, column])
+        bridged = series.interpolate(limit_area='inside').where(gap_lengths(series.isna()) <= max_gap)
+        expected = series.fillna(bridged)
+        np.testing.assert_allclose(filled[:, column], expected, rtol=1e-12)
+        np.testing.assert_array_equal(imputed[:, column], series.isna() & expected.notna())
+
+
+def test_ffill_matches_pandas():
+    values = with_gaps(200, 2, seed=1)
+    filled, _ = impute.fill(values, ['ffill'] * 2, max_gap=3)
+    for column in range(2):
+        series = pd.Series(values[:, column])
+        missing = series.isna()
+        since = missing.groupby((~missing).cumsum()).cumsum()
+        np.testing.assert_array_equal(filled[:, column], series.fillna(series.ffill().where(since <= 3)))
+
+
+def test_rolling_median_matches_pandas():
+    values = with_gaps(200, 3, seed=2)
+    filled, _ = impute.fill(values, ['rolling_median'] * 3)
+    for column in range(3):
+        series = pd.Series(values[:, column])
+        median = series.rolling(impute.ROLLING_DAYS, center=True, min_periods=impute.ROLLING_MIN_PERIODS).median()
+        np.testing.assert_allclose(filled[:, column], series.fillna(median), rtol=1e-12)
+
+
+def test_mixed_strategies_and_whole_numbers():
+    values = with_gaps(120, 3, seed=3)
+    values[:, 1] = np.round(values[:, 1])
+    strategies = ['interpolate', 'rolling_median', 'none']
+    filled, imputed = impute.fill(values, strategies, whole=np.array([False, True, False]))
+    alone, _ = impute.fill(values[:, :1], strategies[:1])
+    np.testing.assert_array_equal(filled[:, 0], alone[:, 0])
+    assert np.array_equal(filled[:, 1], np.round(filled[:, 1]), equal_nan=True)
+    np.testing.assert_array_equal(filled[:, 2], values[:, 2])
+    assert not imputed[:, 2].any()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+import meals
+
+METRICS = ['Feel Average', 'Feeling Morning', 'Weight', 'Air', 'Sleep Duration']
+
+
+def eaten(df, term):
+    # Days with `term` in any meal slot, one cell at a time
+    key = term.casefold()
+    cells = df[list(meals.MEAL_SLOTS)]
+    return cells.apply(
+        lambda column: column.map(
+            lambda cell: pd.notna(cell) and any(t.casefold() == key for t, _ in meals.split_meal(str(cell)))
+        )
+    ).any(axis=1)
+
+
+def reference(df, term):
+    # Mean, variance and count on days with and without the term, by groupby
+    stats = df[METRICS].astype(float).groupby(eaten(df, term)).agg(['mean', 'var', 'count'])
+    with_term, without = stats.loc[True], stats.loc[False]
+    rows = []
+    for metric in METRICS:
+        n1, n2 = with_term[(metric, 'count')], without[(metric, 'count')]
+        v1, v2 = with_term[(metric, 'var')], without[(metric, 'var')]
+        pooled_sd = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+        difference = with_term[(metric, 'mean')] - without[(metric, 'mean')]
+        rows.append([
+            n1, with_term[(metric, 'mean')], without[(metric, 'mean')], difference,
+            difference / pooled_sd if pooled_sd > 0 else np.nan,
+        ])
+    return np.array(rows, dtype=float)
+
+
+def test_effects_match_a_groupby(sample):
+    # Gaps on different days per metric, so the counts differ too
+    sample = sample.copy()
+    sample.loc[[1, 8], 'Weight'] = np.nan
+    sample.loc[[3, 8, 17], 'Air'] = np.nan
+    index = meals.MealIndex(sample)
+    effects = index.effects(sample, METRICS, min_days=2)
+    # A sample variance needs two days, both with and without the term
+    terms = [term for term, days in zip(index.vocabulary['term'], index.vocabulary['days'])
+             if 2 <= days <= len(sample) - 2]
+    assert len(terms) > 5
+    for term in terms:
+        got = effects[effects['term'] == term]
+        assert got['metric'].tolist() == METRICS
+        got = got[['n_with', 'mean_with', 'mean_without', 'difference', 'effect_size']].to_numpy(dtype=float)
+        np.testing.assert_allclose(got, reference(sample, term), rtol=1e-9, atol=1e-9, err_msg=term)
+
+
+def test_days_with_matches_a_scan(sample):
+    index = meals.MealIndex(sample)
+    for term in index.vocabulary['term']:
+        np.testing.assert_array_equal(index.days_with(term), eaten(sample, term).to_numpy(), err_msg=term)
+    brand, item = 'Subway', 'Subway:Egg&Mayo'
+    expected = (eaten(sample, brand) & eaten(sample, item)).to_numpy()
+    np.testing.assert_array_equal(index.days_with(brand, item), expected)
@@ -0,0 +1,195 @@
+import itertools
+import os
+
+import pandas as pd
+import pytest
+
+import preprocess
+
+# Distinct mtimes for every write, however fast the writes follow each other
+_mtimes = itertools.count(1_700_000_000 * 10**9, 10**9)
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    mtime = next(_mtimes)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def read_csv(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def rebuilt(journal, tmp_path):
+    # The output a full parse of the journal gives
+    expected = tmp_path / 'expected.csv'
+    preprocess.full_rebuild(str(journal), str(expected))
+    return read_csv(expected)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    path = tmp_path / 'journal.md'
+    write(path, preprocess.markdown_data)
+    return path
+
+
+@pytest.fixture
+def output(journal, tmp_path):
+    path = tmp_path / 'daily_data.csv'
+    assert preprocess.ingest(str(journal), str(path)) == ('rebuilt', 26)
+    return path
+
+
+def test_unchanged_journal_is_skipped(journal, output):
+    assert preprocess.ingest(str(journal), str(output)) == ('unchanged', 0)
+
+
+def test_append_parses_only_new_rows(journal, output, tmp_path):
+    row = ('| [[2025-02-03]] | Rainy | 81kg | 7 | 8 | Running/30m | 7hr/<br>1.0hr '
+           '| Yogurt/<br>Ramen/<br>Pizza | 51-100 |\n')
+    write(journal, preprocess.markdown_data.rstrip('\n') + '\n' + row)
+    assert preprocess.ingest(str(journal), str(output)) == ('appended', 1)
+    pd.testing.assert_frame_equal(read_csv(output), rebuilt(journal, tmp_path))
+    assert preprocess.ingest(str(journal), str(output)) == ('unchanged', 0)
+
+
+def test_same_length_edit_is_upserted(journal, output, tmp_path):
+    lines = preprocess.markdown_data.split('\n')
+    i = next(i for i, line in enumerate(lines) if '[[2025-01-10]]' in line)
+    lines[i] = lines[i].replace('Sunny', 'Rainy')
+    write(journal, '\n'.join(lines))
+    assert os.path.getsize(journal) == len(preprocess.markdown_data.encode('utf-8'))
+
+    assert preprocess.ingest(str(journal), str(output)) == ('upserted', 1)
+    df = read_csv(output)
+    assert df.loc[df['Date'] == '2025-01-10', 'Weather'].item() == 'Rainy'
+    pd.testing.assert_frame_equal(df, rebuilt(journal, tmp_path))
+
+
+def test_deleted_row_is_dropped(journal, output, tmp_path):
+    lines = [line for line in preprocess.markdown_data.split('\n') if '[[2025-01-15]]' not in line]
+    write(journal, '\n'.join(lines))
+    assert preprocess.ingest(str(journal), str(output)) == ('upserted', 0)
+    df = read_csv(output)
+    assert '2025-01-15' not in set(df['Date'])
+    pd.testing.assert_frame_equal(df, rebuilt(journal, tmp_path))
+
+
+def test_changed_header_rebuilds(journal, output, tmp_path):
+    write(journal, preprocess.markdown_data.replace('| Air     |', '| Air |', 1))
+    assert preprocess.ingest(str(journal), str(output)) == ('rebuilt', 26)
+    pd.testing.assert_frame_equal(read_csv(output), rebuilt(journal, tmp_path))
+
+
+def stored_block_hashes(output):
+    return preprocess._load_state(str(output))['block_hashes']
+
+
+def test_block_hashes_follow_appends_and_edits(journal, tmp_path, monkeypatch):
+    # Blocks far smaller than the journal, so edits land in earlier blocks
+    monkeypatch.setattr(preprocess, 'HASH_BLOCK', 256)
+    output = tmp_path / 'daily_data.csv'
+    preprocess.ingest(str(journal), str(output))
+    assert len(stored_block_hashes(output)) > 10
+
+    row = ('| [[2025-02-03]] | Rainy | 81kg | 7 | 8 | Running/30m | 7hr/<br>1.0hr '
+           '| Yogurt/<br>Ramen/<br>Pizza | 51-100 |\n')
+    text = preprocess.markdown_data.rstrip('\n') + '\n' + row
+    write(journal, text)
+    assert preprocess.ingest(str(journal), str(output)) == ('appended', 1)
+    expected = rebuilt(journal, tmp_path)
+    assert stored_block_hashes(output) == stored_block_hashes(tmp_path / 'expected.csv')
+    pd.testing.assert_frame_equal(read_csv(output), expected)
+
+    write(journal, text.replace('| [[2025-01-10]] | Sunny', '| [[2025-01-10]] | Rainy', 1))
+    assert preprocess.ingest(str(journal), str(output)) == ('upserted', 1)
+    expected = rebuilt(journal, tmp_path)
+    assert stored_block_hashes(output) == stored_block_hashes(tmp_path / 'expected.csv')
+    pd.testing.assert_frame_equal(read_csv(output), expected)
+
+
+# Daily-note directories
+
+DAY = '''---
+date: 2025-01-08
+weather: Sunny
+weight: 82 kg
+feeling_morning: 5
+feeling_evening: 9
+slept_hours: 7hr26m/3.3hr
+meals: Subway:Egg&Mayo/Tamjai/Snacks
+air: 101-150
+---
+'''
+
+MEETING = '''---
+tags: meeting
+attendees: Alice, Bob
+---
+Standup notes.
+'''
+
+
+def note(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write(path, text)
+    return path
+
+
+def ingest_notes(root, output):
+    return preprocess.ingest_notes(str(root), str(output), workers=1)
+
+
+@pytest.fixture
+def vault(tmp_path):
+    root = tmp_path / 'vault'
+    note(root, 'Daily/2025-01-08.md', DAY)
+    note(root, 'Daily/2025-01-09.md', DAY.replace('2025-01-08', '2025-01-09').replace('Sunny', 'Cloudy'))
+    return root
+
+
+def test_front_matter_without_journal_fields_is_not_a_day(vault, tmp_path):
+    note(vault, 'Meetings/2025-01-08 Standup.md', MEETING)
+    output = tmp_path / 'daily_data.csv'
+    assert ingest_notes(vault, output) == ('rebuilt', 3)
+    df = read_csv(output)
+    assert list(df['Date']) == ['2025-01-08', '2025-01-09']
+    assert df.loc[0, 'Weather'] == 'Sunny'
+
+
+def test_same_date_keeps_the_fullest_note_whatever_the_order(vault, tmp_path):
+    # Sorts after Daily/, so a walk-order rule would pick it
+    note(vault, 'Zettel/2025-01-08 walk.md', '---\nweather: Rainy\n---\n')
+    output = tmp_path / 'daily_data.csv'
+    ingest_notes(vault, output)
+    assert read_csv(output).loc[0, 'Weather'] == 'Sunny'
+
+    # Editing the losing note alone leaves the winner's row in place
+    note(vault, 'Zettel/2025-01-08 walk.md', '---\nweather: Windy\n---\n')
+    assert ingest_notes(vault, output) == ('upserted', 1)
+    assert read_csv(output).loc[0, 'Weather'] == 'Sunny'
+
+
+def test_date_survives_while_another_note_has_it(vault, tmp_path):
+    extra = note(vault, 'Zettel/2025-01-08 walk.md', '---\nweather: Rainy\n---\n')
+    output = tmp_path / 'daily_data.csv'
+    ingest_notes(vault, output)
+
+    # The winner goes: the unchanged other note takes over the day
+    os.remove(vault / 'Daily/2025-01-08.md')
+    assert ingest_notes(vault, output) == ('upserted', 0)
+    df = read_csv(output)
+    assert df.loc[df['Date'] == '2025-01-08', 'Weather'].item() == 'Rainy'
+
+    # The last note with the date goes: so does the day
+    os.remove(extra)
+    assert ingest_notes(vault, output) == ('upserted', 0)
+    assert list(read_csv(output)['Date']) == ['2025-01-09']
+
+
+def test_unchanged_notes_are_not_parsed(vault, tmp_path):
+    output = tmp_path / 'daily_data.csv'
+    ingest_notes(vault, output)
+    assert ingest_notes(vault, output) == ('unchanged', 0)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+import regression
+
+
+def test_vertex_interval_stays_inside_the_data(sample):
+    fits = regression.PairRegressions(sample, ['Sleep Duration', 'Feel Average'])
+    interval = fits.vertex_interval('Sleep Duration', 'Feel Average')
+    sleep = sample.dropna(subset=['Sleep Duration', 'Feel Average'])['Sleep Duration']
+    assert regression.MIN_KEPT <= interval['kept'] <= 1
+    assert sleep.min() <= interval['low'] <= interval['high'] <= sleep.max()
+
+
+def test_vertex_interval_covers_a_clear_peak():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(4, 10, 400)
+    df = pd.DataFrame({'x': x, 'y': 8 - (x - 7.5) ** 2 + rng.normal(0, 0.5, len(x))})
+    interval = regression.PairRegressions(df, ['x', 'y']).vertex_interval('x', 'y')
+    assert interval['kept'] == 1
+    assert interval['low'] < 7.5 < interval['high']
+
+
+def test_vertex_interval_is_undefined_without_a_peak_in_the_data():
+    # A straight line: the replicates' slight curvature flips sign at random
+    # and puts the vertex far outside the data
+    rng = np.random.default_rng(2)
+    x = rng.uniform(4, 10, 400)
+    df = pd.DataFrame({'x': x, 'y': 2 * x + rng.normal(0, 0.5, len(x))})
+    interval = regression.PairRegressions(df, ['x', 'y']).vertex_interval('x', 'y')
+    assert interval['kept'] < regression.MIN_KEPT
+    assert np.isnan(interval['low']) and np.isnan(interval['high'])
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import response_surface
+
+
+def _history(days, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Date': pd.date_range('2020-01-01', periods=days, freq='D'),
+        'Sleep Duration': rng.uniform(5, 9, days),
+        'Sleep Debt': rng.uniform(0, 4, days),
+        'Air': rng.uniform(20, 200, days),
+        'Weight': rng.uniform(70, 80, days),
+    })
+    # Peaks inside the data at 7.5 hours of sleep
+    df['Feel Average'] = (
+        9.5 - 2 * (df['Sleep Duration'] - 7.5) ** 2 - 0.5 * df['Sleep Debt'] + rng.normal(0, 0.3, days)
+    ).clip(1, 10)
+    return df
+
+
+def test_optimum_is_the_candidate_nearest_a_recorded_day():
+    df = _history(400)
+    surface = response_surface.ResponseSurface(df)
+    optimum = surface.optimum()
+    best = np.array([optimum['best'][factor] for factor in surface.factors])
+    step = (surface.grid.max(axis=0) - surface.grid.min(axis=0)) / (response_surface.GRID_POINTS - 1)
+    x = df[surface.factors].to_numpy()
+    assert (np.abs(x - best) <= step / 2 + 1e-9).all(axis=1).any()
+    assert 1 <= optimum['predicted'] <= 10
+
+
+def test_predictions_and_rolling_stay_on_the_scale():
+    surface = response_surface.ResponseSurface(_history(400))
+    predicted = surface.predict(surface.grid)
+    assert predicted.min() >= 1 and predicted.max() <= 10
+    # Far outside the data the raw quadratic drops well below the scale
+    assert surface.predict([[14, 0, 100, 75]])[0] == 1
+    rolling = surface.rolling(window=120, step=30)
+    assert len(rolling)
+    assert rolling['Predicted'].between(1, 10).all()
+
+
+def test_too_few_days_per_coefficient_gives_no_optimum():
+    surface = response_surface.ResponseSurface(_history(response_surface.ROWS_PER_TERM * 15 - 1))
+    assert surface.min_rows == response_surface.ROWS_PER_TERM * surface.terms
+    assert surface.optimum() is None
+    assert surface.rolling().empty
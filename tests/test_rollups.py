@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollups
+
+
+def reference(df, granularity):
+    # A full groupby of the same rows, as pandas would do it
+    store = rollups.RollupStore().update(df)
+    year, period = rollups._period_keys(df['Date'], granularity)
+    values = df[store.value_cols].astype('float64')
+    grouped = values.groupby([year.rename('year'), period.rename('period')])
+    return grouped.agg(['mean', 'min', 'max', 'count', 'sum']).reindex(columns=store.summary(granularity).columns)
+
+
+@pytest.mark.parametrize('granularity', rollups.GRANULARITIES)
+def test_appended_days_match_a_full_recompute(sample, granularity):
+    # The split falls inside a week and a month, so those periods combine two partials
+    store = rollups.RollupStore().update(sample.iloc[:17])
+    store.update(sample)
+    pd.testing.assert_frame_equal(store.summary(granularity), reference(sample, granularity), check_dtype=False)
+
+
+@pytest.mark.parametrize('granularity', rollups.GRANULARITIES)
+def test_edited_days_match_a_full_recompute(sample, granularity):
+    store = rollups.RollupStore().update(sample)
+    edited = sample.copy()
+    edited.loc[3, 'Weight'] = edited.loc[3, 'Weight'] + 5
+    edited.loc[10, 'Air'] = np.nan
+    store.update(edited)
+    pd.testing.assert_frame_equal(store.summary(granularity), reference(edited, granularity), check_dtype=False)
+
+
+def test_tables_match_a_pandas_groupby(sample):
+    table = rollups.RollupStore().update(sample).table('month', 'mean')
+    expected = sample.groupby(sample['Date'].dt.to_period('M'))['Weight'].mean()
+    np.testing.assert_allclose(table['Weight'].to_numpy(), expected.to_numpy(dtype=float), rtol=1e-6)
+    assert table['label'].tolist() == [str(period) for period in expected.index]
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollups
+import storage
+from conftest import SAMPLE_CSV
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'daily.db')
+    assert storage.migrate(SAMPLE_CSV, path) == 26
+    yield path
+    storage.close_all()
+
+
+def test_load_frame_matches_the_csv_loader(db, sample):
+    pd.testing.assert_frame_equal(storage.load_frame(db), sample)
+
+
+def test_date_range_matches_the_csv_loader(db, sample):
+    start, end = sample['Date'].iloc[5], sample['Date'].iloc[14]
+    expected = sample[sample['Date'].between(start, end)].reset_index(drop=True)
+    # Categories come from the rows loaded, so only the values can agree
+    pd.testing.assert_frame_equal(
+        storage.load_frame(db, (start, end)), expected, check_dtype=False, check_categorical=False
+    )
+
+
+def test_selected_columns_keep_the_loader_order(db, sample):
+    df = storage.load_frame(db, columns=['Air', 'Weight'])
+    assert list(df.columns) == ['Date', 'Weight', 'Air']
+    pd.testing.assert_frame_equal(df, sample[['Date', 'Weight', 'Air']])
+
+
+@pytest.mark.parametrize('granularity', ['week', 'month'])
+def test_aggregates_match_the_rollups(db, sample, granularity):
+    got = storage.aggregate(db, granularity)
+    expected = rollups.RollupStore().update(sample).table(granularity)
+    assert got['label'].tolist() == expected['label'].tolist()
+    for col in ['Weight', 'Air', 'Feeling Morning', 'Sleep Duration', 'Feel Average']:
+        np.testing.assert_allclose(got[col], expected[col], rtol=1e-6, err_msg=col)
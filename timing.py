@@ -0,0 +1,158 @@
+"""
+Timing spans for the dashboard's hot paths.
+
+    with timing.span("load_data"):
+        ...
+
+records the block's wall time into a per-span latency histogram (fixed
+buckets, as Prometheus uses) with its call count, sum, min and max. Spans are
+shared by every session in the process and may be recorded from worker threads.
+
+Recording is off unless DASHBOARD_PROFILE=1. When off, span() returns one
+shared no-op context manager, so an instrumented call costs a flag check.
+When on, the dashboard shows a "Profiling" panel in the sidebar, and with
+DASHBOARD_PROFILE_EXPORT set the histograms are written to that file after
+every run: Prometheus text format for .prom / .txt files, JSON otherwise.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("DASHBOARD_PROFILE", "").lower() in ("1", "true", "yes")
+EXPORT_PATH = os.environ.get("DASHBOARD_PROFILE_EXPORT")
+
+# Upper bounds of the histogram buckets, in seconds (the last one catches the rest)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+METRIC = "dashboard_span_seconds"
+
+_NULL = nullcontext()
+
+
+class Histogram:
+    """Latency histogram over BUCKETS with count, sum, min and max."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated within its bucket like Prometheus' histogram_quantile."""
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if BUCKETS[i] != math.inf else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def observe(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def _timed_span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def span(name):
+    """Context manager timing its block under `name` (a no-op while recording is off)."""
+    return _timed_span(name) if ENABLED else _NULL
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def snapshot():
+    """{name: stats dict} for every recorded span; times in seconds."""
+    with _lock:
+        items = sorted(_histograms.items())
+        return {
+            name: {
+                "count": h.count,
+                "sum": h.sum,
+                "min": h.min,
+                "max": h.max,
+                "p50": h.quantile(0.5),
+                "p95": h.quantile(0.95),
+                "buckets": dict(zip(map(_bound, BUCKETS), h.counts)),
+            }
+            for name, h in items
+        }
+
+
+def _bound(upper):
+    return "+Inf" if upper == math.inf else repr(upper)
+
+
+def to_json():
+    return json.dumps({"buckets": [_bound(b) for b in BUCKETS], "spans": snapshot()}, indent=2)
+
+
+def to_prometheus():
+    """Histograms in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC} Wall time of instrumented dashboard stages.",
+        f"# TYPE {METRIC} histogram",
+    ]
+    for name, stats in snapshot().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in stats["buckets"].items():
+            cumulative += n
+            lines.append(f'{METRIC}_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC}_sum{{span="{label}"}} {stats["sum"]!r}')
+        lines.append(f'{METRIC}_count{{span="{label}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path=None):
+    """Writes the histograms to `path` (default EXPORT_PATH); Prometheus text for .prom / .txt."""
+    path = path or EXPORT_PATH
+    if not path:
+        return
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else to_json()
+    # Replace in one step so a collector never reads half a file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)